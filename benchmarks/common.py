@@ -0,0 +1,83 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+import os
+import sys
+import json
+import time
+import platform
+
+
+# Allow the scripts to be run from a checkout, without installing ``jsonrpc``.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def configure(database=':memory:'):
+    """
+    Configures Django with a local SQLite database, and the apps needed for
+    the benchmarks (``auth`` provides a model for ``QuerySet`` results).
+    """
+    from django.conf import settings
+    if not settings.configured:
+        settings.configure(
+            DEBUG=False,
+            DATABASES={
+                'default': {
+                    'ENGINE': 'django.db.backends.sqlite3',
+                    'NAME': database,
+                }
+            },
+            INSTALLED_APPS=(
+                'django.contrib.contenttypes',
+                'django.contrib.auth',
+            ),
+            SECRET_KEY='benchmarks',
+        )
+
+
+def environment():
+    """
+    Returns a ``dict`` describing the environment the benchmarks ran in.
+    """
+    import django
+    import jsonrpc
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'django': django.get_version(),
+        'jsonrpc': '.'.join(str(v) for v in jsonrpc.VERSION),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+
+def summarize(samples):
+    """
+    Takes a list of per-operation timings (seconds), and returns a ``dict`` of
+    statistics (in microseconds, except for "ops_per_sec").
+    """
+    samples = sorted(samples)
+    count = len(samples)
+    mean = sum(samples) / count
+    return {
+        'min_us': samples[0] * 1e6,
+        'median_us': samples[count // 2] * 1e6,
+        'mean_us': mean * 1e6,
+        'max_us': samples[-1] * 1e6,
+        'ops_per_sec': 1.0 / mean if mean else None,
+        'samples': count,
+    }
+
+
+def write_results(results, output=None):
+    """
+    Writes the results (with the environment) as JSON to ``output`` (a path),
+    or to stdout.
+    """
+    data = json.dumps({'environment': environment(), 'results': results},
+                      indent=4, sort_keys=True, separators=(',', ': '))
+    if output is None:
+        sys.stdout.write(data + '\n')
+    else:
+        with open(output, 'w') as f:
+            f.write(data + '\n')
@@ -0,0 +1,163 @@
+"""
+Benchmarks the full request pipeline (``JSONRPCService.__call__``), from the
+HTTP request to the encoded HTTP response, for a range of typical calls.
+
+Usage::
+
+    python benchmarks/pipeline.py [--number N] [--repeat N] [--filter NAME]
+                                  [--output PATH]
+
+Results are written as JSON, for comparison across versions.
+"""
+import json
+import time
+import argparse
+
+from common import configure, summarize, write_results
+
+configure()
+
+from django.core.management import call_command
+from django.test.client import RequestFactory
+
+from jsonrpc.decorators import jrpc
+from jsonrpc.service import JSONRPCService
+
+
+# Number of rows of the ``QuerySet`` result (of ``auth.Permission``, which
+# has no many-to-many fields, so that encoding dominates, not queries).
+QUERYSET_ROWS = 500
+
+# Number of items of the large list result.
+LIST_ITEMS = 10000
+
+MANY_PARAMS = 'abcdefghijkl'
+
+# Number of items of the nested (typed container) param.
+NESTED_ITEMS = 100
+
+
+class BenchmarkAPI(JSONRPCService):
+    """
+    The service under test.
+    """
+    @jrpc('echo(value=<str>) -> <str>')
+    def echo(self, request, value):
+        return value
+
+    @jrpc('many({0}) -> <num>'.format(
+        ', '.join('{0}=<num>'.format(p) for p in MANY_PARAMS)))
+    def many(self, request, *args, **kwargs):
+        return len(args) + len(kwargs)
+
+    @jrpc('nested(items=<arr<obj{id:num, tags:arr<str>}>>) -> <num>')
+    def nested(self, request, items):
+        return len(items)
+
+    @jrpc('numbers(count=<num>) -> <arr>')
+    def numbers(self, request, count):
+        return range(count)
+
+    @jrpc('permissions(limit=<num>) -> <arr>')
+    def permissions(self, request, limit):
+        from django.contrib.auth.models import Permission
+        return Permission.objects.order_by('pk')[:limit]
+
+
+def call(method, params, rid=1):
+    """
+    Returns a JSON-RPC request object.
+    """
+    return {'jsonrpc': '2.0', 'method': method, 'params': params, 'id': rid}
+
+
+def cases():
+    """
+    Returns a list of ``(name, service, request)`` 3-tuples.
+    """
+    factory = RequestFactory()
+    api = BenchmarkAPI()
+    get_api = BenchmarkAPI(get=True)
+
+    def post(json_req):
+        return factory.post('/', data=json.dumps(json_req),
+                            content_type='application/json')
+
+    many_positional = range(len(MANY_PARAMS))
+    many_named = dict((p, i) for i, p in enumerate(MANY_PARAMS))
+    nested_items = [{'id': i, 'tags': ['a', 'b']} for i in range(NESTED_ITEMS)]
+    return [
+        ('small_positional', api, post(call('echo', ['hello']))),
+        ('small_named', api, post(call('echo', {'value': 'hello'}))),
+        ('many_params_positional', api, post(call('many', many_positional))),
+        ('many_params_named', api, post(call('many', many_named))),
+        ('nested_params', api, post(call('nested', [nested_items]))),
+        ('error_method_not_found', api, post(call('missing', []))),
+        ('error_invalid_params', api, post(call('echo', [1]))),
+        ('large_list', api, post(call('numbers', [LIST_ITEMS]))),
+        ('queryset', api, post(call('permissions', [QUERYSET_ROWS]))),
+        ('batch_10', api, post(
+            [call('echo', ['hello'], rid=i) for i in range(10)])),
+        ('jsonp_get', get_api, factory.get('/', {
+            'json': json.dumps(call('echo', ['hello'])),
+            'callback': 'callback'})),
+    ]
+
+
+def setup_database():
+    """
+    Creates the tables, and the rows of the ``QuerySet`` result.
+    """
+    from django.contrib.auth.models import Permission
+    from django.contrib.contenttypes.models import ContentType
+    call_command('syncdb', interactive=False, verbosity=0)
+    content_type = ContentType.objects.create(
+        name='benchmark', app_label='benchmarks', model='benchmark')
+    Permission.objects.bulk_create([
+        Permission(name='Permission {0}'.format(i),
+                   codename='perm{0}'.format(i), content_type=content_type)
+        for i in range(QUERYSET_ROWS)])
+
+
+def run(api, request, number, repeat):
+    """
+    Returns the per-call timings (one per repetition) of ``number`` calls.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.time()
+        for _ in range(number):
+            api(request).content
+        samples.append((time.time() - start) / number)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--number', type=int, default=1000,
+                        help='calls per repetition (default: 1000)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='repetitions of each benchmark (default: 5)')
+    parser.add_argument('--filter', default=None,
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', default=None,
+                        help='path to write the JSON results to')
+    args = parser.parse_args()
+
+    setup_database()
+    results = {}
+    for name, api, request in cases():
+        if args.filter and args.filter not in name:
+            continue
+        # Large results are slower by orders of magnitude.
+        number = args.number
+        if name in ('large_list', 'queryset'):
+            number = max(1, number // 100)
+        run(api, request, 1, 1)  # Warm up.
+        results[name] = summarize(run(api, request, number, args.repeat))
+        results[name]['number'] = number
+    write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmarks startup: importing ``jsonrpc.service``, decorating the methods of a
+generated service with a very large method set, creating the service class,
+and creating sub-classes of it. Each repetition runs in a fresh interpreter,
+so that nothing is cached between repetitions (as on a worker boot).
+
+Usage::
+
+    python benchmarks/startup.py [--methods N] [--repeat N] [--output PATH]
+
+Results are written as JSON, for comparison across versions.
+"""
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+from common import configure, summarize, write_results
+
+
+# The params and return types of the generated methods, which cycle through
+# these (generated services repeat a handful of shapes).
+PARAMS = (
+    '',
+    'id=<num>',
+    'id=<num>, name=<str>, active=<bit>?',
+    'query=<str>, limit=<num>?, offset=<num>?',
+    'items=<arr<obj{id:num, tags:arr<str>}>>',
+)
+RETURNS = ('nil', 'num', 'str', 'obj', 'arr<obj{id:num, name:str}>')
+
+# Number of sub-classes created (and timed together) per repetition.
+SUBCLASSES = 100
+
+
+def measure(methods):
+    """
+    Returns a ``dict`` of phase -> seconds, for a service of ``methods``
+    methods (sub-class phases are per sub-class).
+    """
+    timings = {}
+    configure()
+    start = time.time()
+    from jsonrpc.decorators import jrpc
+    from jsonrpc.service import JSONRPCService
+    timings['import'] = time.time() - start
+
+    def method(self, request, *args, **kwargs):
+        return None
+
+    start = time.time()
+    dct = {}
+    for i in range(methods):
+        name = 'method_{0}'.format(i)
+        dct[name] = jrpc('{n}({p}) -> <{r}>'.format(
+            n=name, p=PARAMS[i % len(PARAMS)],
+            r=RETURNS[i % len(RETURNS)]))(method)
+    timings['decorate'] = time.time() - start
+
+    start = time.time()
+    service = type(JSONRPCService)('GeneratedAPI', (JSONRPCService,), dct)
+    timings['class'] = time.time() - start
+
+    start = time.time()
+    for i in range(SUBCLASSES):
+        type(service)('SubAPI', (service,), {})
+    timings['subclass'] = (time.time() - start) / SUBCLASSES
+
+    extra = jrpc('extra(id=<num>) -> <num>')(method)
+    start = time.time()
+    for i in range(SUBCLASSES):
+        type(service)('ExtendedAPI', (service,), {'extra': extra})
+    timings['subclass_extended'] = (time.time() - start) / SUBCLASSES
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--methods', type=int, default=5000,
+                        help='methods of the generated service (default: 5000)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='repetitions, each in a new interpreter '
+                             '(default: 5)')
+    parser.add_argument('--output', default=None,
+                        help='path to write the JSON results to')
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.stdout.write(json.dumps(measure(args.methods)))
+        return
+
+    samples = {}
+    for _ in range(args.repeat):
+        output = subprocess.check_output([
+            sys.executable, __file__, '--child', '--methods',
+            str(args.methods)])
+        for phase, seconds in json.loads(output).iteritems():
+            samples.setdefault(phase, []).append(seconds)
+    results = {}
+    for phase, phase_samples in samples.iteritems():
+        results[phase] = summarize(phase_samples)
+        results[phase]['methods'] = args.methods
+    write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
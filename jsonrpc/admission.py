@@ -0,0 +1,127 @@
+"""
+Admission control, which limits the number of concurrent calls to each method
+(and, optionally, to the service as a whole), so that an expensive method
+can't use up every worker thread. Calls which can't be admitted within their
+queue timeout are rejected with an ``OverloadedError`` (HTTP 503).
+
+Usage::
+
+    # Inside of ``JSONRPCService`` sub-class
+    max_concurrency = 50
+
+    @jrpc('export(year=<num>) -> <arr>', max_concurrency=2, queue_timeout=1)
+    def export(self, request, year):
+        ...
+
+"""
+import time
+import threading
+
+from .errors import OverloadedError
+
+
+class Limit(object):
+    """
+    A counting semaphore which waits for at most ``timeout`` seconds to
+    acquire a slot (``threading.Semaphore`` can't time out in Python 2).
+    """
+    __slots__ = ('max_concurrency', 'active', '_condition')
+
+    def __init__(self, max_concurrency):
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self._condition = threading.Condition(threading.Lock())
+
+    def acquire(self, timeout=0):
+        """
+        Returns ``True`` if a slot was acquired within ``timeout`` seconds,
+        otherwise ``False``.
+        """
+        with self._condition:
+            if self.active < self.max_concurrency:
+                self.active += 1
+                return True
+            if not timeout:
+                return False
+            deadline = time.time() + timeout
+            while self.active >= self.max_concurrency:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+
+class AdmissionController(object):
+    """
+    Admits calls to methods decorated with ``@jrpc(..., max_concurrency=N)``,
+    waiting for up to the method's ``queue_timeout`` (or the controller's, by
+    default) seconds for a slot. When ``max_concurrency`` is provided, calls
+    to all methods of the service are also limited to that many in total.
+    """
+    def __init__(self, max_concurrency=None, queue_timeout=0):
+        self.queue_timeout = queue_timeout
+        self._service_limit = None
+        if max_concurrency is not None:
+            self._service_limit = Limit(max_concurrency)
+        self._limits = {}  # method -> ``Limit``
+        self._lock = threading.Lock()
+
+    def _limit(self, method):
+        """
+        Returns the ``Limit`` of ``method`` (created on first use), or
+        ``None`` if the method's concurrency isn't limited.
+        """
+        if method.max_concurrency is None:
+            return None
+        try:
+            return self._limits[method]
+        except KeyError:
+            with self._lock:
+                if method not in self._limits:
+                    self._limits[method] = Limit(method.max_concurrency)
+                return self._limits[method]
+
+    def limits(self, method):
+        """
+        Returns whether or not calls to ``method`` are limited (and so must be
+        acquired and released).
+        """
+        return (method.max_concurrency is not None or
+                self._service_limit is not None)
+
+    def acquire(self, method):
+        """
+        Acquires a slot for a call to ``method``, or raises an
+        ``OverloadedError`` if one isn't available in time. Each successful
+        call must be followed by a call to ``release``.
+        """
+        timeout = method.queue_timeout
+        if timeout is None:
+            timeout = self.queue_timeout
+        limit = self._limit(method)
+        if limit is not None and not limit.acquire(timeout):
+            raise OverloadedError(
+                details=u'Method `{0}` is at its concurrency limit'.format(
+                    method.name))
+        if (self._service_limit is not None and
+                not self._service_limit.acquire(timeout)):
+            if limit is not None:
+                limit.release()
+            raise OverloadedError()
+
+    def release(self, method):
+        """
+        Releases the slot acquired for a call to ``method``.
+        """
+        if self._service_limit is not None:
+            self._service_limit.release()
+        limit = self._limit(method)
+        if limit is not None:
+            limit.release()
@@ -0,0 +1,227 @@
+"""
+JSON backends (codecs), used by ``JSONRPCService`` to parse requests and encode
+responses. Set ``json_backend`` on a service class to choose one.
+
+The binary backends (MessagePack and CBOR) are used alongside the JSON backend,
+for clients which send (or accept) their ``content_type``. Set
+``binary_backends`` on a service class to enable them.
+"""
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .compression import parse_qvalues
+from .encoders import RobustEncoder, coerce
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+class JSONBackend(object):
+    """
+    The interface of a JSON backend. Sub-classes must implement ``loads`` and
+    ``dumps``. Binary backends also set ``content_type`` (the media type they
+    are negotiated by).
+    """
+    content_type = None
+
+    def loads(self, data):
+        """
+        Returns the Python object for the JSON ``data``, or raises a
+        ``ValueError`` if ``data`` isn't valid JSON.
+        """
+        raise NotImplementedError
+
+    def dumps(self, obj, pretty=False):
+        """
+        Returns ``obj`` encoded as a JSON ``str``. Types which aren't supported
+        natively are handled as they are by ``encoders.RobustEncoder``. When
+        ``pretty`` is ``True``, the output is formatted with indentation.
+        """
+        raise NotImplementedError
+
+
+class StdlibBackend(JSONBackend):
+    """
+    A backend which uses the ``json`` module from the standard library.
+    """
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj, pretty=False):
+        if pretty:
+            # Turn on pretty JSON formatting with indentation.
+            return json.dumps(obj, indent=4, cls=RobustEncoder)
+        # Turn off pretty JSON formatting and remove indentation.
+        return json.dumps(obj, separators=(',', ':'), cls=RobustEncoder)
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    A backend which uses ``orjson`` (https://github.com/ijl/orjson), which
+    must be installed. ``RobustEncoder.default`` is provided to ``orjson`` as
+    the ``default`` callback, for the types it doesn't support natively.
+    """
+    def __init__(self):
+        if orjson is None:
+            raise ImproperlyConfigured(
+                u'The orjson package is required to use OrjsonBackend')
+        self._default = RobustEncoder().default
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj, pretty=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self._default, option=option)
+
+
+class UjsonBackend(JSONBackend):
+    """
+    A backend which uses ``ujson`` (https://github.com/ultrajson/ultrajson),
+    which must be installed, and which (unlike ``orjson``) supports Python 2.
+    ``ujson`` has no ``default`` callback, so the types it doesn't support
+    natively are converted by ``encoders.coerce`` before encoding. Floats are
+    encoded with ``double_precision`` significant decimals.
+    """
+    # The most ``ujson`` supports (``json`` uses as many as a float needs).
+    double_precision = 15
+
+    def __init__(self):
+        if ujson is None:
+            raise ImproperlyConfigured(
+                u'The ujson package is required to use UjsonBackend')
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+    def dumps(self, obj, pretty=False):
+        return ujson.dumps(
+            coerce(obj), indent=4 if pretty else 0,
+            escape_forward_slashes=False,
+            double_precision=self.double_precision)
+
+
+class MsgpackBackend(JSONBackend):
+    """
+    A binary backend which uses ``msgpack`` (https://msgpack.org/), which must
+    be installed. ``RobustEncoder.default`` is provided to ``msgpack`` as the
+    ``default`` callback. Byte strings are encoded as strings, as they are in
+    JSON.
+    """
+    content_type = 'application/msgpack'
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImproperlyConfigured(
+                u'The msgpack package is required to use MsgpackBackend')
+        self._default = RobustEncoder().default
+
+    def loads(self, data):
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except (msgpack.UnpackException, TypeError), ex:
+            # A ``TypeError`` is raised for maps with unhashable keys (e.g.,
+            # arrays), which are valid msgpack, but not valid JSON.
+            raise ValueError(unicode(ex))
+
+    def dumps(self, obj, pretty=False):
+        return msgpack.packb(obj, default=self._default, use_bin_type=False)
+
+
+class CBORBackend(JSONBackend):
+    """
+    A binary backend which uses ``cbor2`` (https://github.com/agronholm/cbor2),
+    which must be installed. Types which ``cbor2`` doesn't support are
+    converted by ``RobustEncoder.default``. Byte strings are encoded as text
+    strings, as they are in JSON.
+    """
+    content_type = 'application/cbor'
+
+    def __init__(self):
+        if cbor2 is None:
+            raise ImproperlyConfigured(
+                u'The cbor2 package is required to use CBORBackend')
+        self._robust_default = RobustEncoder().default
+
+    def loads(self, data):
+        try:
+            return cbor2.loads(data)
+        except (cbor2.CBORDecodeError, TypeError), ex:
+            raise ValueError(unicode(ex))
+
+    def dumps(self, obj, pretty=False):
+        return cbor2.dumps(_text(obj), default=self._default)
+
+    def _default(self, encoder, obj):
+        encoder.encode(_text(self._robust_default(obj)))
+
+
+def _text(obj):
+    """
+    Returns ``obj`` with the byte strings in it (including those in lists,
+    tuples, and dicts) decoded as UTF-8, since ``cbor2`` would encode them as
+    CBOR byte strings.
+    """
+    if isinstance(obj, str):
+        return obj.decode('utf-8')
+    if isinstance(obj, dict):
+        return dict((_text(key), _text(value))
+                    for key, value in obj.iteritems())
+    if isinstance(obj, (list, tuple)):
+        return [_text(value) for value in obj]
+    return obj
+
+
+def accepted_backend(accept, backends, default=None):
+    """
+    Returns the backend in ``backends`` whose ``content_type`` is the most
+    preferred by the ``Accept`` header value (honoring "q" values), ``None``
+    if JSON ("application/json") is preferred, or ``default`` if the header
+    names none of them (e.g., "*/*").
+    """
+    if not accept:
+        return default
+    by_type = dict((backend.content_type, backend) for backend in backends)
+    by_type['application/json'] = None
+    best = None
+    for media_type, q in parse_qvalues(accept).iteritems():
+        if media_type not in by_type:
+            continue
+        if q > 0 and (best is None or q > best[1]):
+            best = (media_type, q)
+    if best is None:
+        return default
+    return by_type[best[0]]
+
+
+def best_available():
+    """
+    Returns an ``OrjsonBackend`` if ``orjson`` is installed, otherwise a
+    ``UjsonBackend`` if ``ujson`` is installed (e.g., on Python 2, which
+    ``orjson`` doesn't support), otherwise a ``StdlibBackend``.
+    """
+    if orjson is not None:
+        return OrjsonBackend()
+    if ujson is not None:
+        return UjsonBackend()
+    return StdlibBackend()
@@ -0,0 +1,152 @@
+"""
+Result caches for idempotent methods. Set ``result_cache`` on a service class
+to one of these, and use ``@jrpc(..., idempotent=True, cache_timeout=60)`` on
+each method whose results should be cached.
+"""
+import time
+import uuid
+import threading
+from collections import Iterator, OrderedDict
+
+from django.core.cache import get_cache
+from django.db import models
+from django.db.models.query import QuerySet
+
+from .concurrency import resolve
+from .encoders import model_dict, model_dicts
+
+
+# Returned by ``get`` when a result isn't cached (``None`` is a valid result).
+MISSING = object()
+
+
+def cacheable(result):
+    """
+    Returns ``result`` in a form that's safe to cache and to use more than once
+    (e.g., ``QuerySet`` objects and generators are evaluated), which encodes
+    to the same JSON as ``result`` itself. Futures are waited for.
+    """
+    result = resolve(result)
+    if isinstance(result, QuerySet):
+        return list(model_dicts(result))
+    if isinstance(result, models.Model):
+        return model_dict(result)
+    if isinstance(result, Iterator):
+        return list(result)
+    return result
+
+
+class BaseResultCache(object):
+    """
+    The interface of a result cache. Results are stored by method name (which
+    is qualified with the service class, e.g. ``'app.api.FooAPI.get_sum'``)
+    and a key (a ``str``) which identifies the params, etc. the method was
+    called with.
+    """
+    def get(self, method_name, key):
+        """
+        Returns the cached result, or ``MISSING``.
+        """
+        raise NotImplementedError
+
+    def set(self, method_name, key, result, timeout):
+        """
+        Caches a result for ``timeout`` seconds.
+        """
+        raise NotImplementedError
+
+    def invalidate(self, method_name, key=None):
+        """
+        Removes a cached result, or, if no key is provided, every cached result
+        of the method.
+        """
+        raise NotImplementedError
+
+
+class LocalResultCache(BaseResultCache):
+    """
+    An in-process result cache, which holds up to ``max_entries`` results,
+    evicting the least recently used result when full.
+    """
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        # ``(method_name, key)`` -> ``(expires, result)``, oldest first.
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, method_name, key):
+        with self._lock:
+            try:
+                expires, result = self._entries.pop((method_name, key))
+            except KeyError:
+                return MISSING
+            if expires < time.time():
+                return MISSING
+            # Re-insert the entry, marking it as the most recently used.
+            self._entries[(method_name, key)] = (expires, result)
+            return result
+
+    def set(self, method_name, key, result, timeout):
+        with self._lock:
+            self._entries.pop((method_name, key), None)
+            self._entries[(method_name, key)] = (time.time() + timeout, result)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, method_name, key=None):
+        with self._lock:
+            if key is not None:
+                self._entries.pop((method_name, key), None)
+                return
+            for entry_key in self._entries.keys():
+                if entry_key[0] == method_name:
+                    del self._entries[entry_key]
+
+
+class DjangoResultCache(BaseResultCache):
+    """
+    A result cache backed by one of the caches in ``settings.CACHES``. To allow
+    every result of a method to be invalidated at once, keys include a
+    "generation" for the method, which is also stored in the cache.
+    """
+    # Lifetime of each method's generation (30 days, which is the longest
+    # relative timeout memcached supports).
+    generation_timeout = 60 * 60 * 24 * 30
+
+    def __init__(self, alias='default', key_prefix='jsonrpc'):
+        self.cache = get_cache(alias)
+        self.key_prefix = key_prefix
+
+    def _generation_key(self, method_name):
+        return u'{p}:gen:{m}'.format(p=self.key_prefix, m=method_name)
+
+    def _generation(self, method_name):
+        """
+        Returns the current generation of a method. A missing generation is
+        replaced with a new one, so entries from an evicted generation are
+        never used again.
+        """
+        gen_key = self._generation_key(method_name)
+        generation = self.cache.get(gen_key)
+        if generation is None:
+            self.cache.add(gen_key, uuid.uuid4().hex, self.generation_timeout)
+            generation = self.cache.get(gen_key)
+        return generation
+
+    def _key(self, method_name, key):
+        return u'{p}:{m}:{g}:{k}'.format(
+            p=self.key_prefix, m=method_name,
+            g=self._generation(method_name), k=key)
+
+    def get(self, method_name, key):
+        return self.cache.get(self._key(method_name, key), MISSING)
+
+    def set(self, method_name, key, result, timeout):
+        self.cache.set(self._key(method_name, key), result, timeout)
+
+    def invalidate(self, method_name, key=None):
+        if key is not None:
+            self.cache.delete(self._key(method_name, key))
+            return
+        self.cache.set(self._generation_key(method_name), uuid.uuid4().hex,
+                       self.generation_timeout)
@@ -0,0 +1,446 @@
+"""
+A JSON-RPC 2.0 client, for calling services from Python, with keep-alive
+connection pooling, proxies built from ``system.describe``, client-side params
+validation, and (optionally) automatic batching of concurrent calls.
+
+Usage::
+
+    client = Client('http://example.com/api.json')
+    client.call('get_sum', 1, 2)  # -> 3
+
+    api = client.proxy()  # Built from ``system.describe``.
+    api.get_sum(foo=1, bar=2)  # -> 3 (params are checked before sending)
+
+Provide a binary backend (e.g., ``backend=MsgpackBackend()``) to talk to a
+service with ``binary_backends`` in that format. Only the ``LocalTransport``
+(for calling a service in-process, e.g., in tests), and the backends, require
+Django.
+"""
+import json
+import zlib
+import Queue
+import socket
+import httplib
+import urlparse
+import itertools
+import threading
+
+from . import errors
+from .validators import ParamsValidator
+
+
+# JSON-RPC error code -> exception class, for errors returned by services.
+ERROR_CLASSES = dict(
+    (cls.code, cls) for cls in (
+        errors.JSONRPCError, errors.ParseError, errors.InvalidRequestError,
+        errors.MethodNotFoundError, errors.InvalidParamsError,
+        errors.InternalError, errors.ServerError, errors.OverloadedError,
+        errors.RateLimitedError))
+
+
+class TransportError(IOError):
+    """
+    The service couldn't be reached, or its response wasn't JSON-RPC.
+    """
+
+
+def remote_error(error):
+    """
+    Returns the exception for a JSON-RPC error object, an instance of the
+    class in ``errors`` with the same code (or of ``JSONRPCError``, with the
+    code set).
+    """
+    code = error.get('code')
+    data = error.get('data') or {}
+    details = data.get('details') if isinstance(data, dict) else None
+    ex = ERROR_CLASSES.get(code, errors.JSONRPCError)(
+        error.get('message'), details)
+    ex.code = code
+    ex.data = data
+    return ex
+
+
+class ConnectionPool(object):
+    """
+    A pool of keep-alive HTTP(S) connections to a single host, which may be
+    shared by threads. Up to ``max_size`` idle connections are kept open.
+    """
+    def __init__(self, url, max_size=10, timeout=None):
+        parts = urlparse.urlsplit(url)
+        if parts.scheme == 'https':
+            self.connection_class = httplib.HTTPSConnection
+        else:
+            self.connection_class = httplib.HTTPConnection
+        self.host = parts.netloc
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path += '?' + parts.query
+        self.timeout = timeout
+        self._idle = Queue.LifoQueue(max_size)
+
+    def _connect(self):
+        if self.timeout is None:
+            return self.connection_class(self.host)
+        return self.connection_class(self.host, timeout=self.timeout)
+
+    def request(self, body, headers):
+        """
+        POSTs ``body``, and returns a 3-tuple of the response's status,
+        headers (a ``dict`` with lower-case names), and body. A connection
+        which was closed by the server while idle is retried once, with a new
+        connection.
+        """
+        try:
+            connection, reused = self._idle.get_nowait(), True
+        except Queue.Empty:
+            connection, reused = self._connect(), False
+        try:
+            try:
+                response = self._request(connection, body, headers)
+            except (httplib.HTTPException, socket.error):
+                connection.close()
+                if not reused:
+                    raise
+                connection = self._connect()
+                response = self._request(connection, body, headers)
+        except (httplib.HTTPException, socket.error), ex:
+            connection.close()
+            raise TransportError(u'Request to {0} failed: {1}'.format(
+                self.host, ex))
+        status, response_headers, data = response
+        if response_headers.get('connection', '').lower() == 'close':
+            connection.close()
+        else:
+            try:
+                self._idle.put_nowait(connection)
+            except Queue.Full:
+                connection.close()
+        return response
+
+    def _request(self, connection, body, headers):
+        connection.request('POST', self.path, body, headers)
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+
+    def close(self):
+        """
+        Closes every idle connection.
+        """
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Queue.Empty:
+                return
+
+
+class HTTPTransport(object):
+    """
+    Sends requests to a service over HTTP(S), with pooled connections.
+    Provide ``headers`` to add headers (e.g., for authentication) to every
+    request.
+    """
+    def __init__(self, url, pool_size=10, timeout=None, headers=None):
+        self.pool = ConnectionPool(url, pool_size, timeout)
+        self.headers = {'Accept-Encoding': 'gzip, deflate'}
+        self.headers.update(headers or {})
+
+    def send(self, data, content_type='application/json'):
+        """
+        Sends an encoded request, and returns the encoded response (an empty
+        string for notifications), which is requested in the same format.
+        """
+        request_headers = dict(self.headers)
+        request_headers['Content-Type'] = content_type
+        request_headers['Accept'] = content_type
+        status, headers, body = self.pool.request(data, request_headers)
+        encoding = headers.get('content-encoding')
+        if encoding == 'gzip':
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            body = zlib.decompress(body)
+        return body
+
+    def close(self):
+        self.pool.close()
+
+
+class LocalTransport(object):
+    """
+    Sends requests straight to a ``JSONRPCService`` instance in the current
+    process (via Django's ``RequestFactory``), for tests.
+    """
+    def __init__(self, service, path='/', **extra):
+        from django.test.client import RequestFactory
+        self.service = service
+        self.path = path
+        self.extra = extra  # WSGI environ items for each request.
+        self._factory = RequestFactory()
+
+    def send(self, data, content_type='application/json'):
+        request = self._factory.post(
+            self.path, data=data, content_type=content_type,
+            HTTP_ACCEPT=content_type, **self.extra)
+        response = self.service(request)
+        if getattr(response, 'streaming', False):
+            return ''.join(response.streaming_content)
+        return response.content
+
+    def close(self):
+        pass
+
+
+class PendingCall(object):
+    """
+    The result of a call made with ``Client.call_async``, which is available
+    once the call's batch has been sent.
+    """
+    __slots__ = ('request', '_event', '_result', '_error')
+
+    def __init__(self, request):
+        self.request = request
+        self._event = threading.Event()
+        self._result = None
+        self._error = None
+
+    def _set(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._event.set()
+
+    def done(self):
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """
+        Waits for the response, and returns the result (or raises the error).
+        """
+        if not self._event.wait(timeout):
+            raise TransportError(u'Timed out waiting for the response')
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class Client(object):
+    """
+    A JSON-RPC 2.0 client. Provide the URL of a service, or a transport (e.g.,
+    a ``LocalTransport``).
+
+    When ``batch_window`` (seconds) is provided, calls made within that window
+    of each other (e.g., by several threads, or via ``call_async``) are sent
+    together as one batch request, of up to ``max_batch`` calls.
+
+    Requests and responses are encoded as JSON, or by ``backend`` (a binary
+    backend, see ``backends``), if provided.
+    """
+    def __init__(self, url_or_transport, batch_window=None, max_batch=100,
+                 backend=None, **transport_kwargs):
+        if isinstance(url_or_transport, basestring):
+            self.transport = HTTPTransport(url_or_transport,
+                                           **transport_kwargs)
+        else:
+            self.transport = url_or_transport
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.backend = backend
+        # Method name -> ``ParamsValidator`` (see ``load_description``).
+        self.validators = {}
+        self._ids = itertools.count(1)
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._timer = None
+
+    def _request(self, method, args, kwargs, notification=False):
+        """
+        Returns a request object, after checking the params against the
+        method's signature (if the service's description has been loaded).
+        """
+        if args and kwargs:
+            raise ValueError(
+                u'Params must be either positional or named, not both')
+        params = kwargs or list(args)
+        validator = self.validators.get(method)
+        if validator is not None:
+            validator(params)
+        request = {'jsonrpc': '2.0', 'method': method, 'params': params}
+        if not notification:
+            request['id'] = next(self._ids)
+        return request
+
+    def _send(self, payload):
+        """
+        Sends a request object (or a list of them), and returns the decoded
+        response.
+        """
+        if self.backend is None:
+            data = self.transport.send(
+                json.dumps(payload, separators=(',', ':')))
+        else:
+            data = self.transport.send(self.backend.dumps(payload),
+                                       self.backend.content_type)
+        if not data:
+            return None
+        try:
+            if self.backend is None:
+                return json.loads(data)
+            return self.backend.loads(data)
+        except ValueError:
+            raise TransportError(u'The response could not be decoded')
+
+    def call(self, method, *args, **kwargs):
+        """
+        Calls ``method`` with positional or named params, and returns the
+        result, or raises the error returned (see ``remote_error``).
+        """
+        if self.batch_window is not None:
+            return self.call_async(method, *args, **kwargs).result()
+        response = self._send(self._request(method, args, kwargs))
+        if not isinstance(response, dict):
+            raise TransportError(u'The response is not a response object')
+        if 'error' in response:
+            raise remote_error(response['error'])
+        return response.get('result')
+
+    def notify(self, method, *args, **kwargs):
+        """
+        Sends a notification (a call without a response).
+        """
+        self._send(self._request(method, args, kwargs, notification=True))
+
+    def call_async(self, method, *args, **kwargs):
+        """
+        Queues a call to be sent in the next batch, and returns a
+        ``PendingCall``. Without a ``batch_window``, the call is sent at once.
+        """
+        pending = PendingCall(self._request(method, args, kwargs))
+        if self.batch_window is None:
+            self._send_batch([pending])
+            return pending
+        with self._pending_lock:
+            self._pending.append(pending)
+            if len(self._pending) >= self.max_batch:
+                batch, self._pending = self._pending, []
+            else:
+                batch = None
+                if self._timer is None:
+                    self._timer = threading.Timer(self.batch_window,
+                                                  self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if batch is not None:
+            self._send_batch(batch)
+        return pending
+
+    def flush(self):
+        """
+        Sends the calls queued by ``call_async`` now.
+        """
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if batch:
+            self._send_batch(batch)
+
+    def _send_batch(self, batch):
+        """
+        Sends ``PendingCall`` objects as one request, and sets their results.
+        """
+        payload = [pending.request for pending in batch]
+        try:
+            responses = self._send(payload if len(payload) > 1 else payload[0])
+        except Exception, ex:
+            for pending in batch:
+                pending._set(error=ex)
+            return
+        if isinstance(responses, dict):
+            responses = [responses]
+        by_id = {}
+        for response in responses or []:
+            if isinstance(response, dict):
+                by_id[response.get('id')] = response
+        for pending in batch:
+            response = by_id.get(pending.request['id'], by_id.get(None))
+            if response is None:
+                pending._set(error=TransportError(
+                    u'No response for call {0}'.format(pending.request['id'])))
+            elif 'error' in response:
+                pending._set(error=remote_error(response['error']))
+            else:
+                pending._set(result=response.get('result'))
+
+    def load_description(self):
+        """
+        Calls ``system.describe``, and compiles a validator for each method
+        described, so that params are checked before calls are sent. Returns
+        the description.
+        """
+        description = self.call('system.describe')
+        validators = {}
+        for proc in description.get('procs', []):
+            validators[proc['name']] = ParamsValidator(
+                [(p['name'], p['type'], p['optional'])
+                 for p in proc['params']])
+        self.validators = validators
+        return description
+
+    def proxy(self):
+        """
+        Returns a ``ServiceProxy`` for the methods described by the service
+        (see ``load_description``).
+        """
+        if not self.validators:
+            self.load_description()
+        return ServiceProxy(self, sorted(self.validators))
+
+    def close(self):
+        """
+        Sends any queued calls, and closes the transport's connections.
+        """
+        self.flush()
+        self.transport.close()
+
+
+class ServiceProxy(object):
+    """
+    An object with an attribute for each method of a service (with dotted
+    names, like ``system.describe``, as nested attributes), which call the
+    method via the client.
+    """
+    def __init__(self, client, names, prefix=''):
+        self._client = client
+        self._names = names
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        full_name = self._prefix + name
+        if full_name in self._names:
+            return _ProxyMethod(self._client, full_name)
+        if any(n.startswith(full_name + '.') for n in self._names):
+            return ServiceProxy(self._client, self._names, full_name + '.')
+        raise AttributeError(
+            u'The service has no method `{0}`'.format(full_name))
+
+    def __dir__(self):
+        return sorted(set(n[len(self._prefix):].split('.')[0]
+                          for n in self._names if n.startswith(self._prefix)))
+
+
+class _ProxyMethod(object):
+    """
+    A method of a ``ServiceProxy``.
+    """
+    __slots__ = ('client', 'name')
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        return self.client.call(self.name, *args, **kwargs)
+
+    def __repr__(self):
+        return '<remote method {0}>'.format(self.name)
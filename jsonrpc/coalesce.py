@@ -0,0 +1,73 @@
+"""
+Single-flight coalescing of identical concurrent calls. When several calls to
+a method decorated with ``@jrpc(..., idempotent=True, coalesce=True)`` are made
+with the same params at the same time, only the first runs the method, and the
+rest wait for (and share) its result, or its error. This avoids a "thundering
+herd" of identical expensive calls (e.g., when a cached result expires)
+without keeping results around once they're returned.
+
+Usage::
+
+    # Inside of ``JSONRPCService`` sub-class
+    @jrpc('report(year=<num>) -> <obj>', idempotent=True, coalesce=True)
+    def report(self, request, year):
+        ...
+
+"""
+import sys
+import threading
+
+
+class _Flight(object):
+    """
+    A call in flight, which waiters wait for.
+    """
+    __slots__ = ('event', 'result', 'exc_info')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.exc_info = None
+
+
+class SingleFlight(object):
+    """
+    Runs at most one call per key at a time, sharing its outcome with every
+    call made with the same key while it runs.
+    """
+    def __init__(self):
+        self._flights = {}  # key -> ``_Flight``
+        self._lock = threading.Lock()
+
+    def call(self, key, func, waiting=None):
+        """
+        Returns the result of ``func()``, or of the call with the same ``key``
+        which is already in flight, in which case ``waiting`` (if provided) is
+        called first, without arguments. An exception raised by ``func`` is
+        raised to every caller.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                leader = True
+            else:
+                leader = False
+
+        if leader:
+            try:
+                flight.result = func()
+            except:
+                flight.exc_info = sys.exc_info()
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.event.set()
+        else:
+            if waiting is not None:
+                waiting()
+            flight.event.wait()
+
+        if flight.exc_info is not None:
+            raise flight.exc_info[0], flight.exc_info[1], flight.exc_info[2]
+        return flight.result
@@ -0,0 +1,98 @@
+"""
+Response compression, negotiated from the ``Accept-Encoding`` request header.
+Set ``compress`` on a service class (or use ``@jrpc(..., compress=True)``) to
+compress responses of at least ``compress_min_size`` bytes. Request bodies
+sent with ``Content-Encoding: gzip`` (or deflate) are always decompressed.
+"""
+import zlib
+from collections import OrderedDict
+
+
+# Supported content codings, most preferred first, and the ``zlib`` window
+# bits which produce each one's format ("deflate" is the zlib format).
+ENCODINGS = ('gzip', 'deflate')
+WBITS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+
+def parse_qvalues(header):
+    """
+    Returns a ``dict`` of (lowercased) token -> "q" value for the tokens of an
+    ``Accept``-style header value (e.g., ``'gzip;q=0.5, deflate'``), in the
+    order they appear. Tokens without a "q" value get ``1.0``, and those with
+    an invalid one get ``0.0``.
+    """
+    qvalues = OrderedDict()
+    for item in header.split(','):
+        token, _, params = item.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[token.strip().lower()] = q
+    return qvalues
+
+
+def accepted_encoding(accept_encoding):
+    """
+    Returns the most preferred of ``ENCODINGS`` which the ``Accept-Encoding``
+    header value allows (honoring "q" values, including "q=0"), or ``None``.
+    """
+    if not accept_encoding:
+        return None
+    qvalues = parse_qvalues(accept_encoding)
+    best = None
+    for encoding in ENCODINGS:
+        q = qvalues.get(encoding, qvalues.get('*', 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (encoding, q)
+    return best and best[0]
+
+
+def compress_bytes(data, encoding, level=6):
+    """
+    Returns ``data`` (a ``str``) compressed with ``encoding``.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, WBITS[encoding])
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_chunks(chunks, encoding, level=6):
+    """
+    Yields the chunks of ``chunks`` (``unicode`` or UTF-8 ``str`` objects)
+    compressed with ``encoding``, for streaming responses. Each chunk is
+    flushed, so clients can decode the response as it arrives.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, WBITS[encoding])
+    for chunk in chunks:
+        if isinstance(chunk, unicode):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def decompress_bytes(data, encoding, max_size):
+    """
+    Returns ``data`` decompressed with ``encoding``, or raises a
+    ``ValueError`` if it's larger than ``max_size`` bytes once decompressed (or
+    a ``zlib.error`` if it's corrupt). Decompression stops as soon as the
+    limit is passed, so "zip bombs" are never inflated in full. A
+    ``max_size`` of ``None`` doesn't limit the size.
+    """
+    decompressor = zlib.decompressobj(WBITS[encoding])
+    if max_size is None:
+        return decompressor.decompress(data) + decompressor.flush()
+    output = decompressor.decompress(data, max_size + 1)
+    if len(output) > max_size or decompressor.unconsumed_tail:
+        raise ValueError(u'Decompressed data is larger than {0} bytes'.format(
+            max_size))
+    output += decompressor.flush()
+    if len(output) > max_size:
+        raise ValueError(u'Decompressed data is larger than {0} bytes'.format(
+            max_size))
+    return output
@@ -0,0 +1,102 @@
+"""
+Futures for methods which do their work concurrently. A method may return a
+future instead of a result, and the service waits for it before responding.
+In a batch request, every member is dispatched before any future is waited
+for, so the work of several such methods overlaps.
+
+Usage::
+
+    # Inside of ``JSONRPCService`` sub-class
+    @jrpc('get_page(url=<str>) -> <str>')
+    def get_page(self, request, url):
+        return offload(fetch_url, url)
+
+"""
+import threading
+from multiprocessing.pool import ThreadPool
+
+from django.db import connection
+
+try:
+    from concurrent.futures import Future as _StdlibFuture
+except ImportError:  # The ``futures`` backport isn't installed.
+    _StdlibFuture = None
+
+
+# Number of threads used by ``offload``.
+OFFLOAD_WORKERS = 10
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class Future(object):
+    """
+    The result of a call made by ``offload``, which will be available when the
+    call returns.
+    """
+    __slots__ = ('_async_result',)
+
+    def __init__(self, async_result):
+        self._async_result = async_result
+
+    def done(self):
+        """
+        Returns whether or not the call has returned (or raised).
+        """
+        return self._async_result.ready()
+
+    def result(self, timeout=None):
+        """
+        Waits for the call to return, and returns its result (or raises the
+        exception it raised).
+        """
+        return self._async_result.get(timeout)
+
+
+# Future types which are waited for by ``JSONRPCService``.
+if _StdlibFuture is not None:
+    FUTURE_TYPES = (Future, _StdlibFuture)
+else:
+    FUTURE_TYPES = (Future,)
+
+
+def _get_pool():
+    """
+    Returns the thread pool used by ``offload`` (started on first use).
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPool(OFFLOAD_WORKERS)
+    return _pool
+
+
+def _run(func, args, kwargs):
+    """
+    Calls ``func(*args, **kwargs)`` on a pool thread, closing the thread's DB
+    connection afterwards, so that it isn't left open (or in a transaction).
+    """
+    try:
+        return func(*args, **kwargs)
+    finally:
+        connection.close()
+
+
+def offload(func, *args, **kwargs):
+    """
+    Calls ``func(*args, **kwargs)`` on a shared pool of threads, and returns a
+    ``Future`` for its result. Use this to run blocking (e.g., I/O-bound) code
+    from an RPC method without waiting for it.
+    """
+    return Future(_get_pool().apply_async(_run, (func, args, kwargs)))
+
+
+def resolve(result):
+    """
+    Returns the result of ``result`` if it's a future, or ``result`` itself.
+    """
+    if isinstance(result, FUTURE_TYPES):
+        return result.result()
+    return result
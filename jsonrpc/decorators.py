@@ -1,13 +1,15 @@
 """
 Provides ``jrpc`` for registering methods with a ``JSONRPCService``.
 """
-from functools import wraps
+from .procedures import Procedure
+from .signatures import parse_signature
+from .validators import ResultValidator, params_validator
 
-from .signatures import (
-    name_from_signature, params_from_signature, return_type_from_signature)
 
-
-def jrpc(signature, describe=True, summary=None, idempotent=False, docs=None):
+def jrpc(signature, describe=True, summary=None, idempotent=False, docs=None,
+         notification_only=False, stream=None, cache_timeout=None,
+         cache_vary=None, cache_control=None, etag=None, max_concurrency=None,
+         queue_timeout=None, rate_limit=None, compress=None, coalesce=False):
     """
     Use to wrap methods that belong to a ``service.JSONRPCService``. Methods
     which are wrapped in this decorator will be added to the service for access
@@ -24,37 +26,84 @@ def jrpc(signature, describe=True, summary=None, idempotent=False, docs=None):
     if callable(signature):
         raise TypeError(
             u'The ``jrpc`` decorator must be provided with a method signature')
+    if cache_timeout and not idempotent:
+        raise ValueError(
+            u'Only idempotent methods (``idempotent=True``) can be cached')
+    if coalesce and not idempotent:
+        raise ValueError(u'Only idempotent methods (``idempotent=True``) can '
+                         'be coalesced')
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError(u'``max_concurrency`` must be at least 1')
 
     def decorator(method):
         """
-        Adds a ``rpc_method_name`` attribute to methods decorated, giving
-        the method json-rpc method name (this is used by ``JSONRPCServiceMeta``
-        to register this method as a supported method. This requires a
-        ``JSONRPCService`` to register available methods on class creation,
-        instead of instantiation. Use ``describe=False`` to hide a method from
-        the service description.
+        Returns a ``procedures.Procedure`` for the method, which is used by
+        ``JSONRPCServiceMeta`` to register the method with the service (on
+        class creation, instead of instantiation), and which calls the method
+        directly when it's dispatched. Use ``describe=False`` to hide a method
+        from the service description, and ``notification_only=True`` to reject
+        any call to the method which isn't a notification (i.e., has an
+        ``id``).
+        Use ``stream=True`` (or ``False``) to override the service's
+        ``stream`` setting for responses to this method, and ``compress=True``
+        (or ``False``) to override its ``compress`` setting.
+
+        Idempotent methods may set ``cache_timeout`` (seconds) to have their
+        results cached in the service's ``result_cache``, keyed by params.
+        To also key results by user, etc., provide a ``cache_vary`` function,
+        which takes the service and the request and returns a JSON-encodable
+        value.
+
+        Responses to idempotent methods called via GET include an ETag (a hash
+        of the response), and a 304 is returned when the client already has
+        the response. Provide an ``etag`` function, which takes the service,
+        the request, and the (raw) params and returns a version token (or
+        ``None``), to avoid calling the method at all in that case. Provide
+        ``cache_control`` to add a Cache-Control header to those responses.
+
+        Use ``max_concurrency`` to limit the number of calls to the method
+        which run at once, via the service's ``admission`` controller. Other
+        calls wait for up to ``queue_timeout`` seconds (the controller's
+        default, if ``None``) and are then rejected with an ``OverloadedError``.
+        Use ``rate_limit=(calls, seconds)`` to limit how often each client may
+        call the method (see ``ratelimit``).
+
+        Idempotent methods may set ``coalesce=True`` to have identical calls
+        (with the same params, and ``cache_vary`` value) which are made while
+        one is running wait for, and share, its result (see ``coalesce``).
         """
-        method.rpc_method_name = name_from_signature(signature)
-        method.rpc_params = [{'name': p[0], 'type': p[1], 'optional': p[2]} for
-            p in params_from_signature(signature)]
-        method.describe = describe
-        method.return_type = return_type_from_signature(signature)
-
-        # Procedure description (for ``system.describe``).
-        method.description = {
-            'name': method.rpc_method_name,
-            'summary': summary,
-            'help': docs,
-            'idempotent': idempotent,
-            'params': method.rpc_params,
-            'return': method.return_type
-        }
-
-        @wraps(method)
-        def wrapper(*args, **kwargs):
-            """
-            Returns the value returned by calling the actual method.
-            """
-            return method(*args, **kwargs)
-        return wrapper
+        name, params, return_type = parse_signature(signature)
+        rpc_params = [{'name': p[0], 'type': p[1], 'optional': p[2]} for
+            p in params]
+        return Procedure(
+            method,
+            name=name,
+            params=rpc_params,
+            # Compiled once (for all methods with the same params), and used
+            # to validate the params of each call.
+            validator=params_validator(params),
+            return_type=return_type,
+            result_validator=ResultValidator(name, return_type),
+            # Procedure description (for ``system.describe``).
+            description={
+                'name': name,
+                'summary': summary,
+                'help': docs,
+                'idempotent': idempotent,
+                'params': rpc_params,
+                'return': return_type
+            },
+            describe=describe,
+            idempotent=idempotent,
+            notification_only=notification_only,
+            stream=stream,
+            compress=compress,
+            cache_timeout=cache_timeout,
+            cache_vary=cache_vary,
+            cache_control=cache_control,
+            etag=etag,
+            max_concurrency=max_concurrency,
+            queue_timeout=queue_timeout,
+            rate_limit=rate_limit,
+            coalesce=coalesce)
     return decorator
@@ -1,19 +1,90 @@
 import json
 import decimal
+import itertools
+from collections import Iterator
 from datetime import datetime, date, time
 
 from django.db import models
-from django.db.models.query import QuerySet
-from django.core.serializers import serialize
+from django.db.models.fields import DateField, DateTimeField, Field, TimeField
+from django.db.models.query import QuerySet, ValuesQuerySet
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils.functional import Promise
-from django.utils.encoding import force_unicode
+from django.utils.encoding import force_unicode, is_protected_type
+
+
+# Size (in bytes, roughly) of the chunks yielded by ``buffered``.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Implementations of ``Field.value_to_string`` which, for any value loaded from
+# the database, are equivalent to ``force_unicode`` (the date/time fields only
+# differ for values which aren't dates or times).
+PLAIN_VALUE_TO_STRING = frozenset(
+    f.value_to_string.im_func
+    for f in (Field, DateField, DateTimeField, TimeField))
+
+# Used to format dates, times, and decimals exactly like Django's serializer.
+_django_encoder = DjangoJSONEncoder()
+
+# Cache of ``_ModelSpec`` instances, keyed by model class.
+_model_specs = {}
+
+# Types of results which ``RobustEncoder`` encodes as each JSON type, in
+# addition to the types in ``JSONType.json_types``. Sub-classes count, too.
+ENCODED_TYPES = {
+    'bit': (bool,),
+    'num': (int, long, float),
+    'str': (basestring, Promise, decimal.Decimal, datetime, date, time),
+    'arr': (list, tuple, QuerySet, Iterator),
+    'obj': (dict, models.Model),
+}
+
+# Types which are left as they are by ``coerce``.
+_NATIVE_TYPES = frozenset([str, unicode, int, long, float, bool, type(None)])
+
+
+class RawJSON(unicode):
+    """
+    A value which has already been encoded as JSON. When returned by a method,
+    ``JSONRPCService`` inserts it into the response as is, instead of encoding
+    it again.
+    """
+
+
+class IterList(list):
+    """
+    A ``list`` stand-in for an iterable, which allows ``iterencode`` to encode
+    the items of the iterable one at a time, without ever holding all of them.
+    Only the first item is read up front (to know whether it's empty).
+    """
+    def __init__(self, iterable):
+        super(IterList, self).__init__()
+        self._iterator = iter(iterable)
+        try:
+            self._head = [next(self._iterator)]
+        except StopIteration:
+            self._head = []
+
+    def __len__(self):
+        return len(self._head)
+
+    def __iter__(self):
+        return itertools.chain(self._head, self._iterator)
 
 
 class RobustEncoder(json.JSONEncoder):
     """
     JSON encoder with support for ``QuerySet``, ``Model``, ``Promise``,
-    ``datetime``, ``date``, ``time``, and ``Decimal`` objects.
+    ``datetime``, ``date``, ``time``, and ``Decimal`` objects, as well as
+    iterators (e.g., generators), which are encoded as arrays.
+
+    When ``stream`` is ``True``, iterators and ``QuerySet`` objects are
+    consumed lazily (the latter via ``QuerySet.iterator``, which fetches rows
+    in chunks without caching them), for use with ``iterencode``.
     """
+    def __init__(self, *args, **kwargs):
+        self.stream = kwargs.pop('stream', False)
+        super(RobustEncoder, self).__init__(*args, **kwargs)
+
     def default(self, obj):
         """
         Provides custom functionality for certain types, defaulting to the
@@ -21,11 +92,19 @@ class RobustEncoder(json.JSONEncoder):
         """
         # QuerySet
         if isinstance(obj, QuerySet):
-            return json.loads(serialize('json', obj))
+            if self.stream:
+                return IterList(model_dicts(obj))
+            return list(model_dicts(obj))
 
         # Model
         if isinstance(obj, models.Model):
-            return json.loads(serialize('json', [obj]))[0]
+            return model_dict(obj)
+
+        # Iterators (e.g., generators) get encoded as arrays
+        if isinstance(obj, Iterator):
+            if self.stream:
+                return IterList(obj)
+            return list(obj)
 
         # Promise (e.g., ``ugettext_lazy``), and Decimal both get unicoded
         if isinstance(obj, (Promise, decimal.Decimal)):
@@ -36,3 +115,200 @@ class RobustEncoder(json.JSONEncoder):
             return unicode(obj.isoformat())
 
         return super(RobustEncoder, self).default(obj)
+
+
+class _ModelSpec(object):
+    """
+    The serialization metadata for a model, which is gathered once per model
+    (see ``_model_spec``).
+    """
+    __slots__ = ('label', 'values', 'extras')
+
+    def __init__(self, model):
+        self.label = force_unicode(model._meta)
+        # ``(name, attname, convert)`` for each field whose value is encoded
+        # from the field's value alone.
+        self.values = []
+        # ``(name, get)`` for each field which needs the instance, where
+        # ``get`` takes the instance and returns the encoded value.
+        self.extras = []
+
+        # Same fields, in the same order, as ``django.core.serializers``.
+        concrete_model = model._meta.concrete_model
+        for field in concrete_model._meta.local_fields:
+            if not field.serialize:
+                continue
+            if field.rel is not None:
+                self.values.append((field.name, field.attname, _json_value))
+            elif field.value_to_string.im_func in PLAIN_VALUE_TO_STRING:
+                self.values.append((field.name, field.attname, _field_value))
+            else:
+                self.extras.append((field.name, _custom_getter(field)))
+        for field in concrete_model._meta.many_to_many:
+            if field.serialize and field.rel.through._meta.auto_created:
+                self.extras.append((field.name, _m2m_getter(field)))
+
+
+def _model_spec(model):
+    """
+    Returns the (cached) ``_ModelSpec`` for ``model``.
+    """
+    try:
+        return _model_specs[model]
+    except KeyError:
+        return _model_specs.setdefault(model, _ModelSpec(model))
+
+
+def _json_value(value):
+    """
+    Returns ``value``, with dates, times, and decimals formatted like Django's
+    JSON serializer formats them.
+    """
+    if isinstance(value, (date, time, decimal.Decimal)):
+        return _django_encoder.default(value)
+    return value
+
+
+def _field_value(value):
+    """
+    Returns the serialized value of a (non-relational) field.
+    """
+    if is_protected_type(value):
+        return _json_value(value)
+    return force_unicode(value)
+
+
+def _custom_getter(field):
+    """
+    Returns a function which serializes ``field`` of an instance, for fields
+    with a custom ``value_to_string``.
+    """
+    def get(obj):
+        value = getattr(obj, field.attname)
+        if is_protected_type(value):
+            return _json_value(value)
+        return field.value_to_string(obj)
+    return get
+
+
+def _m2m_getter(field):
+    """
+    Returns a function which serializes the primary keys of the objects
+    related to an instance through the many-to-many ``field``.
+    """
+    def get(obj):
+        return [_json_value(force_unicode(r._get_pk_val(), strings_only=True))
+                for r in getattr(obj, field.name).iterator()]
+    return get
+
+
+def model_dict(obj, fields=None):
+    """
+    Returns a ``Model`` instance in the structure used by Django's JSON
+    serializer (a ``dict`` with "model", "pk", and "fields"), built directly
+    from the instance. Provide a sequence of field names as ``fields`` to only
+    include those fields.
+    """
+    spec = _model_spec(type(obj))
+    data = {}
+    for name, attname, convert in spec.values:
+        if fields is None or name in fields:
+            data[name] = convert(getattr(obj, attname))
+    for name, get in spec.extras:
+        if fields is None or name in fields:
+            data[name] = get(obj)
+    return {
+        'model': spec.label,
+        'pk': _json_value(force_unicode(obj._get_pk_val(), strings_only=True)),
+        'fields': data
+    }
+
+
+def model_dicts(objects, fields=None):
+    """
+    Returns an iterator of ``model_dict`` results for an iterable of ``Model``
+    instances. For a ``QuerySet`` whose model can be serialized from field
+    values alone, rows are fetched via ``values_list`` (of just the fields
+    requested, if ``fields`` is provided) so that no instances are created.
+    ``QuerySet`` objects which haven't been evaluated are read via
+    ``QuerySet.iterator``, to avoid caching the rows.
+    """
+    if not isinstance(objects, QuerySet):
+        return (model_dict(obj, fields) for obj in objects)
+    if isinstance(objects, ValuesQuerySet):
+        # Rows are already plain ``dict`` or ``tuple`` objects.
+        return iter(objects)
+    if objects._result_cache is not None:
+        return (model_dict(obj, fields) for obj in objects)
+
+    spec = _model_spec(objects.model)
+    if any(fields is None or name in fields for name, get in spec.extras):
+        return (model_dict(obj, fields) for obj in objects.iterator())
+    return _value_dicts(objects, spec, fields)
+
+
+def _value_dicts(queryset, spec, fields):
+    """
+    Yields a ``model_dict`` equivalent for each row of ``queryset``, using
+    ``values_list`` to fetch the rows.
+    """
+    values = [(idx, name, convert) for idx, (name, attname, convert) in
+              enumerate([v for v in spec.values if
+                         fields is None or v[0] in fields], 1)]
+    names = [name for idx, name, convert in values]
+    label = spec.label
+    for row in queryset.values_list('pk', *names).iterator():
+        data = {}
+        for idx, name, convert in values:
+            data[name] = convert(row[idx])
+        yield {
+            'model': label,
+            'pk': _json_value(force_unicode(row[0], strings_only=True)),
+            'fields': data
+        }
+
+
+def coerce(obj):
+    """
+    Returns ``obj`` with everything which ``RobustEncoder.default`` would
+    convert while encoding (``Decimal``, date and time, ``Promise``,
+    ``QuerySet``, and ``Model`` objects, and iterators) converted up front,
+    and tuples converted to lists. The result encodes to the same JSON as
+    ``obj``, and contains only types which every JSON backend supports.
+    """
+    obj_type = type(obj)
+    if obj_type in _NATIVE_TYPES or isinstance(obj, basestring):
+        return obj
+    if obj_type is list or obj_type is tuple:
+        return [coerce(value) for value in obj]
+    if isinstance(obj, dict):
+        return dict((key, coerce(value)) for key, value in obj.iteritems())
+    if isinstance(obj, (datetime, time, date)):
+        return unicode(obj.isoformat())
+    if isinstance(obj, (Promise, decimal.Decimal)):
+        return force_unicode(obj)
+    if isinstance(obj, QuerySet):
+        return [coerce(value) for value in model_dicts(obj)]
+    if isinstance(obj, models.Model):
+        return coerce(model_dict(obj))
+    if isinstance(obj, (Iterator, list, tuple)):
+        return [coerce(value) for value in obj]
+    return obj  # Left to the encoder (which may reject it).
+
+
+def buffered(chunks, size=STREAM_CHUNK_SIZE):
+    """
+    Joins the (typically tiny) strings yielded by ``iterencode`` into chunks of
+    at least ``size`` characters, to avoid a write per JSON token.
+    """
+    buf = []
+    buf_len = 0
+    for chunk in chunks:
+        buf.append(chunk)
+        buf_len += len(chunk)
+        if buf_len >= size:
+            yield u''.join(buf)
+            buf = []
+            buf_len = 0
+    if buf:
+        yield u''.join(buf)
@@ -44,6 +44,16 @@ class InvalidRequestError(JSONRPCError):
     details = u'The JSON sent is not a valid Request object.'
 
 
+class RequestTooLargeError(InvalidRequestError):
+    """
+    The request body is larger than the service allows (see
+    ``JSONRPCService.max_body_size`` and ``max_decompressed_size``).
+    """
+    message = u'Request too large'
+    http_status = 413
+    details = u'The request body is too large.'
+
+
 class MethodNotFoundError(JSONRPCError):
     """
     The requested JSON-RPC method is not registered with the service.
@@ -80,3 +90,26 @@ class ServerError(JSONRPCError):
     """
     code = -32099
     message = u'Server error'
+
+
+class OverloadedError(ServerError):
+    """
+    The method (or the service) is handling as many calls as it's allowed to
+    at once (see ``admission``), so the call was rejected. Clients may retry
+    later.
+    """
+    code = -32098
+    message = u'Server overloaded'
+    http_status = 503
+    details = u'The server is too busy to handle the call. Try again later.'
+
+
+class RateLimitedError(ServerError):
+    """
+    The client has made more calls than its rate limit allows (see
+    ``ratelimit``). The details say how long to wait before retrying.
+    """
+    code = -32097
+    message = u'Too many requests'
+    http_status = 429
+    details = u'The rate limit has been exceeded. Try again later.'
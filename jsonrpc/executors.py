@@ -0,0 +1,115 @@
+"""
+Executors for running JSON-RPC notifications after the response has been sent
+(or at least, without making the client wait for them).
+"""
+import Queue
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+
+def _run(func, args, kwargs):
+    """
+    Calls a job on a worker thread, logging any exception it raises, and then
+    closes the thread's DB connection, so that it isn't left open (or in a
+    transaction) until the next job.
+    """
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception(u'Error running queued job')
+    finally:
+        connection.close()
+
+
+class BaseExecutor(object):
+    """
+    The executor interface used by ``JSONRPCService.notification_executor``.
+    Sub-classes must implement ``submit``.
+    """
+    def submit(self, func, *args, **kwargs):
+        """
+        Schedules ``func(*args, **kwargs)`` to be called. The return value of
+        the call is discarded, since notifications have no response.
+        """
+        raise NotImplementedError
+
+
+class InlineExecutor(BaseExecutor):
+    """
+    Calls each job immediately, in the current thread (i.e., before the
+    response is returned). Useful for tests.
+    """
+    def submit(self, func, *args, **kwargs):
+        func(*args, **kwargs)
+
+
+class ThreadPoolExecutor(BaseExecutor):
+    """
+    Calls each job on an in-process, bounded pool of threads. The pool isn't
+    started until the first job is submitted.
+    """
+    def __init__(self, workers=4):
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPool(self.workers)
+        self._pool.apply_async(_run, (func, args, kwargs))
+
+
+class LocalQueue(Queue.Queue):
+    """
+    A local stand-in for a message queue backend. Jobs ``put`` on the queue are
+    consumed by a single daemon thread in the current process.
+    """
+    def __init__(self, maxsize=0):
+        Queue.Queue.__init__(self, maxsize)
+        self._consumer = threading.Thread(target=self._consume)
+        self._consumer.daemon = True
+        self._consumer.start()
+
+    def _consume(self):
+        """
+        Runs each job on the queue, forever.
+        """
+        while True:
+            func, args, kwargs = self.get()
+            try:
+                _run(func, args, kwargs)
+            finally:
+                self.task_done()
+
+
+class QueueExecutor(BaseExecutor):
+    """
+    Puts each job on a queue as a ``(func, args, kwargs)`` tuple. Provide any
+    object with a ``put`` method which hands jobs off to your queue backend,
+    or leave it out to use a ``LocalQueue`` (created on first use).
+    """
+    def __init__(self, queue=None):
+        self._queue = queue
+        self._lock = threading.Lock()
+
+    @property
+    def queue(self):
+        """
+        Returns the queue jobs are put on.
+        """
+        if self._queue is None:
+            with self._lock:
+                if self._queue is None:
+                    self._queue = LocalQueue()
+        return self._queue
+
+    def submit(self, func, *args, **kwargs):
+        self.queue.put((func, args, kwargs))
@@ -12,8 +12,8 @@ class JSONType(object):
         'str': (basestring, str, unicode),
         'arr': (list,),
         'obj': (dict,),
-        'nil': (None,),
-        'any': (bool, float, int, str, unicode, list, dict, None),
+        'nil': (type(None),),
+        'any': (bool, float, int, str, unicode, list, dict, type(None)),
     }
 
     def __init__(self, type_key):
@@ -0,0 +1,305 @@
+"""
+Per-method metrics (call and error counts, phase latencies, DB queries, and
+coalesced calls).
+Set ``metrics`` on a service class to one of the sinks below to collect them.
+"""
+import time
+import socket
+import bisect
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+
+
+# The phases of handling a call, in order.
+PHASES = ('parse', 'validate', 'dispatch', 'encode')
+
+# Method name used to record batch requests (as a whole), and calls to methods
+# which don't exist (so that clients can't create unbounded metrics).
+BATCH = u'(batch)'
+UNKNOWN = u'(unknown)'
+
+
+class Timer(object):
+    """
+    Times the phases of a single call, and counts the DB queries run during
+    the call (which are only logged by Django when ``settings.DEBUG`` is
+    ``True``, or when ``track_queries`` is ``True``). The name of the method
+    called and the error code (if any) are filled in as they become known.
+    ``profiled`` is set for calls which are profiled (see ``profile``), and
+    ``coalesced`` for calls which shared the result of an identical call (see
+    ``coalesce``).
+    """
+    __slots__ = ('method_name', 'error_code', 'phases', 'queries',
+                 'query_time', 'previous', 'profiled', 'coalesced', '_last',
+                 '_query_start', '_track_queries', '_use_debug_cursor')
+
+    def __init__(self, track_queries=False):
+        self.method_name = UNKNOWN
+        self.error_code = None
+        self.phases = {}
+        self.queries = 0
+        self.query_time = 0.0
+        self.previous = None  # The timer this one is nested in (if any).
+        self.profiled = False
+        self.coalesced = False
+        self._track_queries = track_queries
+        if track_queries:
+            self._use_debug_cursor = connection.use_debug_cursor
+            connection.use_debug_cursor = True
+        self._query_start = len(connection.queries)
+        self._last = time.time()
+
+    def mark(self, phase):
+        """
+        Adds the time since the last mark (or since the timer started) to
+        ``phase``.
+        """
+        now = time.time()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def profile(self, top=5):
+        """
+        Returns a compact profile of the call so far: the number and total
+        time (seconds) of the DB queries run, the ``top`` slowest of them, and
+        the time spent in each phase.
+        """
+        queries = connection.queries[self._query_start:]
+        slowest = sorted(queries, key=lambda q: float(q['time']),
+                         reverse=True)[:top]
+        return {
+            'queries': {
+                'count': len(queries),
+                'time': sum(float(q['time']) for q in queries),
+                'slowest': [{'sql': q['sql'], 'time': float(q['time'])}
+                            for q in slowest],
+            },
+            'phases': dict(self.phases),
+        }
+
+    def finish(self):
+        """
+        Counts the queries run since the timer started.
+        """
+        queries = connection.queries[self._query_start:]
+        self.queries = len(queries)
+        self.query_time = sum(float(q['time']) for q in queries)
+        if self._track_queries:
+            connection.use_debug_cursor = self._use_debug_cursor
+            if not settings.DEBUG and self.previous is None:
+                # The query log is only reset when a request starts, so on
+                # pool threads it would grow forever. Outside of debug mode,
+                # nothing else reads it, so this call's queries are removed
+                # (unless an enclosing timer still needs them).
+                del connection.queries[self._query_start:]
+
+
+class BaseSink(object):
+    """
+    The interface of a metrics sink. Sub-classes must implement ``record``.
+    """
+    def record(self, method_name, phases, error_code=None, queries=0,
+               query_time=0.0, coalesced=False):
+        """
+        Records a call to a method, with a ``dict`` of phase -> seconds, the
+        JSON-RPC error code (if the call failed), the number and total time
+        (seconds) of DB queries run, and whether or not the call waited for an
+        identical call's result instead of running the method.
+        """
+        raise NotImplementedError
+
+
+class Histogram(object):
+    """
+    A histogram of durations (in seconds), with fixed buckets.
+    """
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # The last is "+Inf".
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+class MethodStats(object):
+    """
+    Aggregated metrics for a single method.
+    """
+    __slots__ = ('calls', 'errors', 'histograms', 'queries', 'query_time',
+                 'coalesced')
+
+    def __init__(self, buckets):
+        self.calls = 0
+        self.errors = {}  # JSON-RPC error code -> count
+        self.histograms = dict((phase, Histogram(buckets)) for phase in PHASES)
+        self.queries = 0
+        self.query_time = 0.0
+        self.coalesced = 0
+
+
+class MemorySink(BaseSink):
+    """
+    Aggregates metrics in memory (per process). Use ``snapshot`` to read them.
+    """
+    # Upper bounds (in seconds) of the latency histogram buckets.
+    buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+               2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=None):
+        if buckets is not None:
+            self.buckets = tuple(sorted(buckets))
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, method_name, phases, error_code=None, queries=0,
+               query_time=0.0, coalesced=False):
+        with self._lock:
+            try:
+                stats = self._stats[method_name]
+            except KeyError:
+                stats = self._stats[method_name] = MethodStats(self.buckets)
+            stats.calls += 1
+            if error_code is not None:
+                stats.errors[error_code] = stats.errors.get(error_code, 0) + 1
+            for phase, seconds in phases.iteritems():
+                stats.histograms[phase].observe(seconds)
+            stats.queries += queries
+            stats.query_time += query_time
+            if coalesced:
+                stats.coalesced += 1
+
+    def snapshot(self):
+        """
+        Returns a ``dict`` of method name -> metrics, with "calls", "errors"
+        (code -> count), "phases" (phase -> "count", "sum", and "buckets"),
+        "queries", "query_time", and "coalesced" (the number of calls which
+        waited for an identical call).
+        """
+        with self._lock:
+            return dict((method_name, {
+                'calls': stats.calls,
+                'errors': dict(stats.errors),
+                'phases': dict((phase, {
+                    'count': h.count,
+                    'sum': h.sum,
+                    'buckets': list(h.counts),
+                }) for phase, h in stats.histograms.iteritems() if h.count),
+                'queries': stats.queries,
+                'query_time': stats.query_time,
+                'coalesced': stats.coalesced,
+            }) for method_name, stats in self._stats.iteritems())
+
+    def reset(self):
+        """
+        Discards all metrics collected so far.
+        """
+        with self._lock:
+            self._stats = {}
+
+
+class PrometheusSink(MemorySink):
+    """
+    Aggregates metrics in memory, and renders them in the Prometheus text
+    exposition format. Route a URL to ``view`` to expose them for scraping.
+    """
+    namespace = 'jsonrpc'
+
+    def render(self):
+        """
+        Returns the metrics in the Prometheus text format.
+        """
+        ns = self.namespace
+        snapshot = self.snapshot()
+        lines = [u'# TYPE {n}_calls_total counter'.format(n=ns)]
+        for name, stats in sorted(snapshot.iteritems()):
+            lines.append(u'{n}_calls_total{{method="{m}"}} {v}'.format(
+                n=ns, m=name, v=stats['calls']))
+        lines.append(u'# TYPE {n}_errors_total counter'.format(n=ns))
+        for name, stats in sorted(snapshot.iteritems()):
+            for code, count in sorted(stats['errors'].iteritems()):
+                lines.append(
+                    u'{n}_errors_total{{method="{m}",code="{c}"}} {v}'.format(
+                        n=ns, m=name, c=code, v=count))
+        lines.append(u'# TYPE {n}_phase_seconds histogram'.format(n=ns))
+        for name, stats in sorted(snapshot.iteritems()):
+            for phase in PHASES:
+                if phase not in stats['phases']:
+                    continue
+                h = stats['phases'][phase]
+                labels = u'method="{m}",phase="{p}"'.format(m=name, p=phase)
+                bucket = u'{n}_phase_seconds_bucket{{{l},le="{le}"}} {v}'
+                cumulative = 0
+                for le, count in zip(self.buckets + ('+Inf',), h['buckets']):
+                    cumulative += count
+                    lines.append(bucket.format(
+                        n=ns, l=labels, le=le, v=cumulative))
+                lines.append(u'{n}_phase_seconds_sum{{{l}}} {v}'.format(
+                    n=ns, l=labels, v=h['sum']))
+                lines.append(u'{n}_phase_seconds_count{{{l}}} {v}'.format(
+                    n=ns, l=labels, v=h['count']))
+        lines.append(u'# TYPE {n}_db_queries_total counter'.format(n=ns))
+        for name, stats in sorted(snapshot.iteritems()):
+            lines.append(u'{n}_db_queries_total{{method="{m}"}} {v}'.format(
+                n=ns, m=name, v=stats['queries']))
+        lines.append(u'# TYPE {n}_db_query_seconds_total counter'.format(n=ns))
+        for name, stats in sorted(snapshot.iteritems()):
+            lines.append(
+                u'{n}_db_query_seconds_total{{method="{m}"}} {v}'.format(
+                    n=ns, m=name, v=stats['query_time']))
+        lines.append(u'# TYPE {n}_coalesced_total counter'.format(n=ns))
+        for name, stats in sorted(snapshot.iteritems()):
+            lines.append(u'{n}_coalesced_total{{method="{m}"}} {v}'.format(
+                n=ns, m=name, v=stats['coalesced']))
+        return u'\n'.join(lines) + u'\n'
+
+    def view(self, request):
+        """
+        A Django view which returns the rendered metrics.
+        """
+        return HttpResponse(self.render(),
+                            content_type='text/plain; version=0.0.4')
+
+
+class StatsdSink(BaseSink):
+    """
+    Sends metrics to a statsd server over UDP (one packet per call), as
+    ``<prefix>.<method>.calls``, ``<prefix>.<method>.errors.<code>``,
+    ``<prefix>.<method>.<phase>`` (ms), ``<prefix>.<method>.db.queries``,
+    ``<prefix>.<method>.db.time`` (ms), and ``<prefix>.<method>.coalesced``.
+    Dots in method names are replaced with underscores.
+    """
+    def __init__(self, host='localhost', port=8125, prefix='jsonrpc'):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def record(self, method_name, phases, error_code=None, queries=0,
+               query_time=0.0, coalesced=False):
+        name = u'{p}.{m}'.format(p=self.prefix,
+                                 m=method_name.replace(u'.', u'_'))
+        lines = [u'{n}.calls:1|c'.format(n=name)]
+        if error_code is not None:
+            lines.append(u'{n}.errors.{c}:1|c'.format(n=name, c=error_code))
+        for phase, seconds in phases.iteritems():
+            lines.append(u'{n}.{p}:{v:.3f}|ms'.format(
+                n=name, p=phase, v=seconds * 1000))
+        if queries:
+            lines.append(u'{n}.db.queries:{v}|c'.format(n=name, v=queries))
+            lines.append(u'{n}.db.time:{v:.3f}|ms'.format(
+                n=name, v=query_time * 1000))
+        if coalesced:
+            lines.append(u'{n}.coalesced:1|c'.format(n=name))
+        try:
+            self._socket.sendto(u'\n'.join(lines).encode('utf-8'),
+                                self.address)
+        except socket.error:
+            pass  # Metrics are best-effort.
@@ -0,0 +1,85 @@
+"""
+The objects which make up a service's dispatch table. ``jrpc`` replaces each
+method it decorates with a ``Procedure``, and ``JSONRPCServiceMeta`` collects
+the procedures of a service class (and its bases) into a ``DispatchTable``.
+"""
+
+
+class _FunctionAttribute(str):
+    """
+    A class attribute of ``Procedure`` (its ``__module__`` or ``__doc__``),
+    which is read from the function of a procedure instead. A ``str`` so that
+    the class's own value is unchanged.
+    """
+    def __new__(cls, value, name):
+        attribute = str.__new__(cls, value)
+        attribute.name = name
+        return attribute
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return getattr(instance.func, self.name)
+
+
+class Procedure(object):
+    """
+    An RPC method: the function itself (``func``, which is called directly,
+    without a wrapper), its compiled params ``validator`` and
+    ``result_validator``, its flags, and its description. Procedures are
+    immutable.
+
+    As a descriptor, a procedure still behaves like the method it replaces, so
+    ``service.method(request, ...)`` calls the function as usual. Its
+    ``__name__``, ``__module__`` and ``__doc__`` are those of the function
+    (for decorators which use ``functools.wraps``).
+    """
+    __doc__ = _FunctionAttribute(__doc__, '__doc__')
+    __module__ = _FunctionAttribute(__module__, '__module__')
+    __slots__ = ('func', '__name__', 'name', 'params', 'validator',
+                 'return_type', 'result_validator', 'description', 'describe',
+                 'idempotent', 'notification_only', 'stream', 'compress',
+                 'cache_timeout', 'cache_vary', 'cache_control', 'etag',
+                 'max_concurrency', 'queue_timeout', 'rate_limit', 'coalesce')
+
+    def __init__(self, func, **attrs):
+        object.__setattr__(self, 'func', func)
+        object.__setattr__(self, '__name__', func.__name__)
+        for name in self.__slots__[2:]:
+            object.__setattr__(self, name, attrs.pop(name, None))
+        if attrs:
+            raise TypeError(u'Unexpected procedure attributes: {0}'.format(
+                u', '.join(sorted(attrs))))
+
+    # The names of ``name`` and ``params`` before they were procedures.
+    rpc_method_name = property(lambda self: self.name)
+    rpc_params = property(lambda self: self.params)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(u'Procedures are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(u'Procedures are immutable')
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return self.func.__get__(instance, owner)
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return '<Procedure {0}>'.format(self.name)
+
+
+class DispatchTable(dict):
+    """
+    An immutable ``dict`` of RPC method name -> ``Procedure``. Lookups are
+    those of a plain ``dict``.
+    """
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(u'Dispatch tables are immutable')
+
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
@@ -0,0 +1,124 @@
+"""
+Per-client rate limiting, with token buckets. Set ``rate_limit`` on a service
+class to limit the calls each client may make to the service, and use
+``@jrpc(..., rate_limit=(calls, seconds))`` to limit calls to a method. Clients
+are identified by ``JSONRPCService.rate_limit_identity`` (their IP address, by
+default), and the buckets are kept in the service's ``rate_limit_store``.
+
+A limit of ``(calls, seconds)`` allows bursts of up to ``calls`` calls, and
+refills at a rate of ``calls`` per ``seconds``.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+from django.core.cache import get_cache
+
+
+class BaseRateLimitStore(object):
+    """
+    The interface of a token bucket store. Sub-classes must implement
+    ``consume``, and should implement ``refund``.
+    """
+    def consume(self, key, calls, seconds):
+        """
+        Takes a token from the bucket ``key`` (a ``unicode``), which holds up
+        to ``calls`` tokens and refills at ``calls`` per ``seconds``. Returns
+        ``0`` if a token was taken, otherwise the number of seconds until one
+        will be available.
+        """
+        raise NotImplementedError
+
+    def refund(self, key, calls, seconds):
+        """
+        Puts back a token taken from the bucket ``key`` by ``consume`` (for a
+        call which was then rejected by another limit). Stores which don't
+        support this simply keep the token.
+        """
+
+
+def _take(bucket, calls, seconds, now):
+    """
+    Returns a 2-tuple of the updated ``(tokens, timestamp)`` bucket (a full
+    bucket if ``bucket`` is ``None``), and the seconds to wait for a token
+    (``0`` if one was taken).
+    """
+    rate = float(calls) / seconds
+    if bucket is None:
+        tokens = float(calls)
+    else:
+        tokens, timestamp = bucket
+        tokens = min(float(calls), tokens + (now - timestamp) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / rate
+
+
+def _put_back(bucket, calls):
+    """
+    Returns ``bucket`` with a token put back (``None`` if it's missing, or
+    full again).
+    """
+    if bucket is None:
+        return None
+    tokens, timestamp = bucket
+    if tokens + 1 >= calls:
+        return None
+    return tokens + 1, timestamp
+
+
+class LocalRateLimitStore(BaseRateLimitStore):
+    """
+    An in-process store, which holds up to ``max_entries`` buckets, evicting
+    the least recently used bucket when full (an evicted bucket is simply
+    full again).
+    """
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()  # key -> ``(tokens, timestamp)``
+        self._lock = threading.Lock()
+
+    def consume(self, key, calls, seconds):
+        with self._lock:
+            bucket, wait = _take(self._buckets.pop(key, None), calls, seconds,
+                                 time.time())
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def refund(self, key, calls, seconds):
+        with self._lock:
+            bucket = _put_back(self._buckets.get(key), calls)
+            if bucket is None:
+                self._buckets.pop(key, None)
+            else:
+                self._buckets[key] = bucket
+
+
+class DjangoRateLimitStore(BaseRateLimitStore):
+    """
+    A store backed by one of the caches in ``settings.CACHES``, which shares
+    buckets between processes. Updates aren't atomic, so concurrent calls from
+    one client may occasionally be let through over the limit.
+    """
+    def __init__(self, alias='default', key_prefix='jsonrpc:rl'):
+        self.cache = get_cache(alias)
+        self.key_prefix = key_prefix
+
+    def consume(self, key, calls, seconds):
+        cache_key = u'{p}:{k}'.format(p=self.key_prefix, k=key)
+        bucket, wait = _take(self.cache.get(cache_key), calls, seconds,
+                             time.time())
+        # The bucket is full again (i.e., the same as a missing one) once
+        # ``seconds`` have passed.
+        self.cache.set(cache_key, bucket, int(seconds) + 1)
+        return wait
+
+    def refund(self, key, calls, seconds):
+        cache_key = u'{p}:{k}'.format(p=self.key_prefix, k=key)
+        bucket = _put_back(self.cache.get(cache_key), calls)
+        if bucket is None:
+            self.cache.delete(cache_key)
+        else:
+            self.cache.set(cache_key, bucket, int(seconds) + 1)
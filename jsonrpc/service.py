@@ -1,12 +1,33 @@
 import sys
-import logging
 import json
+import zlib
+import random
+import uuid
+import hashlib
+import logging
 import urllib2
+import itertools
+import threading
 import traceback
+from multiprocessing.pool import ThreadPool
 
 from django.db import connection
-from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from django.http import HttpResponse, HttpResponseNotModified
+try:
+    from django.http import StreamingHttpResponse
+except ImportError:  # Django < 1.5 streams an ``HttpResponse`` iterator.
+    StreamingHttpResponse = HttpResponse
 
+from .admission import AdmissionController
+from .backends import StdlibBackend, accepted_backend
+from .cache import MISSING, cacheable
+from .coalesce import SingleFlight
+from .compression import (
+    WBITS, accepted_encoding, compress_bytes, compress_chunks,
+    decompress_bytes)
+from .concurrency import FUTURE_TYPES, resolve
 from .decorators import jrpc
 from .errors import (
     InternalError,
@@ -14,40 +35,71 @@ from .errors import (
     InvalidRequestError,
     JSONRPCError,
     MethodNotFoundError,
-    ParseError
+    ParseError,
+    RateLimitedError,
+    RequestTooLargeError
 )
 from .jsontype import JSONType
-from .encoders import RobustEncoder
+from .encoders import RawJSON, RobustEncoder, buffered, coerce
+from .metrics import BATCH, Timer
+from .procedures import DispatchTable, Procedure
+from .ratelimit import LocalRateLimitStore
 
 
 logger = logging.getLogger(__name__)
 
 
+def _describe_etag(service, request, params):
+    """
+    The ``etag`` hook of ``system.describe``, which returns the ETag of the
+    cached service description.
+    """
+    if isinstance(params, list):
+        compact = params[0] if params else None
+    elif isinstance(params, dict):
+        compact = params.get('compact')
+    else:
+        return None
+    return service._description(bool(compact))[1]
+
+
 class JSONRPCServiceMeta(type):
     """
     A meta-class - adds an ``rpc_methods`` attribute to sub-classes, providing
-    a dictionary of name -> method access to RPC methods.
+    an immutable dispatch table of name -> ``Procedure`` for RPC methods.
     """
     def __new__(mcs, name, bases, dct):
         """
-        Attaches a dictionary of methods defined on the class being created
-        that have an ``rpc_method_name`` attribute.
+        Attaches a dispatch table of the procedures (methods decorated with
+        ``jrpc``) defined on the class being created, and on its bases. A
+        class which adds no procedures to a single base's table shares that
+        table (tables are immutable), instead of copying it.
         """
-        dct['rpc_methods'] = {}
+        tables = []
         for base in bases:
+            table = getattr(base, 'rpc_methods', None)
+            # Some mixin or ``object`` has no table, and bases which share a
+            # table only need it once.
+            if table is not None and not any(t is table for t in tables):
+                tables.append(table)
+        procedures = [member for member in dct.itervalues()
+                      if isinstance(member, Procedure)]
+
+        if len(tables) == 1 and not procedures:
+            dct['rpc_methods'] = tables[0]
+            return type.__new__(mcs, name, bases, dct)
+
+        methods = {}
+        for table in tables:
             # Update the methods dict from all bases, overwriting each parent
             # class's RPC methods with any sub-class methods of the same name,
             # so that designers of service classes may use natural inheritance.
-            try:
-                dct['rpc_methods'].update(base.rpc_methods)
-            except AttributeError:  # Some mixin or ``object`` was encountered.
-                pass
-
-        for member in dct.itervalues():
-            if hasattr(member, 'rpc_method_name'):
-                # Add, or update this key on the rpc methods dict.
-                dct['rpc_methods'][member.rpc_method_name] = member
+            methods.update(table)
+        for member in procedures:
+            # Add, or update this key on the rpc methods dict.
+            methods[member.name] = member
 
+        dct['rpc_methods'] = DispatchTable(methods)
         return type.__new__(mcs, name, bases, dct)
 
 
@@ -76,9 +128,128 @@ class JSONRPCService(object):
     service_help = None  # URL to documentation for this service.
     service_address = None  # Endpoint for this service (ie, URL).
 
+    # The JSON backend (see ``backends``) used to parse requests and encode
+    # responses. Use ``backends.best_available()`` for speed (``OrjsonBackend``
+    # or, on Python 2, ``UjsonBackend``, if either is installed).
+    json_backend = StdlibBackend()
+
+    # Binary backends (see ``backends``), e.g., ``(MsgpackBackend(),)``, which
+    # are used instead of ``json_backend`` for POST requests sent with one of
+    # their ``content_type`` values as the Content-Type, and for responses to
+    # clients which prefer one in their Accept header (otherwise, responses
+    # are in the format of the request). Binary responses aren't streamed.
+    binary_backends = ()
+
+    # A result cache (see ``cache``) for methods decorated with
+    # ``@jrpc(..., idempotent=True, cache_timeout=<seconds>)``. ``None``
+    # disables result caching.
+    result_cache = None
+
+    # A metrics sink (see ``metrics``), which receives the call count, errors,
+    # phase latencies, and DB queries of each call. ``None`` disables metrics.
+    metrics = None
+
+    # Whether or not to log DB queries, for metrics, even when
+    # ``settings.DEBUG`` is ``False`` (otherwise, queries are only counted
+    # in debug mode).
+    metrics_queries = False
+
+    # The fraction (0 to 1) of calls to profile, recording the number and
+    # total time of DB queries, the ``profile_top_queries`` slowest queries,
+    # and the time spent in each phase. ``None`` disables profiling. Unlike
+    # debug mode, this is cheap enough to leave on under load (e.g., in
+    # staging), since unprofiled calls pay nothing.
+    profile_rate = None
+    profile_top_queries = 5
+
+    # Where profiles are written: "body" (a ``debug`` object in the response,
+    # which is added before the response is encoded, so it has no "encode"
+    # phase), "header" (an ``X-JSONRPC-Profile`` header, as JSON), or "log".
+    profile_output = 'body'
+
+    # Whether or not to check the result of each call against the return type
+    # of the method's signature, raising an ``InternalError`` on a mismatch
+    # (instead of returning a result which clients don't expect). ``True``
+    # checks every call, and a fraction (e.g., ``0.01``) checks that fraction
+    # of calls, for production. Every call is checked in debug mode. Results
+    # which are futures aren't checked.
+    check_results = False
+
+    # Whether or not to convert results to plain JSON types (``Decimal`` and
+    # ``Promise`` objects to strings, dates and times to ISO 8601 strings,
+    # ``QuerySet`` and ``Model`` objects to ``dict`` objects, etc.) once, when
+    # a method returns, instead of in the encoder's ``default`` fallback for
+    # each object. Useful with JSON backends which don't support those types
+    # natively, and for results which are cached. Streamed results aren't
+    # coerced.
+    coerce_results = False
+
     # Allowed JSON-P padding names. Override in sub-classes to allow less/more.
     padding_names = ('callback', 'jsoncallback')
 
+    # Number of threads used to run the members of a batch request
+    # concurrently. ``None`` runs them sequentially, in the order received.
+    batch_workers = None
+
+    # An executor (see ``executors``) used to run notifications without making
+    # the client wait. ``None`` runs them before the (empty) response is sent.
+    notification_executor = None
+
+    # Whether or not to stream responses, encoding results (e.g., lists,
+    # generators, and ``QuerySet`` objects) incrementally, instead of holding
+    # the entire result and its JSON in memory. Methods may override this via
+    # ``@jrpc(..., stream=True)``. Errors that occur while streaming can't be
+    # reported to the client, so the response is simply cut short. Streamed
+    # responses are always encoded by the standard library's ``json`` module.
+    stream = False
+
+    # Whether or not to compress responses (with gzip, or deflate), when the
+    # client accepts it. Methods may override this via
+    # ``@jrpc(..., compress=True)``. Only responses of at least
+    # ``compress_min_size`` bytes are compressed, since compressing small
+    # responses costs more than it saves. Streamed responses are always
+    # compressed, since their size isn't known up front.
+    compress = False
+    compress_min_size = 1024
+    compress_level = 6
+
+    # The largest request body (in bytes, as sent) accepted. Bodies which are
+    # too large are rejected without being read, when the client sends a
+    # Content-Length header. ``None`` accepts bodies of any size.
+    max_body_size = None
+
+    # The largest size (in bytes) that a request body sent with
+    # ``Content-Encoding: gzip`` (or deflate) may decompress to. ``None``
+    # doesn't limit it (which leaves the service open to "zip bombs").
+    max_decompressed_size = 10 * 1024 * 1024
+
+    # The limit on concurrent calls to all methods of the service (``None``
+    # for no limit), and the default number of seconds calls wait for a slot,
+    # which each instance's admission controller (see ``admission``) is
+    # created with. Methods decorated with ``@jrpc(..., max_concurrency=N)``
+    # are always limited.
+    max_concurrency = None
+    queue_timeout = 0
+
+    # An ``AdmissionController`` to use instead of each instance's own (e.g.,
+    # to share limits between services).
+    admission = None
+
+    # A ``(calls, seconds)`` limit on the calls each client (see
+    # ``rate_limit_identity``) may make to the service, in addition to the
+    # limits of methods decorated with ``@jrpc(..., rate_limit=...)``. ``None``
+    # doesn't limit calls to the service as a whole.
+    rate_limit = None
+
+    # The store (see ``ratelimit``) which holds the token bucket of each
+    # client. Use ``ratelimit.DjangoRateLimitStore()`` to share buckets
+    # between processes.
+    rate_limit_store = LocalRateLimitStore()
+
+    # Runs identical concurrent calls to methods decorated with
+    # ``@jrpc(..., idempotent=True, coalesce=True)`` once (see ``coalesce``).
+    coalescer = SingleFlight()
+
     def __init__(self, debug=False, get=False, http_errors=True, **kwargs):
         """
         When debug is ``True`` JSON output is formatted using indentation,
@@ -103,6 +274,20 @@ class JSONRPCService(object):
         #
         self.pretty = kwargs.pop('pretty', self.debug)
 
+        # Thread pool for concurrent batch requests (created on first use).
+        self._batch_pool = None
+        self._batch_pool_lock = threading.Lock()
+
+        # The metrics ``Timer`` of the call being handled by each thread.
+        self._timers = threading.local()
+
+        # Encoded service descriptions (see ``_description``).
+        self._descriptions = {}
+
+        if self.admission is None:
+            self.admission = AdmissionController(
+                self.max_concurrency, self.queue_timeout)
+
     def __call__(self, request):
         """
         Calling a service requires an HTTP request object, and returns an HTTP
@@ -110,56 +295,533 @@ class JSONRPCService(object):
         ``settings.DEBUG`` is set to ``True``, at which point the exception is
         raised to allow Django's built-in exception handling to take over.
         """
-        # Get the IP address of the client for logging, etc.
-        remote_addr = request.META['REMOTE_ADDR']
+        profiled = (self.profile_rate is not None and
+                    random.random() < self.profile_rate)
+        if self.metrics is None and not profiled:
+            return self._respond(request)
+        timer = self._start_timer(profiled)
+        try:
+            http_response = self._respond(request)
+            if profiled and self.profile_output != 'body':
+                self._write_profile(request, http_response, timer)
+            return http_response
+        finally:
+            self._finish_timer(timer)
 
+    def _respond(self, request):
+        """
+        Returns the HTTP response for a request (see ``__call__``).
+        """
         # Get JSON-P padding from the request (if applicable).
         padding = self._json_padding_or_none(request)
+        # Get the binary backends to parse the request, and to encode the
+        # response with (``None`` for JSON).
+        request_backend, backend = self._negotiate(request)
+        negotiated = self._negotiates(request)
 
         try:
             # Get the deserialized request JSON.
-            json_req = self._get_json_req(request)
+            json_req = self._get_json_req(request, request_backend)
+        except JSONRPCError, ex:
+            self._record_error(ex.code)
+            http_response = self._response(
+                ex=ex, padding=padding, backend=backend)
+            if negotiated:
+                patch_vary_headers(http_response, ('Accept',))
+            return http_response
+        self._mark('parse')
+
+        if isinstance(json_req, list):
+            # A batch request gets an array of response objects.
+            timer = self._timer()
+            if timer is not None:
+                timer.method_name = BATCH
+            responses = self._batch(request, json_req)
+            http_response = self._http_response(
+                responses, status=200 if responses else 204, padding=padding,
+                stream=self.stream,
+                encoding=self._encoding(request, self.compress),
+                backend=backend)
+            if self.compress:
+                patch_vary_headers(http_response, ('Accept-Encoding',))
+            if negotiated:
+                patch_vary_headers(http_response, ('Accept',))
+            if timer is not None:
+                timer.mark('encode')
+            return http_response
+
+        # Idempotent methods called via GET get conditional responses.
+        method = self._conditional_method(request, json_req)
+        etag = None
+        error = None
+        if method is not None and method.etag is not None:
+            # The method provides a cheap version token, which allows us to
+            # respond with a 304 without even calling the method (though the
+            # checks made before calling it are still made).
+            etag = self._hook_etag(request, method, json_req)
+            if etag is not None and self._etag_matches(request, etag):
+                error = self._precall_error(request, method, json_req)
+                if error is None:
+                    return self._not_modified(method, etag)
+
+        response, status = error or self._resolve(
+            request, *self._handle(request, json_req))
+        if response is not None and 'error' in response:
+            self._record_error(response['error']['code'])
+        stream = self._streams(response, json_req)
+        compresses = self._compresses(json_req)
+        http_response = self._http_response(
+            response, status=status, padding=padding, stream=stream,
+            encoding=self._encoding(request, compresses), backend=backend)
+        if compresses:
+            patch_vary_headers(http_response, ('Accept-Encoding',))
+        if negotiated:
+            patch_vary_headers(http_response, ('Accept',))
+        self._mark('encode')
+        succeeded = response is not None and 'result' in response
+        if method is not None and succeeded:
+            if etag is None and not stream:
+                etag = hashlib.md5(http_response.content).hexdigest()
+            return self._conditional_response(
+                request, method, http_response, etag)
+        return http_response
+
+    def _handle(self, request, json_req):
+        """
+        Processes a single JSON request object (either the entire request, or
+        one member of a batch request), returning a 2-tuple of the JSON-RPC
+        response object (a ``dict``) and the HTTP status it warrants. If the
+        method returned a future, the response's result is the future (see
+        ``_resolve``).
+        """
+        # Get the IP address of the client for logging, etc.
+        remote_addr = request.META['REMOTE_ADDR']
+
+        try:
+            if not isinstance(json_req, dict):
+                raise InvalidRequestError(
+                    details=u'Each request must be a JSON object')
+            # A request without an ``id`` is a notification.
+            notification = 'id' not in json_req
             # Get the ID.
-            rid = self._valid_jsonrpc_id(json_req)
+            rid = None if notification else self._valid_jsonrpc_id(json_req)
         except JSONRPCError, ex:
-            return self._response(ex=ex, padding=padding)
+            return self._response_dict(ex=ex), self._http_status(ex)
 
         try:
             # Check the "jsonrpc" argument.
             self._validate_jsonrpc_verion(json_req)
+            if notification:
+                # Notifications never receive a response, unless the request
+                # object is too malformed to be recognized as one.
+                method = self._valid_jsonrpc_method(json_req)
+                self._name_timer(method)
+                params = self._valid_jsonrpc_params(json_req)
         except JSONRPCError, ex:
-            return self._response(ex=ex, rid=rid, padding=padding)
+            return self._response_dict(ex=ex, rid=rid), self._http_status(ex)
+
+        if notification:
+            self._notify(request, json_req, method, params)
+            return None, 204
 
         try:
             # Get the method (we'll validate it later).
             method = self._valid_jsonrpc_method(json_req)
+            # Record the call under the method's name, even if it's rejected
+            # before being dispatched.
+            self._name_timer(method)
             # Get the parameters from the JSON object.
             params = self._valid_jsonrpc_params(json_req)
-            # Call extra validation hook
-            self._validate_extra(request, json_req)
+            self._check_call(request, method, json_req)
             logger.debug(u'{i} calling method `{m}` on `{c}`'.format(
                 i=remote_addr, m=method, c=type(self).__name__))
             # Attempt to dispatch the requested method.
             result = self._dispatch(request, method, params)
+            self._mark('dispatch')
         except Exception, ex:
-            if isinstance(ex, JSONRPCError):
-                logger.debug(u'Error from {i}: {m}'.format(
-                    i=remote_addr, m=ex.details))
-            else:
-                logger.exception(u'Error from {i}'.format(i=remote_addr))
+            return self._error_response(request, ex, rid)
+        else:
+            # Return successful response back to client.
+            return self._response_dict(result=result, rid=rid), 200
 
-            # If in debug mode and the request isn't an AJAX request and the
-            # error is not a ``JSONRPCError``, we'll re-raise to allow Django's
-            # default error handling take over
-            if self.debug and not request.is_ajax():
-                if not isinstance(ex, JSONRPCError):
-                    raise
+    def _check_call(self, request, method_name, json_req):
+        """
+        Makes the checks which are made before calling a method (but after
+        the request object itself has been validated): rate limits, whether or
+        not the method may only be notified, and ``_validate_extra``.
+        """
+        # Check rate limits before doing any real work.
+        self._check_rate_limits(request, method_name)
+        if getattr(self.methods.get(method_name), 'notification_only', False):
+            raise InvalidRequestError(
+                details=u'Method `{0}` may only be called as a '
+                'notification (without an `id`)'.format(method_name))
+        # Call extra validation hook
+        self._validate_extra(request, json_req)
 
-            # Return an error response
-            return self._response(ex=ex, rid=rid, padding=padding)
+    def _error_response(self, request, ex, rid):
+        """
+        Logs ``ex``, an exception raised while calling a method, and returns a
+        2-tuple of the error response object and its HTTP status. This must be
+        called while ``ex`` is being handled.
+        """
+        remote_addr = request.META['REMOTE_ADDR']
+        if isinstance(ex, JSONRPCError):
+            logger.debug(u'Error from {i}: {m}'.format(
+                i=remote_addr, m=ex.details))
         else:
-            # Return successful response back to client.
-            return self._response(result=result, rid=rid, padding=padding)
+            logger.exception(u'Error from {i}'.format(i=remote_addr))
+
+        # If in debug mode and the request isn't an AJAX request and the
+        # error is not a ``JSONRPCError``, we'll re-raise to allow Django's
+        # default error handling take over
+        if self.debug and not request.is_ajax():
+            if not isinstance(ex, JSONRPCError):
+                raise
+
+        # Return an error response
+        return self._response_dict(ex=ex, rid=rid), self._http_status(ex)
+
+    def _resolve(self, request, response, status):
+        """
+        Takes the 2-tuple returned by ``_handle``, and if the response's result
+        is a future (see ``concurrency``), waits for it, returning a 2-tuple
+        with the actual result (or the error raised).
+        """
+        if response is None or not isinstance(
+                response.get('result'), FUTURE_TYPES):
+            return response, status
+        try:
+            response['result'] = response['result'].result()
+        except Exception, ex:
+            return self._error_response(request, ex, response['id'])
+        self._mark('dispatch')
+        return response, status
+
+    def _start_timer(self, profiled=False):
+        """
+        Starts a metrics ``Timer`` for a call, as the current thread's timer.
+        """
+        timer = Timer(self.metrics_queries or profiled)
+        timer.profiled = profiled
+        timer.previous = getattr(self._timers, 'current', None)
+        self._timers.current = timer
+        return timer
+
+    def _finish_timer(self, timer):
+        """
+        Stops a metrics ``Timer``, and records the call in ``metrics``.
+        """
+        timer.finish()
+        self._timers.current = timer.previous
+        if self.metrics is None:
+            return  # The timer was only used for profiling.
+        self.metrics.record(timer.method_name, timer.phases, timer.error_code,
+                            timer.queries, timer.query_time, timer.coalesced)
+
+    def _timer(self):
+        """
+        Returns the metrics ``Timer`` of the current call, or ``None`` if
+        metrics are disabled (and the call isn't profiled).
+        """
+        if self.metrics is None and self.profile_rate is None:
+            return None
+        return getattr(self._timers, 'current', None)
+
+    def _name_timer(self, method_name):
+        """
+        Sets the method name the current call is recorded under, if it names
+        one of the service's methods (other names aren't recorded, to keep the
+        number of them bounded).
+        """
+        timer = self._timer()
+        if timer is not None and method_name in self.rpc_methods:
+            timer.method_name = method_name
+
+    def _mark(self, phase):
+        """
+        Marks the end of a phase of the current call (for metrics).
+        """
+        timer = self._timer()
+        if timer is not None:
+            timer.mark(phase)
+
+    def _write_profile(self, request, http_response, timer):
+        """
+        Writes the profile of a call to ``profile_output`` ("header" or "log").
+        """
+        profile = timer.profile(self.profile_top_queries)
+        if self.profile_output == 'header':
+            http_response['X-JSONRPC-Profile'] = json.dumps(
+                profile, separators=(',', ':'))
+        else:
+            logger.info(u'Profile of `{m}` from {i}: {p}'.format(
+                m=timer.method_name, i=request.META['REMOTE_ADDR'],
+                p=json.dumps(profile, separators=(',', ':'))))
+
+    def _record_error(self, code):
+        """
+        Records the JSON-RPC error code of the current call (for metrics).
+        """
+        timer = self._timer()
+        if timer is not None:
+            timer.error_code = code
+
+    def _conditional_method(self, request, json_req):
+        """
+        Returns the method requested by ``json_req`` if the request is a GET
+        request for an idempotent method (which may be answered with a 304, and
+        cached by browsers, etc.), otherwise ``None``.
+        """
+        if request.method != 'GET' or not self.get:
+            return None
+        if not isinstance(json_req, dict) or 'id' not in json_req:
+            return None  # Notifications never receive a response.
+        name = json_req.get('method')
+        if not isinstance(name, basestring):
+            return None
+        method = self.methods.get(name)
+        if method is None or not method.idempotent:
+            return None
+        return method
+
+    def _precall_error(self, request, method, json_req):
+        """
+        Makes the checks ``_handle`` makes before calling ``method`` (of the
+        request object, ``_check_call``, and of the params), for a call which
+        is answered without calling it. Returns a 2-tuple of the error
+        response object and its HTTP status if a check fails, otherwise
+        ``None``.
+        """
+        try:
+            rid = self._valid_jsonrpc_id(json_req)
+        except JSONRPCError, ex:
+            return self._response_dict(ex=ex), self._http_status(ex)
+        self._name_timer(method.name)
+        try:
+            self._validate_jsonrpc_verion(json_req)
+            params = self._valid_jsonrpc_params(json_req)
+            self._check_call(request, method.name, json_req)
+            self._valid_params(method, params)
+        except Exception, ex:
+            return self._error_response(request, ex, rid)
+        return None
+
+    def _hook_etag(self, request, method, json_req):
+        """
+        Returns an ETag built from the version token returned by the method's
+        ``etag`` hook (and the query string, which determines the rest of the
+        response), or ``None`` if the hook returns ``None``.
+        """
+        token = method.etag(self, request, json_req.get('params'))
+        if token is None:
+            return None
+        return hashlib.md5(u'{t}:{q}'.format(
+            t=token, q=request.META.get('QUERY_STRING', u'')).encode(
+                'utf-8')).hexdigest()
+
+    def _etag_matches(self, request, etag):
+        """
+        Returns whether or not ``etag`` matches the request's If-None-Match
+        header.
+        """
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if not if_none_match:
+            return False
+        etags = parse_etags(if_none_match)
+        return etag in etags or '*' in etags
+
+    def _conditional_response(self, request, method, http_response, etag):
+        """
+        Returns a 304 response if ``etag`` matches the request's If-None-Match
+        header, otherwise ``http_response`` with ETag and Cache-Control headers
+        added.
+        """
+        if etag is not None:
+            if self._etag_matches(request, etag):
+                return self._not_modified(method, etag)
+            http_response['ETag'] = quote_etag(etag)
+        if method.cache_control is not None:
+            http_response['Cache-Control'] = method.cache_control
+        return http_response
+
+    def _not_modified(self, method, etag):
+        """
+        Returns an ``HttpResponseNotModified`` for ``etag``.
+        """
+        http_response = HttpResponseNotModified()
+        http_response['ETag'] = quote_etag(etag)
+        if method.cache_control is not None:
+            http_response['Cache-Control'] = method.cache_control
+        return http_response
+
+    def _streams(self, response, json_req):
+        """
+        Returns whether or not ``response`` (the response to ``json_req``)
+        should be streamed. Only successful responses are streamed.
+        """
+        if response is None or 'result' not in response:
+            return False
+        if isinstance(response['result'], RawJSON):
+            return False  # Already encoded.
+        stream = getattr(self.methods.get(json_req['method']), 'stream', None)
+        if stream is None:
+            return self.stream
+        return stream
+
+    def _compresses(self, json_req):
+        """
+        Returns whether or not the response to ``json_req`` may be compressed.
+        """
+        method_name = json_req.get('method')
+        method = None
+        if isinstance(method_name, basestring):
+            method = self.methods.get(method_name)
+        compresses = getattr(method, 'compress', None)
+        if compresses is None:
+            return self.compress
+        return compresses
+
+    def _encoding(self, request, compresses):
+        """
+        Returns the content coding to compress the response to ``request``
+        with, or ``None``.
+        """
+        if not compresses:
+            return None
+        return accepted_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+
+    def _notify(self, request, json_req, method, params):
+        """
+        Handles a notification (a request without an ``id``), by running the
+        method, or handing it to ``notification_executor``. Errors are logged,
+        since there is no response to report them in.
+        """
+        remote_addr = request.META['REMOTE_ADDR']
+        try:
+            self._check_rate_limits(request, method)
+            # Call extra validation hook (before anything is scheduled).
+            self._validate_extra(request, json_req)
+        except JSONRPCError, ex:
+            logger.debug(u'Error from {i}: {m}'.format(
+                i=remote_addr, m=ex.details))
+            return
+        except Exception:
+            logger.exception(u'Error from {i}'.format(i=remote_addr))
+            return
+
+        if self.notification_executor is None:
+            self._run_notification(request, method, params)
+        else:
+            self.notification_executor.submit(
+                self._run_notification, request, method, params)
+
+    def _run_notification(self, request, method, params):
+        """
+        Dispatches a notification, logging any error that occurs.
+        """
+        remote_addr = request.META['REMOTE_ADDR']
+        logger.debug(u'{i} notifying method `{m}` on `{c}`'.format(
+            i=remote_addr, m=method, c=type(self).__name__))
+        try:
+            resolve(self._dispatch(request, method, params))
+        except JSONRPCError, ex:
+            logger.debug(u'Error from {i}: {m}'.format(
+                i=remote_addr, m=ex.details))
+        except Exception:
+            logger.exception(u'Error from {i}'.format(i=remote_addr))
+
+    def rate_limit_identity(self, request):
+        """
+        Returns the identity of the client making ``request``, which its rate
+        limits are applied to (its IP address, by default). Override this to
+        limit by user, API key, etc. Clients with an identity of ``None``
+        aren't rate limited.
+        """
+        return request.META.get('REMOTE_ADDR')
+
+    def _check_rate_limits(self, request, method_name):
+        """
+        Takes a token from the client's buckets for the service and for the
+        method (if they're rate limited), or raises a ``RateLimitedError``
+        (after putting back any token taken, so that rejected calls don't use
+        up the client's quota).
+        """
+        method = self.methods.get(method_name)
+        method_limit = getattr(method, 'rate_limit', None)
+        if self.rate_limit is None and method_limit is None:
+            return
+        identity = self.rate_limit_identity(request)
+        if identity is None:
+            return
+        service = u'{m}.{c}'.format(
+            m=type(self).__module__, c=type(self).__name__)
+        limits = []
+        if self.rate_limit is not None:
+            limits.append((u'{s}:{i}'.format(s=service, i=identity),
+                           self.rate_limit))
+        if method_limit is not None:
+            limits.append((u'{s}.{m}:{i}'.format(
+                s=service, m=method_name, i=identity), method_limit))
+        for i, (key, (calls, seconds)) in enumerate(limits):
+            wait = self.rate_limit_store.consume(key, calls, seconds)
+            if wait:
+                for taken, limit in limits[:i]:
+                    self.rate_limit_store.refund(taken, *limit)
+                raise RateLimitedError(details=u'Rate limit exceeded; retry '
+                                       u'in {0:.1f} seconds'.format(wait))
+
+    def _batch(self, request, json_reqs):
+        """
+        Processes each member of a batch request, returning a list of response
+        objects, or ``None`` if the batch contained only notifications. When
+        ``batch_workers`` is set, members are run concurrently on a bounded
+        thread pool, otherwise they're run one after another. Either way,
+        responses are returned in the order of the requests.
+
+        Futures returned by methods aren't waited for until every member has
+        been dispatched, so that their work runs concurrently.
+        """
+        def handle(json_req):
+            if self.metrics is None:
+                return self._handle(request, json_req)
+            # Each member is recorded as a call of its own.
+            timer = self._start_timer()
+            try:
+                response, status = self._handle(request, json_req)
+                if response is not None and 'error' in response:
+                    timer.error_code = response['error']['code']
+                return response, status
+            finally:
+                self._finish_timer(timer)
+
+        def pooled(json_req):
+            try:
+                return handle(json_req)
+            finally:
+                # Each pool thread has a DB connection of its own, which
+                # mustn't be left open (or in a transaction) between members.
+                connection.close()
+
+        if self.batch_workers and len(json_reqs) > 1:
+            handled = self._get_batch_pool().map(pooled, json_reqs)
+        else:
+            handled = [handle(json_req) for json_req in json_reqs]
+        responses = [self._resolve(request, response, status)[0]
+                     for response, status in handled]
+        # Notifications don't get a response object.
+        return [r for r in responses if r is not None] or None
+
+    def _get_batch_pool(self):
+        """
+        Returns the thread pool used for batch requests, creating it on first
+        use, so that services which never receive batches don't start threads.
+        """
+        if self._batch_pool is None:
+            with self._batch_pool_lock:
+                if self._batch_pool is None:
+                    self._batch_pool = ThreadPool(self.batch_workers)
+        return self._batch_pool
 
     @property
     def proc_descriptions(self):
@@ -171,15 +833,44 @@ class JSONRPCService(object):
     @property
     def methods(self):
         """
-        Returns the dictionary of methods attached to a ``JSONRPCService``
-        during class creation (ones decorated by ``decorators.jrpc``).
+        Returns the dispatch table of procedures attached to a
+        ``JSONRPCService`` during class creation (methods decorated by
+        ``decorators.jrpc``).
         """
         return self.rpc_methods
 
-    def _get_json_req(self, request):
+    def _negotiate(self, request):
+        """
+        Returns a 2-tuple of the binary backends (see ``binary_backends``) to
+        parse ``request`` with, and to encode the response with, where
+        ``None`` means JSON. GET requests always use JSON.
+        """
+        if not self._negotiates(request):
+            return None, None
+        content_type = request.META.get('CONTENT_TYPE', '')
+        content_type = content_type.partition(';')[0].strip().lower()
+        request_backend = None
+        for backend in self.binary_backends:
+            if backend.content_type == content_type:
+                request_backend = backend
+                break
+        return request_backend, accepted_backend(
+            request.META.get('HTTP_ACCEPT'), self.binary_backends,
+            request_backend)
+
+    def _negotiates(self, request):
+        """
+        Returns whether or not the response to ``request`` is encoded with a
+        backend chosen from its Accept header (so that it must vary on it).
+        """
+        return bool(self.binary_backends) and request.method == 'POST'
+
+    def _get_json_req(self, request, backend=None):
         """
         Returns a JSON request object (as defined in JSON-RPC 2.0 spec), or
         raises a ``JSONRPCError``, if there is a problem with the request.
+        POST requests are parsed by ``backend`` (a binary backend), if
+        provided.
         """
         if request.method == 'GET':
             try:
@@ -193,40 +884,89 @@ class JSONRPCService(object):
                     raise InvalidRequestError(
                         u'The "json" URL argument cannot be empty')
             try:
-                json_req = json.loads(urllib2.unquote(urlencoded_json))
-                if not isinstance(json_req, dict):
-                    raise InvalidRequestError(
-                        details=u'The JSON provided must be an object')
-                return json_req
+                json_req = self.json_backend.loads(
+                    urllib2.unquote(urlencoded_json))
             except ValueError:
                 raise ParseError
         elif request.method == 'POST':
             try:
-                json_req = json.loads(request.body)
+                json_req = (backend or self.json_backend).loads(
+                    self._get_body(request))
             except ValueError:
                 raise ParseError
-            else:
-                if not isinstance(json_req, dict):
-                    raise InvalidRequestError(
-                        details=u'The JSON provided must be an object')
-                return json_req
         else:
             # This was a PUT or HEAD request.
             raise InvalidRequestError(
                 details=u'Invalid request method. Method must be GET or POST, '
                 'not {m}'.format(m=request.method))
 
+        if not isinstance(json_req, (dict, list)):
+            raise InvalidRequestError(
+                details=u'The JSON provided must be an object or an array')
+        if isinstance(json_req, list) and not json_req:
+            raise InvalidRequestError(
+                details=u'A batch request must contain at least one request')
+        return json_req
+
+    def _get_body(self, request):
+        """
+        Returns the (decompressed) body of a POST request, or raises a
+        ``RequestTooLargeError`` if it's larger than ``max_body_size``, or
+        larger than ``max_decompressed_size`` once decompressed.
+        """
+        if self.max_body_size is None:
+            body = request.body
+        else:
+            try:
+                length = int(request.META.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                length = 0
+            if length > self.max_body_size:
+                raise RequestTooLargeError(
+                    details=u'The request body may not be larger than {0} '
+                    'bytes'.format(self.max_body_size))
+            # ``request.body`` (rather than ``request.read``), so the body is
+            # still available to middleware, etc. afterwards. Django reads no
+            # more than Content-Length, which has been checked, but the size
+            # of the body is checked, too, in case it was wrong.
+            body = request.body
+            if len(body) > self.max_body_size:
+                raise RequestTooLargeError(
+                    details=u'The request body may not be larger than {0} '
+                    'bytes'.format(self.max_body_size))
+
+        encoding = request.META.get('HTTP_CONTENT_ENCODING', '').lower()
+        if not encoding or encoding == 'identity':
+            return body
+        if encoding not in WBITS:
+            raise InvalidRequestError(
+                details=u'Unsupported Content-Encoding `{0}`'.format(encoding))
+        try:
+            return decompress_bytes(body, encoding, self.max_decompressed_size)
+        except ValueError:
+            raise RequestTooLargeError(
+                details=u'The request body may not be larger than {0} bytes '
+                'once decompressed'.format(self.max_decompressed_size))
+        except zlib.error:
+            raise InvalidRequestError(
+                details=u'The request body could not be decompressed')
+
     def _valid_jsonrpc_id(self, json_req):
         """
         Returns a valid ``int`` or ``str`` id from a JSON request object, or
         raises a ``JSONRPCError``, if the id is missing or of invalid type.
+        Requests without an id are notifications, and aren't validated here.
         """
         try:
             rid = json_req['id']
         except KeyError:
             raise InvalidRequestError(details=u'A request `id` is required')
         if not isinstance(rid, (int, basestring)):
-            json_type = JSONType.by_python_type(type(rid))
+            try:
+                json_type = JSONType.by_python_type(type(rid))
+            except ValueError:
+                # E.g., a ``long``, for an integer too large to be an id.
+                json_type = type(rid).__name__
             raise InvalidRequestError(
                 details=u'Request `id` must be a `str` or `int` (string or '
                 'integer), not `{t}`'.format(t=json_type))
@@ -300,30 +1040,63 @@ class JSONRPCService(object):
         """
         pass
 
-    def _response(self, ex=None, result=None, rid=None, padding=None):
+    def _response(self, ex=None, result=None, rid=None, padding=None,
+                  backend=None):
         """
         Takes an ``Exception`` instance or a hashable result from a service
         method, an ID (if available), and JSON-P padding (if applicable).
         Returns an ``HTTPResponse`` instance. If no result or exception is
         provided, a general server error will be returned.
         """
+        return self._http_response(
+            self._response_dict(ex=ex, result=result, rid=rid),
+            status=self._http_status(ex), padding=padding, backend=backend)
+
+    def _response_dict(self, ex=None, result=None, rid=None):
+        """
+        Returns a JSON-RPC response object (a ``dict``) containing either an
+        error object built from ``ex``, or the result.
+        """
         response = {
             'id': rid,
             'jsonrpc': self.jsonrpc_version,
         }
         if ex is not None:
             response['error'] = self._error_dict(ex)
-            if self.http_errors:
-                status = getattr(ex, 'http_status', 500)
-            else:
-                # This breaks the specification in an attempt to make errors
-                # easily recoverable for AJAX clients by always returning 200.
-                status = 200
         else:
             response['result'] = result
-            status = 200
+        return response
 
-        if self.debug:
+    def _http_status(self, ex=None):
+        """
+        Returns the HTTP status code for a response to a request which raised
+        ``ex``, or 200 if no exception was raised.
+        """
+        if ex is None:
+            return 200
+        if self.http_errors:
+            return getattr(ex, 'http_status', 500)
+        # This breaks the specification in an attempt to make errors
+        # easily recoverable for AJAX clients by always returning 200.
+        return 200
+
+    def _http_response(self, response, status=200, padding=None,
+                       stream=False, encoding=None, backend=None):
+        """
+        Takes a response object (or a list of them, for batch requests), an
+        HTTP status, and JSON-P padding (if applicable). Returns an
+        ``HTTPResponse`` instance containing the encoded response, or an empty
+        one if the response is ``None`` (i.e., for notifications). When
+        ``stream`` is ``True``, a streaming response is returned instead.
+        When ``encoding`` (e.g., "gzip") is provided, the response is
+        compressed with it, if it's large enough. When ``backend`` (a binary
+        backend) is provided, the response is encoded with it, instead of as
+        JSON (and isn't streamed).
+        """
+        if response is None:
+            return HttpResponse(status=status)
+
+        if self.debug and isinstance(response, dict):
             # Add a ``debug`` object with DB queries to the response.
             response['debug'] = {
                 'queries': {
@@ -331,79 +1104,118 @@ class JSONRPCService(object):
                     'data': connection.queries
                 }
             }
+        elif self.profile_output == 'body' and isinstance(response, dict):
+            timer = self._timer()
+            if timer is not None and timer.profiled:
+                # Add a compact ``debug`` object with the call's profile.
+                response['debug'] = timer.profile(self.profile_top_queries)
 
-        if self.pretty:
-            # Turn on pretty JSON formatting with indentation.
-            json_output = json.dumps(response, indent=4, cls=RobustEncoder)
+        if backend is not None:
+            response = self._binary_output(response, backend)
+            content_type = backend.content_type
+        elif stream and not self._has_raw_json(response):
+            # Responses with results which are already encoded aren't
+            # streamed, since the streaming encoder would encode them again.
+            return self._streaming_http_response(
+                response, status, padding, encoding)
         else:
-            # Turn off pretty JSON formatting and remove indentation.
-            json_output = json.dumps(
-                response, separators=(',', ':'), cls=RobustEncoder)
+            response = self._json_output(response, padding)
+            content_type = self.content_type
+
+        if encoding is not None:
+            if isinstance(response, unicode):
+                response = response.encode('utf-8')
+            if len(response) >= self.compress_min_size:
+                http_response = HttpResponse(
+                    compress_bytes(response, encoding, self.compress_level),
+                    status=status, content_type=content_type)
+                http_response['Content-Encoding'] = encoding
+                return http_response
+        return HttpResponse(response, status=status, content_type=content_type)
+
+    @staticmethod
+    def _has_raw_json(response):
+        """
+        Returns whether or not any result in ``response`` (or in the list of
+        them) is a ``RawJSON`` object.
+        """
+        for r in (response if isinstance(response, list) else [response]):
+            if isinstance(r.get('result'), RawJSON):
+                return True
+        return False
+
+    def _json_output(self, response, padding=None):
+        """
+        Returns a response object (or a list of them) encoded as JSON by
+        ``json_backend``, with JSON-P padding (if applicable).
+        """
+        # Results which are already encoded are replaced with placeholders,
+        # and inserted into the encoded response afterwards.
+        raw = []
+        for r in (response if isinstance(response, list) else [response]):
+            if isinstance(r.get('result'), RawJSON):
+                placeholder = uuid.uuid4().hex
+                raw.append((u'"{0}"'.format(placeholder), r['result']))
+                r['result'] = placeholder
+
+        json_output = self.json_backend.dumps(response, pretty=self.pretty)
+        for placeholder, result in raw:
+            if isinstance(json_output, bytes):
+                placeholder = placeholder.encode('utf-8')
+                result = result.encode('utf-8')
+            json_output = json_output.replace(placeholder, result, 1)
 
         if padding is not None:  # Add the JSON-P padding to response.
-            response = u'{p}({j})'.format(p=padding, j=json_output)
+            if isinstance(json_output, bytes):
+                json_output = json_output.decode('utf-8')
+            return u'{p}({j})'.format(p=padding, j=json_output)
+        return json_output
+
+    @staticmethod
+    def _binary_output(response, backend):
+        """
+        Returns a response object (or a list of them) encoded by ``backend``, a
+        binary backend.
+        """
+        # Results which are already encoded as JSON are decoded, so that they
+        # can be encoded in the binary format.
+        for r in (response if isinstance(response, list) else [response]):
+            if isinstance(r.get('result'), RawJSON):
+                r['result'] = json.loads(r['result'])
+        return backend.dumps(response)
+
+    def _streaming_http_response(self, response, status=200, padding=None,
+                                 encoding=None):
+        """
+        Returns a ``StreamingHttpResponse`` which encodes ``response`` (and
+        compresses it with ``encoding``, if provided) as it's being sent.
+        """
+        if self.pretty:
+            encoder = RobustEncoder(stream=True, indent=4)
         else:
-            response = json_output
-        return HttpResponse(response, status=status,
-                            content_type=self.content_type)
+            encoder = RobustEncoder(stream=True, separators=(',', ':'))
+        chunks = encoder.iterencode(response)
+
+        if padding is not None:  # Add the JSON-P padding to response.
+            chunks = itertools.chain(
+                [u'{p}('.format(p=padding)], chunks, [u')'])
+        chunks = buffered(chunks)
+        if encoding is not None:
+            chunks = compress_chunks(chunks, encoding, self.compress_level)
+        http_response = StreamingHttpResponse(chunks, status=status,
+                                              content_type=self.content_type)
+        if encoding is not None:
+            http_response['Content-Encoding'] = encoding
+        return http_response
 
     @staticmethod
     def _valid_params(method, params):
         """
         Validates type, and number of params. Raises ``ParamsError`` when a
-        missmatch is found.
-        """
-        # ``list`` (JavaScript Array) based "params"
-        if isinstance(params, list):
-            params_list = []
-            for idx, defined in enumerate(method.rpc_params):
-                try:
-                    provided = params[idx]
-                except IndexError:
-                    # JSON-RPC 1.1 spec states that parameters should be
-                    # replaced with a "nil" object, but instead let's raise an
-                    # exception, unless the param is marked optional with "?".
-                    if defined['optional']:
-                        provided = None  # Set value to "nil" (None)
-                    else:
-                        raise InvalidParamsError(
-                            details=u'Parameter `{0}` is required, but was '
-                            'not provided'.format(defined['name']))
-                if not type(provided) == JSONType(defined['type']):
-                    if defined['optional'] and provided is None:
-                        pass  # Optional params are allowed to be "nil"
-                    else:
-                        raise InvalidParamsError(
-                            details=u'`{0}` param should be of type '
-                            '{1}'.format(defined['name'], defined['type']))
-                params_list.append(provided)
-            return params_list
-        # ``dict`` (JavaScript object) based "params"
-        elif isinstance(params, dict):
-            params_dict = {}
-            for defined in method.rpc_params:
-                name = defined['name']
-                try:
-                    provided = params[name]
-                except KeyError:
-                    if defined['optional']:
-                        provided = None  # Set value to "nil" (None)
-                    else:
-                        raise InvalidParamsError(
-                            details=u'Parameter `{0}` is required, but was '
-                            'not provided'.format(defined['name']))
-                if not type(provided) == JSONType(defined['type']):
-                    if defined['optional'] and provided is None:
-                        pass  # Optional params are allowed to be "nil"
-                    else:
-                        raise InvalidParamsError(
-                            details=u'`{0}` param should be of type '
-                            '{1}'.format(defined['name'], defined['type']))
-                params_dict[name] = provided
-            return params_dict
-        else:
-            raise InvalidParamsError(
-                details=u'The `params` argument must be an array or object')
+        missmatch is found. The validation itself is done by the method's
+        ``validators.ParamsValidator``, which ``jrpc`` compiles up front.
+        """
+        return method.validator(params)
 
     def _error_dict(self, ex):
         """
@@ -434,11 +1246,18 @@ class JSONRPCService(object):
         ``self.methods`` with the provided arguments.
         """
         try:
-            method = self.methods[method_name]
+            # The dispatch table itself, rather than ``self.methods``, which
+            # would add a property call to each dispatch.
+            method = self.rpc_methods[method_name]
         except KeyError:
             raise MethodNotFoundError(
                 details=u'Method `{0}` not found'.format(method_name))
-        if request.method == 'GET' and not self.get:
+        self._name_timer(method_name)
+        timer = self._timer()
+        # Calls made over a WebSocket (see ``websocket``) arrive with the GET
+        # request which opened the connection, but aren't GET calls.
+        if (request.method == 'GET' and not self.get and
+                not hasattr(request, 'jsonrpc_session')):
             raise MethodNotFoundError(
                 details=u'Method `{0}` was either not found, or is not '
                 'available via GET requests'.format(method_name))
@@ -446,30 +1265,163 @@ class JSONRPCService(object):
         # Validate the parameters before calling the method, and remove extra
         # parameters (per JSON-RPC 1.1 specification).
         params = self._valid_params(method, params)
+        if timer is not None:
+            timer.mark('validate')
+
+        if method.func is _describe:
+            # Unless ``system.describe`` is overridden, the description is
+            # served pre-encoded (see ``_description``).
+            if isinstance(params, list):
+                return self._description(bool(params[0]))[0]
+            return self._description(bool(params['compact']))[0]
+        if self.result_cache is not None and method.cache_timeout:
+            return self._cached_call(request, method, params)
+        if method.coalesce:
+            return self._coalesced_call(
+                request, method, params,
+                lambda: self._checked(
+                    method, cacheable(self._call(request, method, params))))
+        return self._checked(method, self._call(request, method, params))
+
+    def _call(self, request, method, params):
+        """
+        Returns the result of calling ``method`` with validated params, once
+        the call has been admitted by ``self.admission`` (if its concurrency
+        is limited).
+        """
+        if not self.admission.limits(method):
+            return self._invoke(request, method, params)
+        self.admission.acquire(method)
+        try:
+            return self._invoke(request, method, params)
+        finally:
+            self.admission.release(method)
 
+    def _invoke(self, request, method, params):
+        """
+        Returns the result of calling ``method`` with validated params.
+        """
         # Call method with params provided as a **kwargs
         if isinstance(params, dict):
             if self.provide_request:
                 # Include the request as the first argument
-                return method(self, request, **params)
+                return method.func(self, request, **params)
             # Don't include the request
-            return method(self, **params)
+            return method.func(self, **params)
 
         # Call the method with params provided as *args
         if self.provide_request:
             # Include the request as the first argument
-            return method(self, request, *params)
+            return method.func(self, request, *params)
         # Don't include the request
-        return method(self, *params)
+        return method.func(self, *params)
 
-    @jrpc('system.describe() -> <obj>')
-    def describe(self, request):
+    def _checked(self, method, result):
         """
-        Describes the system per the specification (from JSON-RPC 1.1) at
-        http://json-rpc.org/wd/JSON-RPC-1-1-WD-20060807.html, with a few minor
-        differences (additions).
+        Returns ``result`` coerced to plain JSON types (if ``coerce_results``
+        is set), after checking it against the return type of ``method`` (if
+        this call is to be checked, per ``check_results``).
         """
-        return {
+        if isinstance(result, FUTURE_TYPES) or isinstance(result, RawJSON):
+            return result
+        if self.coerce_results:
+            stream = method.stream
+            if stream is None:
+                stream = self.stream
+            if not stream:
+                result = coerce(result)
+        rate = True if self.debug else self.check_results
+        if rate and (rate is True or random.random() < rate):
+            method.result_validator(result)
+        return result
+
+    def _cached_call(self, request, method, params):
+        """
+        Returns the cached result of calling ``method`` with validated params,
+        calling the method and caching the result if it's not yet cached.
+        """
+        key = self._cache_key(request, method, params)
+        cache_name = self._cache_name(method.name)
+        result = self.result_cache.get(cache_name, key)
+        if result is not MISSING:
+            return result
+
+        def call():
+            result = self._checked(
+                method, cacheable(self._call(request, method, params)))
+            self.result_cache.set(
+                cache_name, key, result, method.cache_timeout)
+            return result
+
+        if method.coalesce:
+            return self._coalesced_call(request, method, params, call, key)
+        return call()
+
+    def _coalesced_call(self, request, method, params, call, key=None):
+        """
+        Returns the result of ``call`` (which calls ``method`` with validated
+        params, and returns a result which is safe to share), or, if an
+        identical call is already running, waits for and returns its result.
+        """
+        if key is None:
+            key = self._cache_key(request, method, params)
+        return self.coalescer.call(
+            (type(self), method.name, key), call, self._mark_coalesced)
+
+    def _mark_coalesced(self):
+        """
+        Marks the current call as coalesced with an identical call (for
+        metrics).
+        """
+        timer = self._timer()
+        if timer is not None:
+            timer.coalesced = True
+
+    def _cache_name(self, method_name):
+        """
+        Returns the name a method's results are cached under, which includes
+        the service class, so that services sharing a ``result_cache`` (and
+        method names) don't share results.
+        """
+        return u'{m}.{c}.{n}'.format(
+            m=type(self).__module__, c=type(self).__name__, n=method_name)
+
+    def _cache_key(self, request, method, params):
+        """
+        Returns the result cache key for a call to ``method`` with validated
+        params (which are canonicalized, so that positional and named params
+        share a key), and with the value of the method's ``cache_vary`` hook.
+        """
+        if isinstance(params, dict):
+            params = [params[name] for name in method.validator.names]
+        if method.cache_vary is not None:
+            params = [method.cache_vary(self, request), params]
+        return hashlib.md5(json.dumps(
+            params, sort_keys=True, separators=(',', ':'))).hexdigest()
+
+    def invalidate_cache(self, method_name, params=None, request=None):
+        """
+        Removes the cached result of a method for the provided params (and
+        request, if the method has a ``cache_vary`` hook) from
+        ``result_cache``, or every cached result of the method if no params are
+        provided.
+        """
+        if self.result_cache is None:
+            return
+        method = self.methods[method_name]
+        key = None
+        if params is not None:
+            key = self._cache_key(
+                request, method, self._valid_params(method, params))
+        self.result_cache.invalidate(self._cache_name(method_name), key)
+
+    def description(self, compact=False):
+        """
+        Returns the service description (see ``describe``). When ``compact`` is
+        ``True``, the "summary" and "help" of the service and its procedures
+        are left out.
+        """
+        description = {
             'sdversion': self.service_sdversion,
             'name': self.service_name,
             'id': self.service_id,
@@ -479,3 +1431,56 @@ class JSONRPCService(object):
             'address': self.service_address,
             'procs': self.proc_descriptions
         }
+        if compact:
+            del description['summary'], description['help']
+            description['procs'] = [
+                dict((k, v) for k, v in proc.iteritems()
+                     if k not in ('summary', 'help'))
+                for proc in description['procs']]
+        return description
+
+    def _description(self, compact=False):
+        """
+        Returns a 2-tuple of the encoded service description (a ``RawJSON``)
+        and its ETag. These are built once per service instance, and rebuilt
+        only if its dispatch table, or one of its ``service_*`` attributes,
+        is replaced.
+        """
+        key = (compact, self.pretty, type(self.json_backend))
+        methods = self.methods
+        attributes = (self.service_sdversion, self.service_name,
+                      self.service_id, self.service_version,
+                      self.service_summary, self.service_help,
+                      self.service_address)
+        try:
+            cached = self._descriptions[key]
+        except KeyError:
+            pass
+        else:
+            if cached[0] is methods and cached[1] == attributes:
+                return cached[2:]
+        encoded = self.json_backend.dumps(
+            self.description(compact), pretty=self.pretty)
+        if isinstance(encoded, bytes):
+            encoded = encoded.decode('utf-8')
+        encoded = RawJSON(encoded)
+        etag = hashlib.md5(encoded.encode('utf-8')).hexdigest()
+        self._descriptions[key] = (methods, attributes, encoded, etag)
+        return encoded, etag
+
+    @jrpc('system.describe(compact=<bit>?) -> <obj>', idempotent=True,
+          etag=_describe_etag)
+    def describe(self, request, compact=None):
+        """
+        Describes the system per the specification (from JSON-RPC 1.1) at
+        http://json-rpc.org/wd/JSON-RPC-1-1-WD-20060807.html, with a few minor
+        differences (additions). Returns the ``dict`` built by ``description``
+        (override that to change the description). Unless this method is
+        overridden, calls to it are served from a cached encoding of the
+        description instead (see ``_description``).
+        """
+        return self.description(bool(compact))
+
+
+# The function of ``system.describe``, which ``_dispatch`` serves pre-encoded.
+_describe = JSONRPCService.describe.func
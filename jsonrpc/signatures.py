@@ -1,5 +1,7 @@
 """
-Utilities for processing JSON-RPC method signatures, and their types.
+Utilities for processing JSON-RPC method signatures, and their types. Parsed
+signatures and types are memoized, since generated services repeat the same
+few shapes across thousands of methods.
 """
 import re
 
@@ -7,10 +9,68 @@ from .jsontype import JSONType
 
 
 # Signature: ``name(foo=<type>, bar=<type>, baz=<type>) -> <type>``.
-SIG_RE = r'^(?P<name>[\w\.]+)\((?P<args>.*)\)(?: -> <(?P<rtype>\w+)>)$'
+SIG_RE = re.compile(
+    r'^(?P<name>[\w\.]+)\((?P<args>.*)\)(?: -> <(?P<rtype>.+)>)$')
 
 # Arguments only: ``foo=<type>, bar=<type>, baz=<type>``.
-ARG_RE = r'^(?P<name>\w+)=<(?P<type>\w+)>(?:(?P<optional>[\?])?)$'
+ARG_RE = re.compile(r'^(?P<name>\w+)=<(?P<type>.+)>(?:(?P<optional>[\?])?)$')
+
+# Name of a type, or of a field of an ``obj{...}`` type.
+NAME_RE = re.compile(r'\s*(\w+)\s*')
+
+# Memos of ``parse_signature`` (signature -> result), and of ``parse_type``
+# and ``canonical_type`` (type expression -> result). The results are
+# immutable, so they're shared.
+_signatures = {}
+_types = {}
+_canonical_types = {}
+
+
+def parse_signature(sig):
+    """
+    Parses a method signature in a single pass, returning a 3-tuple of the
+    method's name, a tuple of ``(name, type, optional)`` 3-tuples for its
+    params (with canonical type expressions), and its canonical return type.
+    Raises ``ValueError`` if the signature is invalid.
+
+    Usage:
+
+    >>> parse_signature('spam_eggs(arg=<str>, arg2=<str>?) -> <str>')
+    ('spam_eggs', (('arg', 'str', False), ('arg2', 'str', True)), 'str')
+    >>>
+
+    """
+    try:
+        return _signatures[sig]
+    except KeyError:
+        pass
+    match = SIG_RE.match(sig)
+    if match is None:
+        raise ValueError(
+            u'Method signature syntax "{sig}" is incorrect.'.format(sig=sig))
+    params = []  # ``[(name, type, optional), ...]``
+    opt_flag = False
+    for arg in split_top_level(match.group('args')):
+        arg_match = ARG_RE.match(arg)
+        if arg_match is None:
+            raise ValueError(
+                u'Method signature params syntax "{sig}" is incorrect '.format(
+                    sig=sig))
+        if arg_match.group('optional') is not None:
+            optional = True
+            opt_flag = True
+        else:
+            if opt_flag:  # Optional params already encountered.
+                raise ValueError(
+                    u'Required params must come before optional '
+                    'params in "{sig}".'.format(sig=sig))
+            optional = False
+        params.append((arg_match.group('name'),
+                       canonical_type(arg_match.group('type')), optional))
+    result = (match.group('name'), tuple(params),
+              canonical_type(match.group('rtype')))
+    _signatures[sig] = result
+    return result
 
 
 def name_from_signature(sig):
@@ -24,11 +84,7 @@ def name_from_signature(sig):
     >>>
 
     """
-    try:
-        return re.match(SIG_RE, sig).group('name')
-    except AttributeError:
-        raise ValueError(
-            u'Method signature syntax "{sig}" is incorrect.'.format(sig=sig))
+    return parse_signature(sig)[0]
 
 
 def params_from_signature(sig):
@@ -43,34 +99,7 @@ def params_from_signature(sig):
     >>>
 
     """
-    try:
-        args = re.match(SIG_RE, sig).group('args')
-    except AttributeError:
-        raise ValueError(
-            u'Method signature syntax "{sig}" is incorrect.'.format(sig=sig))
-    try:
-        lot = []  # Return value ``[(name, type, optional), ...]``
-        if len(args) > 0:
-            args = args.split(', ')
-            opt_flag = False
-            for arg in args:
-                match = re.match(ARG_RE, arg)
-                if match.group('optional') is not None:
-                    optional = True
-                    opt_flag = True
-                else:
-                    if opt_flag:  # Optional params already encountered.
-                        raise ValueError(
-                            u'Required params must come before optional '
-                            'params in "{sig}".'.format(sig=sig))
-                    optional = False
-                lot.append(
-                    (match.group('name'), match.group('type'), optional))
-        return lot
-    except AttributeError:
-        raise ValueError(
-            u'Method signature params syntax "{sig}" is incorrect '.format(
-                sig=sig))
+    return list(parse_signature(sig)[1])
 
 
 def return_type_from_signature(sig):
@@ -84,15 +113,154 @@ def return_type_from_signature(sig):
     'str'
     >>>
 
+    """
+    return parse_signature(sig)[2]
+
+
+def split_top_level(text):
+    """
+    Splits ``text`` at each comma which isn't nested in ``<>`` or ``{}``, and
+    strips the parts (an empty ``text`` has no parts).
+
+    Usage:
+
+    >>> split_top_level('a=<num>, b=<obj{x:num, y:num}>')
+    ['a=<num>', 'b=<obj{x:num, y:num}>']
+    >>>
+
+    """
+    parts = []
+    depth = 0
+    start = 0
+    for idx, char in enumerate(text):
+        if char in '<{':
+            depth += 1
+        elif char in '>}':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:idx].strip())
+            start = idx + 1
+    if text.strip():
+        parts.append(text[start:].strip())
+    return parts
+
+
+def parse_type(expr):
+    """
+    Parses a type expression, returning a type node: a ``(name,)`` 1-tuple for
+    a flat type (any of ``JSONType.json_types``), ``('arr', item_node)`` for
+    an array of typed items (``arr<num>``), or ``('obj', fields)`` for an
+    object with typed fields (``obj{id:<num>, tags:arr<str>?}``), where
+    ``fields`` is a tuple of ``(name, node, optional)`` 3-tuples. Types may be
+    wrapped in angle brackets, as in signatures. Raises ``ValueError`` if the
+    expression is invalid.
+
+    Usage:
+
+    >>> parse_type('arr<num>')
+    ('arr', ('num',))
+    >>>
+
     """
     try:
-        r_type = re.match(SIG_RE, sig).group('rtype')
-    except AttributeError:
-        raise ValueError(
-            u'Method signature syntax "{sig}" is incorrect.'.format(sig=sig))
-    if not r_type in JSONType.json_types:
-        raise ValueError(
-            u'Invalid return type "{r_type}". Allowed types are: '
-            '{allowed}.'.format(
-                r_type=r_type, allowed=', '.join(JSONType.json_types)))
-    return r_type
+        return _types[expr]
+    except KeyError:
+        pass
+    try:
+        node, pos = _parse_type(expr, 0)
+    except IndexError:
+        pos = None
+    if pos != len(expr):
+        raise ValueError(u'Invalid type "{0}". Allowed types are: {1}, '
+                         'arr<type>, and obj{{name:type, ...}}.'.format(
+                             expr, ', '.join(JSONType.json_types)))
+    _types[expr] = node
+    return node
+
+
+def canonical_type(expr):
+    """
+    Returns the canonical form of a type expression (see ``format_type``), or
+    raises ``ValueError`` if it's invalid.
+
+    Usage:
+
+    >>> canonical_type('<obj{ id : num }>')
+    'obj{id:num}'
+    >>>
+
+    """
+    try:
+        return _canonical_types[expr]
+    except KeyError:
+        return _canonical_types.setdefault(
+            expr, format_type(parse_type(expr)))
+
+
+def _parse_type(expr, pos):
+    """
+    Parses the type expression starting at ``pos``, returning a 2-tuple of the
+    type node, and the position after it (``None`` if it's invalid).
+    """
+    while expr[pos] == ' ':
+        pos += 1
+    match = NAME_RE.match(expr, pos)
+    if match is None:
+        if expr[pos] != '<':
+            return None, None
+        # A type wrapped in angle brackets.
+        node, pos = _parse_type(expr, pos + 1)
+        if pos is None or expr[pos] != '>':
+            return None, None
+        return node, pos + 1
+    name, pos = match.group(1), match.end()
+    if name not in JSONType.json_types:
+        return None, None
+    if name == 'arr' and expr[pos:pos + 1] == '<':
+        item, pos = _parse_type(expr, pos + 1)
+        if pos is None or expr[pos] != '>':
+            return None, None
+        return ('arr', item), pos + 1
+    if name == 'obj' and expr[pos:pos + 1] == '{':
+        fields = []
+        pos += 1
+        while True:
+            match = NAME_RE.match(expr, pos)
+            if match is None or expr[match.end()] != ':':
+                return None, None
+            node, pos = _parse_type(expr, match.end() + 1)
+            if pos is None:
+                return None, None
+            optional = expr[pos] == '?'
+            if optional:
+                pos += 1
+            fields.append((match.group(1), node, optional))
+            while expr[pos] == ' ':
+                pos += 1
+            if expr[pos] == '}':
+                return ('obj', tuple(fields)), pos + 1
+            if expr[pos] != ',':
+                return None, None
+            pos += 1
+    return (name,), pos
+
+
+def format_type(node):
+    """
+    Returns the canonical type expression for a type node (see
+    ``parse_type``).
+
+    Usage:
+
+    >>> format_type(('obj', (('id', ('num',), False),)))
+    'obj{id:num}'
+    >>>
+
+    """
+    if len(node) == 1:
+        return node[0]
+    if node[0] == 'arr':
+        return 'arr<{0}>'.format(format_type(node[1]))
+    return 'obj{{{0}}}'.format(', '.join(
+        '{0}:{1}{2}'.format(name, format_type(field), '?' if optional else '')
+        for name, field, optional in node[1]))
@@ -0,0 +1,305 @@
+"""
+Parameter and result validators, compiled once from a method's signature (when
+the method is decorated by ``decorators.jrpc``), rather than on each call.
+"""
+from .errors import InternalError, InvalidParamsError
+from .jsontype import JSONType
+from .signatures import format_type, parse_type
+
+
+# Memos of ``compile_type`` (type node -> checker), and of
+# ``params_validator`` (params -> ``ParamsValidator``). Neither has any state,
+# so methods with the same types share them.
+_checkers = {}
+_params_validators = {}
+
+
+def _flat_types(name):
+    """
+    Returns the ``frozenset`` of Python types for a flat JSON type, or
+    ``None`` for "any".
+    """
+    if name == 'any':
+        return None
+    if name == 'nil':
+        return frozenset([type(None)])
+    return frozenset(JSONType.json_types[name])
+
+
+def compile_type(node):
+    """
+    Compiles a type node (see ``signatures.parse_type``) into a checker: a
+    function which takes a value, and returns ``None`` if the value is of the
+    type, or else a 2-tuple of the path to the offending value (a list of
+    indexes and field names, innermost first) and an error message.
+
+    The checker's source is generated from the node, with a loop per typed
+    array and a block per typed object, so that checking a value walks it
+    once, without a function call per item. Each node is compiled only once.
+    """
+    try:
+        return _checkers[node]
+    except KeyError:
+        pass
+    lines = ['def check(value):']
+    constants = {'_missing': object()}
+    _generate(node, 'value', [], lines, 1, constants)
+    lines.append('    return None')
+    exec compile('\n'.join(lines), '<{0}>'.format(format_type(node)),
+                 'exec') in constants
+    return _checkers.setdefault(node, constants['check'])
+
+
+def _generate(node, var, path, lines, depth, constants):
+    """
+    Appends the lines which check the value in ``var`` (whose path is the list
+    of expressions ``path``, outermost first) against ``node`` to ``lines``.
+    """
+    indent = '    ' * depth
+    n = len(constants)
+    failure = 'return [{0}], _e{1}'.format(', '.join(reversed(path)), n)
+    constants['_e{0}'.format(n)] = u'should be of type {0}'.format(
+        format_type(node))
+
+    name = node[0]
+    if len(node) == 1:
+        types = _flat_types(name)
+        if types is not None:
+            constants['_t{0}'.format(n)] = types
+            lines.append('{0}if type({1}) not in _t{2}:'.format(
+                indent, var, n))
+            lines.append('{0}    {1}'.format(indent, failure))
+        return
+
+    if name == 'arr':
+        lines.append('{0}if type({1}) is not list:'.format(indent, var))
+        lines.append('{0}    {1}'.format(indent, failure))
+        if node[1] == ('any',):
+            return
+        idx, item = 'i{0}'.format(depth), 'v{0}'.format(depth)
+        lines.append('{0}for {1}, {2} in enumerate({3}):'.format(
+            indent, idx, item, var))
+        _generate(node[1], item, path + [idx], lines, depth + 1, constants)
+        return
+
+    lines.append('{0}if type({1}) is not dict:'.format(indent, var))
+    lines.append('{0}    {1}'.format(indent, failure))
+    constants['_m'] = u'is required, but was not provided'
+    field_var = 'v{0}'.format(depth)
+    for field_name, field, optional in node[1]:
+        field_path = path + [repr(field_name)]
+        lines.append('{0}{1} = {2}.get({3!r}, _missing)'.format(
+            indent, field_var, var, field_name))
+        lines.append('{0}if {1} is _missing:'.format(indent, field_var))
+        if optional:
+            lines.append('{0}    pass'.format(indent))
+            lines.append('{0}elif {1} is None:'.format(indent, field_var))
+            lines.append('{0}    pass'.format(indent))
+        else:
+            lines.append('{0}    return [{1}], _m'.format(
+                indent, ', '.join(reversed(field_path))))
+        lines.append('{0}else:'.format(indent))
+        lines.append('{0}    pass'.format(indent))
+        _generate(field, field_var, field_path, lines, depth + 1, constants)
+
+
+def format_path(name, path):
+    """
+    Returns the path (innermost first, as returned by a checker) to a value
+    in the param ``name``, such as ``items[2].tags[0]``.
+    """
+    parts = [name]
+    for key in reversed(path):
+        if isinstance(key, int):
+            parts.append(u'[{0}]'.format(key))
+        else:
+            parts.append(u'.{0}'.format(key))
+    return u''.join(parts)
+
+
+class ParamsValidator(object):
+    """
+    Validates the "params" of a request against a method's signature.
+
+    Usage::
+
+        >>> validator = ParamsValidator([('a', 'num', False)])
+        >>> validator([1])
+        [1]
+
+    """
+    __slots__ = ('count', 'required', 'names', 'types', 'optional',
+                 'checkers', 'type_errors', 'missing_errors')
+
+    def __init__(self, params):
+        """
+        Takes the ``(name, type, optional)`` 3-tuples returned by
+        ``signatures.params_from_signature`` (or ``parse_signature``).
+        """
+        nodes = [parse_type(p[1]) for p in params]
+        self.count = len(params)
+        self.required = len([p for p in params if not p[2]])
+        self.names = tuple(p[0] for p in params)
+        # The types of the params themselves (``list`` for ``arr<num>``).
+        self.types = tuple(frozenset(JSONType.json_types[node[0]])
+                           for node in nodes)
+        self.optional = tuple(p[2] for p in params)
+        # Checkers for the contents of typed containers (``None`` for flat
+        # types, which are fully checked by ``types``), or ``None`` if there
+        # are no typed containers.
+        self.checkers = tuple(compile_type(node) if len(node) > 1 else None
+                              for node in nodes)
+        if not any(self.checkers):
+            self.checkers = None
+
+        # Error details are built up front, instead of when they're raised.
+        self.type_errors = tuple(
+            u'`{0}` param should be of type {1}'.format(p[0], p[1])
+            for p in params)
+        self.missing_errors = tuple(
+            u'Parameter `{0}` is required, but was not provided'.format(p[0])
+            for p in params)
+
+    def __call__(self, params):
+        """
+        Validates type, and number of params. Returns the params (minus any
+        extras, per the JSON-RPC 1.1 specification), with ``None`` in place
+        of missing optional params, or raises ``InvalidParamsError``.
+        """
+        # ``list`` (JavaScript Array) based "params"
+        if isinstance(params, list):
+            return self._validate_list(params)
+        # ``dict`` (JavaScript object) based "params"
+        elif isinstance(params, dict):
+            return self._validate_dict(params)
+        raise InvalidParamsError(
+            details=u'The `params` argument must be an array or object')
+
+    def _validate_list(self, params):
+        """
+        Validates positional params.
+        """
+        provided = len(params)
+        params_list = params[:self.count]
+        types = self.types
+        checkers = self.checkers
+        for idx, value in enumerate(params_list):
+            if type(value) not in types[idx]:
+                if value is None and self.optional[idx]:
+                    continue  # Optional params are allowed to be "nil"
+                raise InvalidParamsError(details=self.type_errors[idx])
+            if checkers is not None and checkers[idx] is not None:
+                self._check(idx, value)
+        if provided < self.count:
+            # JSON-RPC 1.1 spec states that parameters should be replaced with
+            # a "nil" object, but instead let's raise an exception, unless the
+            # param is marked optional with "?".
+            if provided < self.required:
+                raise InvalidParamsError(
+                    details=self.missing_errors[provided])
+            params_list.extend([None] * (self.count - provided))
+        return params_list
+
+    def _validate_dict(self, params):
+        """
+        Validates named params.
+        """
+        params_dict = {}
+        types = self.types
+        optional = self.optional
+        checkers = self.checkers
+        for idx, name in enumerate(self.names):
+            try:
+                value = params[name]
+            except KeyError:
+                if optional[idx]:
+                    params_dict[name] = None  # Set value to "nil" (None)
+                    continue
+                raise InvalidParamsError(details=self.missing_errors[idx])
+            if type(value) not in types[idx]:
+                if not (value is None and optional[idx]):
+                    raise InvalidParamsError(details=self.type_errors[idx])
+            elif checkers is not None and checkers[idx] is not None:
+                self._check(idx, value)
+            params_dict[name] = value
+        return params_dict
+
+    def _check(self, idx, value):
+        """
+        Checks the contents of a typed container param, raising
+        ``InvalidParamsError`` with the path to the first offending value.
+        """
+        error = self.checkers[idx](value)
+        if error is not None:
+            path, message = error
+            raise InvalidParamsError(details=u'`{0}` param {1}'.format(
+                format_path(self.names[idx], path), message))
+
+
+def params_validator(params):
+    """
+    Returns the ``ParamsValidator`` for a tuple of ``(name, type, optional)``
+    3-tuples, which is created once for each distinct tuple.
+    """
+    try:
+        return _params_validators[params]
+    except KeyError:
+        return _params_validators.setdefault(params, ParamsValidator(params))
+
+
+class ResultValidator(object):
+    """
+    Checks the result of a method against the return type of its signature.
+
+    Usage::
+
+        >>> validator = ResultValidator('add', 'num')
+        >>> validator(3)
+        3
+
+    """
+    __slots__ = ('method_name', 'types', 'encoded_types', 'checker', 'error')
+
+    def __init__(self, method_name, return_type):
+        """
+        Takes the method's name, and the type returned by
+        ``signatures.return_type_from_signature`` (or ``parse_signature``).
+        """
+        # Imported here, so that ``ParamsValidator`` (which is also used by
+        # ``client``) can be used without Django.
+        from .encoders import ENCODED_TYPES
+
+        node = parse_type(return_type)
+        self.method_name = method_name
+        self.types = _flat_types(node[0])  # ``None`` if anything goes.
+        self.encoded_types = ENCODED_TYPES.get(node[0])
+        # Checks the contents of typed containers (only when they're plain
+        # ``list`` and ``dict`` objects).
+        self.checker = compile_type(node) if len(node) > 1 else None
+        self.error = u'Method `{m}` should return type {t}, not {{0}}'.format(
+            m=method_name, t=return_type)
+
+    def __call__(self, result):
+        """
+        Returns ``result``, or raises ``InternalError`` if it isn't of the
+        return type.
+        """
+        types = self.types
+        if types is None:
+            return result
+        if type(result) in types:
+            if self.checker is not None:
+                error = self.checker(result)
+                if error is not None:
+                    path, message = error
+                    raise InternalError(details=u'`{p}` returned by method '
+                                        u'`{m}` {e}'.format(
+                                            p=format_path(u'result', path),
+                                            m=self.method_name, e=message))
+            return result
+        # ``bool`` is a sub-class of ``int``, but booleans aren't numbers in
+        # JSON (and aren't accepted as "num" params either).
+        if (self.encoded_types and type(result) is not bool and
+                isinstance(result, self.encoded_types)):
+            return result
+        raise InternalError(details=self.error.format(type(result).__name__))
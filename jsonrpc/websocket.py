@@ -0,0 +1,298 @@
+"""
+A WebSocket transport, which serves a ``JSONRPCService`` over a long-lived
+connection, so that chatty clients don't pay for an HTTP request per call.
+Each message is a request object (or a batch), exactly as it would be POSTed,
+and requests are handled concurrently, so responses may arrive out of order
+(clients match them by ``id``). Notifications receive no response, and the
+server may push notifications of its own to the client (see
+``WebSocketSession.push``).
+
+The transport only needs a socket object with ``receive`` (which returns the
+next message, or ``None`` once the connection is closed), ``send``, and
+``close`` methods, such as the ``wsgi.websocket`` object provided by
+gevent-websocket. Usage::
+
+    # urls.py
+    url(r'^foo.ws$', websocket_view(foo_api), name='foo_ws'),
+
+For tests, ``socket_pair`` provides an in-memory connection::
+
+    server, client = socket_pair()
+    session = WebSocketSession(foo_api, request, server)
+    threading.Thread(target=session.run).start()
+    client.send('{"jsonrpc": "2.0", "method": "get_sum", ...}')
+    client.receive(timeout=1)  # -> '{"jsonrpc":"2.0","result":5,...}'
+    client.close()
+
+"""
+import Queue
+import logging
+import urlparse
+import threading
+
+from django.db import connection
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, HttpResponseForbidden)
+
+from .errors import (
+    InternalError, InvalidRequestError, JSONRPCError, ParseError)
+from .metrics import BATCH
+
+
+logger = logging.getLogger(__name__)
+
+
+class WebSocketSession(object):
+    """
+    Serves the calls received over one WebSocket connection, on ``workers``
+    threads. ``request`` is the HTTP request which opened the connection,
+    which is provided to methods (as ``request.jsonrpc_session`` is this
+    session, methods may use it to push notifications to the client), and used
+    for rate limiting, etc. Reading stops while ``max_queued`` messages are
+    waiting for a worker.
+
+    Messages are JSON text, or, if ``backend`` (a binary backend, see
+    ``backends``) is provided, binary messages in its format.
+    """
+    def __init__(self, service, request, socket, workers=4, max_queued=100,
+                 backend=None):
+        if workers < 1:
+            raise ValueError(u'``workers`` must be at least 1')
+        self.service = service
+        self.request = request
+        self.socket = socket
+        self.workers = workers
+        self.backend = backend
+        self._queue = Queue.Queue(max_queued)
+        self._send_lock = threading.Lock()
+        self.closed = False
+
+    def run(self):
+        """
+        Handles messages until the connection is closed, then waits for the
+        calls in flight to finish.
+        """
+        self.request.jsonrpc_session = self
+        threads = [threading.Thread(target=self._work)
+                   for _ in xrange(self.workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            while not self.closed:
+                message = self.socket.receive()
+                if message is None:
+                    break
+                self._queue.put(message)
+        finally:
+            for thread in threads:
+                self._queue.put(None)
+            for thread in threads:
+                thread.join()
+            self.close()
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        if not self.closed:
+            self.closed = True
+            self.socket.close()
+
+    def push(self, method, params=None):
+        """
+        Sends a notification (a request object without an ``id``) of
+        ``method`` to the client. Returns whether or not it was sent.
+        """
+        return self._send({
+            'jsonrpc': self.service.jsonrpc_version,
+            'method': method,
+            'params': [] if params is None else params,
+        })
+
+    def _work(self):
+        """
+        Handles queued messages until a ``None`` is queued.
+        """
+        try:
+            while True:
+                message = self._queue.get()
+                if message is None:
+                    return
+                self._handle(message)
+        finally:
+            # Each worker thread has a DB connection of its own.
+            connection.close()
+
+    def _handle(self, message):
+        """
+        Handles a message, sending the response (if any).
+        """
+        service = self.service
+        timer = None
+        if service.metrics is not None:
+            timer = service._start_timer()
+        json_req = None
+        try:
+            try:
+                json_req = self._parse(message)
+            except JSONRPCError, ex:
+                response = service._response_dict(ex=ex)
+            else:
+                service._mark('parse')
+                if isinstance(json_req, list):
+                    # As in ``JSONRPCService.__call__``, the batch is recorded
+                    # as a whole, and each member as a call of its own.
+                    if timer is not None:
+                        timer.method_name = BATCH
+                    response = service._batch(self.request, json_req)
+                else:
+                    response = service._resolve(
+                        self.request,
+                        *service._handle(self.request, json_req))[0]
+        except Exception:
+            # Raised by ``_error_response`` in debug mode, for Django to
+            # handle, which isn't possible here.
+            logger.exception(u'Error from {i}'.format(
+                i=self.request.META.get('REMOTE_ADDR')))
+            rid = None
+            if isinstance(json_req, dict):
+                rid = json_req.get('id')
+            response = service._response_dict(ex=InternalError(), rid=rid)
+
+        try:
+            if response is not None:
+                if timer is not None and 'error' in response:
+                    timer.error_code = response['error']['code']
+                self._send(response)
+                service._mark('encode')
+        finally:
+            if timer is not None:
+                service._finish_timer(timer)
+
+    def _parse(self, message):
+        """
+        Returns the request object (or list of them) in ``message``, or raises
+        a ``JSONRPCError``.
+        """
+        backend = self.backend or self.service.json_backend
+        try:
+            json_req = backend.loads(message)
+        except ValueError:
+            raise ParseError
+        if not isinstance(json_req, (dict, list)):
+            raise InvalidRequestError(
+                details=u'The JSON provided must be an object or an array')
+        if isinstance(json_req, list) and not json_req:
+            raise InvalidRequestError(
+                details=u'A batch request must contain at least one request')
+        return json_req
+
+    def _send(self, response):
+        """
+        Encodes and sends a response object (or a list of them). Returns
+        whether or not it was sent (it isn't, if the connection is closed).
+        """
+        if self.backend is None:
+            data = self.service._json_output(response)
+        else:
+            data = self.service._binary_output(response, self.backend)
+        with self._send_lock:
+            if self.closed:
+                return False
+            try:
+                self.socket.send(data)
+            except Exception:
+                logger.debug(u'Could not send to {i}; closing'.format(
+                    i=self.request.META.get('REMOTE_ADDR')))
+                self.close()
+                return False
+        return True
+
+
+def websocket_view(service, allowed_origins=None, **session_kwargs):
+    """
+    Returns a Django view which serves ``service`` over WebSocket connections
+    (see ``WebSocketSession``, which receives ``session_kwargs``), for servers
+    which provide the socket as ``wsgi.websocket`` (e.g., gevent-websocket).
+    Requests which aren't WebSocket upgrades receive a 400.
+
+    Browsers let any site open a WebSocket connection (with the user's
+    cookies), so connections from other sites are rejected with a 403. By
+    default, only pages served from the same host may connect; provide
+    ``allowed_origins`` (e.g., ``['https://example.com']``) to allow other
+    origins instead, or ``'*'`` to allow any origin. Connections without an
+    ``Origin`` header (i.e., not from a browser) are always allowed.
+    """
+    def view(request):
+        socket = request.META.get('wsgi.websocket')
+        if socket is None:
+            return HttpResponseBadRequest(
+                u'WebSocket connections only', content_type='text/plain')
+        if not _origin_allowed(request, allowed_origins):
+            socket.close()
+            return HttpResponseForbidden(
+                u'Origin not allowed', content_type='text/plain')
+        WebSocketSession(service, request, socket, **session_kwargs).run()
+        return HttpResponse()
+    return view
+
+
+def _origin_allowed(request, allowed_origins):
+    """
+    Returns whether or not the ``Origin`` of ``request`` is allowed by
+    ``allowed_origins`` (see ``websocket_view``).
+    """
+    origin = request.META.get('HTTP_ORIGIN')
+    if origin is None or allowed_origins == '*':
+        return True
+    if allowed_origins is not None:
+        return origin in allowed_origins
+    # Same-origin only (the scheme isn't compared, as the request may have
+    # been forwarded by a proxy which terminated TLS).
+    return (urlparse.urlparse(origin).netloc.lower() ==
+            request.get_host().lower())
+
+
+class MemorySocket(object):
+    """
+    One end of an in-memory WebSocket connection (see ``socket_pair``).
+    """
+    def __init__(self, inbox, outbox, closed):
+        self._inbox = inbox
+        self._outbox = outbox
+        self._closed = closed  # A ``threading.Event`` shared by both ends.
+
+    def receive(self, timeout=None):
+        """
+        Returns the next message from the other end, or ``None`` once the
+        connection is closed. Raises an ``IOError`` if no message arrives
+        within ``timeout`` seconds.
+        """
+        if self._closed.is_set() and self._inbox.empty():
+            return None
+        try:
+            return self._inbox.get(timeout=timeout)
+        except Queue.Empty:
+            raise IOError(u'Timed out waiting for a message')
+
+    def send(self, message):
+        if self._closed.is_set():
+            raise IOError(u'The connection is closed')
+        self._outbox.put(message)
+
+    def close(self):
+        if not self._closed.is_set():
+            self._closed.set()
+            # Wake up both ends.
+            self._inbox.put(None)
+            self._outbox.put(None)
+
+
+def socket_pair():
+    """
+    Returns two connected ``MemorySocket`` objects, for the server and the
+    client ends of a connection.
+    """
+    a, b, closed = Queue.Queue(), Queue.Queue(), threading.Event()
+    return MemorySocket(a, b, closed), MemorySocket(b, a, closed)
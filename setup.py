@@ -20,5 +20,5 @@ setup(
         'Programming Language :: Python',
         'Topic :: Utilities'
     ],
-    packages=find_packages(),
+    packages=find_packages(exclude=['tests']),
 )
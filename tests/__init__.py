@@ -0,0 +1,10 @@
+"""
+Tests, which use the standard library's ``unittest``. From the root of the
+repository, run::
+
+    python -m unittest discover -t . -s tests
+
+"""
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
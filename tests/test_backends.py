@@ -0,0 +1,105 @@
+"""
+Tests for ``jsonrpc.backends``, and for the binary backends services
+negotiate with clients.
+"""
+import json
+import unittest
+
+from jsonrpc import backends
+from jsonrpc.backends import JSONBackend, MsgpackBackend, StdlibBackend
+from jsonrpc.decorators import jrpc
+from jsonrpc.service import JSONRPCService
+
+from .utils import content, factory, get, post, request_object
+
+
+class TaggedBackend(JSONBackend):
+    """
+    A "binary" backend which encodes JSON, tagged with a prefix.
+    """
+    content_type = 'application/x-tagged'
+
+    def loads(self, data):
+        if not data.startswith('tagged:'):
+            raise ValueError(u'Untagged data')
+        return json.loads(data[len('tagged:'):])
+
+    def dumps(self, obj, pretty=False):
+        return 'tagged:' + StdlibBackend().dumps(obj)
+
+
+class BinaryAPI(JSONRPCService):
+    binary_backends = (TaggedBackend(),)
+
+    @jrpc('add(a=<num>, b=<num>) -> <num>', idempotent=True)
+    def add(self, request, a, b):
+        return a + b
+
+
+class NegotiationTests(unittest.TestCase):
+    def setUp(self):
+        self.api = BinaryAPI(get=True)
+
+    def post(self, data, content_type, accept=None):
+        extra = {}
+        if accept is not None:
+            extra['HTTP_ACCEPT'] = accept
+        return self.api(factory.post('/', data=data,
+                                     content_type=content_type, **extra))
+
+    def test_binary_request(self):
+        response = self.post('tagged:' + json.dumps(request_object(
+            'add', [1, 2])), TaggedBackend.content_type)
+        self.assertEqual(response['Content-Type'], TaggedBackend.content_type)
+        self.assertEqual(json.loads(content(response)[len('tagged:'):]),
+                         {'jsonrpc': '2.0', 'id': 1, 'result': 3})
+
+    def test_accept(self):
+        body = json.dumps(request_object('add', [1, 2]))
+        response = self.post(body, 'application/json',
+                             accept=TaggedBackend.content_type)
+        self.assertTrue(content(response).startswith('tagged:'))
+        response = self.post(body, 'application/json')
+        self.assertEqual(json.loads(content(response))['result'], 3)
+
+    def test_vary(self):
+        body = json.dumps(request_object('add', [1, 2]))
+        for data in (body, '[' + body + ']', '{'):
+            response = self.post(data, 'application/json')
+            self.assertIn('Accept', response['Vary'])
+        # GET requests always get JSON.
+        response = get(self.api, request_object('add', [1, 2]))
+        self.assertFalse(response.has_header('Vary'))
+        response = post(JSONRPCService(), request_object('system.describe'))
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_parse_error(self):
+        response = self.post('untagged', TaggedBackend.content_type)
+        self.assertEqual(json.loads(content(response)[len('tagged:'):])[
+            'error']['code'], -32700)
+
+
+@unittest.skipIf(backends.msgpack is None, 'msgpack is not installed')
+class MsgpackBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.backend = MsgpackBackend()
+
+    def test_round_trip(self):
+        obj = {u'a': [1, 2.5, None, True, u'\xe9']}
+        self.assertEqual(self.backend.loads(self.backend.dumps(obj)), obj)
+
+    def test_invalid(self):
+        # Truncated data, and a map with an array as a key.
+        for data in ('\x92\x01', '\x81\x91\x01\x01'):
+            with self.assertRaises(ValueError):
+                self.backend.loads(data)
+
+    def test_service(self):
+        class MsgpackAPI(BinaryAPI):
+            binary_backends = (self.backend,)
+
+        response = MsgpackAPI()(factory.post(
+            '/', data='\x81\x91\x01\x01',
+            content_type=MsgpackBackend.content_type))
+        self.assertEqual(self.backend.loads(content(response))['error'][
+            'code'], -32700)
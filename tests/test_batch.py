@@ -0,0 +1,134 @@
+"""
+Tests for JSON-RPC 2.0 batch requests, run one after another and on a thread
+pool (``batch_workers``).
+"""
+import json
+import threading
+import time
+import unittest
+
+from jsonrpc.concurrency import offload
+from jsonrpc.decorators import jrpc
+from jsonrpc.service import JSONRPCService
+
+from .utils import content, post, request_object
+
+
+class BatchAPI(JSONRPCService):
+    def __init__(self, *args, **kwargs):
+        super(BatchAPI, self).__init__(*args, **kwargs)
+        self.notified = []
+        self.threads = set()
+
+    @jrpc('add(a=<num>, b=<num>) -> <num>')
+    def add(self, request, a, b):
+        self.threads.add(threading.current_thread().ident)
+        return a + b
+
+    @jrpc('sleep(seconds=<num>) -> <num>')
+    def sleep(self, request, seconds):
+        time.sleep(seconds)
+        return seconds
+
+    @jrpc('later(seconds=<num>) -> <num>')
+    def later(self, request, seconds):
+        return offload(self.sleep, request, seconds)
+
+    @jrpc('note(text=<str>) -> <nil>')
+    def note(self, request, text):
+        self.notified.append(text)
+
+    @jrpc('fail() -> <nil>')
+    def fail(self, request):
+        raise ValueError('Oops')
+
+
+class PooledBatchAPI(BatchAPI):
+    batch_workers = 4
+
+
+class BatchTests(unittest.TestCase):
+    api_class = BatchAPI
+
+    def setUp(self):
+        self.api = self.api_class()
+
+    def batch(self, json_reqs):
+        response = post(self.api, json_reqs)
+        if response.status_code == 204:
+            self.assertEqual(content(response), '')
+            return None
+        self.assertEqual(response.status_code, 200)
+        return json.loads(content(response))
+
+    def test_order(self):
+        responses = self.batch([
+            request_object('sleep', [0.05], rid='slow'),
+            request_object('add', [1, 2], rid=2),
+            request_object('add', [3, 4], rid=3)])
+        self.assertEqual([r['id'] for r in responses], ['slow', 2, 3])
+        self.assertEqual([r['result'] for r in responses], [0.05, 3, 7])
+
+    def test_mixed_errors(self):
+        responses = self.batch([
+            request_object('add', [1, 2], rid=1),
+            request_object('missing', rid=2),
+            request_object('add', [1, 'x'], rid=3),
+            request_object('fail', rid=4),
+            {'jsonrpc': '2.0', 'id': 5},
+            1,
+            request_object('add', [2, 2], rid=7)])
+        self.assertEqual([r.get('id') for r in responses],
+                         [1, 2, 3, 4, 5, None, 7])
+        self.assertEqual(responses[0]['result'], 3)
+        self.assertEqual([r['error']['code'] for r in responses[1:6]],
+                         [-32601, -32602, -32603, -32600, -32600])
+        self.assertEqual(responses[6]['result'], 4)
+
+    def test_notifications(self):
+        responses = self.batch([
+            request_object('note', ['a'], rid=None),
+            request_object('add', [1, 2], rid=1),
+            request_object('note', ['b'], rid=None)])
+        self.assertEqual(responses, [{'jsonrpc': '2.0', 'id': 1, 'result': 3}])
+        self.assertEqual(sorted(self.api.notified), ['a', 'b'])
+
+    def test_all_notifications(self):
+        self.assertIsNone(self.batch([
+            request_object('note', ['a'], rid=None),
+            request_object('note', ['b'], rid=None)]))
+        self.assertEqual(sorted(self.api.notified), ['a', 'b'])
+
+    def test_empty(self):
+        response = post(self.api, [])
+        self.assertEqual(json.loads(content(response))['error']['code'],
+                         -32600)
+
+    def test_futures(self):
+        # Every member is dispatched before any future is waited for.
+        start = time.time()
+        responses = self.batch([request_object('later', [0.2], rid=i)
+                                for i in range(3)])
+        self.assertEqual([r['result'] for r in responses], [0.2] * 3)
+        self.assertLess(time.time() - start, 0.5)
+
+
+class PooledBatchTests(BatchTests):
+    api_class = PooledBatchAPI
+
+    def test_concurrent(self):
+        start = time.time()
+        responses = self.batch([request_object('sleep', [0.2], rid=i)
+                                for i in range(4)])
+        self.assertEqual([r['id'] for r in responses], [0, 1, 2, 3])
+        self.assertLess(time.time() - start, 0.6)
+
+    def test_pool_threads(self):
+        self.batch([request_object('add', [i, 1], rid=i) for i in range(8)])
+        self.assertNotIn(threading.current_thread().ident, self.api.threads)
+        self.assertLessEqual(len(self.api.threads), 4)
+        # A batch with a single member isn't run on the pool.
+        self.api.threads.clear()
+        self.batch([request_object('add', [1, 1])])
+        self.assertEqual(self.api.threads,
+                         set([threading.current_thread().ident]))
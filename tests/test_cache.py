@@ -0,0 +1,185 @@
+"""
+Tests for ``jsonrpc.cache``, and for the cached results of idempotent
+methods.
+"""
+import time
+import unittest
+
+from jsonrpc.cache import (
+    MISSING, DjangoResultCache, LocalResultCache, cacheable)
+from jsonrpc.decorators import jrpc
+from jsonrpc.errors import ServerError
+from jsonrpc.service import JSONRPCService
+
+from .utils import call
+
+
+class ResultCacheTests(unittest.TestCase):
+    def caches(self):
+        yield LocalResultCache()
+        cache = DjangoResultCache(key_prefix='tests')
+        cache.cache.clear()
+        yield cache
+
+    def test_get(self):
+        for cache in self.caches():
+            self.assertIs(cache.get(u'm', 'k'), MISSING)
+            cache.set(u'm', 'k', None, 60)
+            self.assertIsNone(cache.get(u'm', 'k'))
+            cache.set(u'm', 'k', [1, 2], 60)
+            self.assertEqual(cache.get(u'm', 'k'), [1, 2])
+            self.assertIs(cache.get(u'other', 'k'), MISSING)
+
+    def test_timeout(self):
+        cache = LocalResultCache()
+        cache.set(u'm', 'k', 1, 0.05)
+        self.assertEqual(cache.get(u'm', 'k'), 1)
+        time.sleep(0.1)
+        self.assertIs(cache.get(u'm', 'k'), MISSING)
+
+    def test_invalidate(self):
+        for cache in self.caches():
+            cache.set(u'm', 'a', 1, 60)
+            cache.set(u'm', 'b', 2, 60)
+            cache.set(u'n', 'a', 3, 60)
+            cache.invalidate(u'm', 'a')
+            self.assertIs(cache.get(u'm', 'a'), MISSING)
+            self.assertEqual(cache.get(u'm', 'b'), 2)
+            cache.invalidate(u'm')
+            self.assertIs(cache.get(u'm', 'b'), MISSING)
+            self.assertEqual(cache.get(u'n', 'a'), 3)
+
+    def test_eviction(self):
+        cache = LocalResultCache(max_entries=2)
+        cache.set(u'm', 'a', 1, 60)
+        cache.set(u'm', 'b', 2, 60)
+        cache.get(u'm', 'a')
+        cache.set(u'm', 'c', 3, 60)
+        # The least recently used result is evicted.
+        self.assertIs(cache.get(u'm', 'b'), MISSING)
+        self.assertEqual(cache.get(u'm', 'a'), 1)
+        self.assertEqual(cache.get(u'm', 'c'), 3)
+
+    def test_cacheable(self):
+        self.assertEqual(cacheable(i for i in range(3)), [0, 1, 2])
+        self.assertEqual(cacheable({'a': 1}), {'a': 1})
+
+
+class CachedAPI(JSONRPCService):
+    result_cache = LocalResultCache()
+
+    def __init__(self, *args, **kwargs):
+        super(CachedAPI, self).__init__(*args, **kwargs)
+        self.calls = 0
+
+    @jrpc('add(a=<num>, b=<num>) -> <num>', idempotent=True,
+          cache_timeout=60)
+    def add(self, request, a, b):
+        self.calls += 1
+        return a + b
+
+    @jrpc('numbers(count=<num>) -> <arr<num>>', idempotent=True,
+          cache_timeout=60)
+    def numbers(self, request, count):
+        self.calls += 1
+        return (i for i in xrange(count))
+
+    @jrpc('whoami() -> <str>', idempotent=True, cache_timeout=60,
+          cache_vary=lambda service, request: request.META.get('HTTP_X_USER'))
+    def whoami(self, request):
+        self.calls += 1
+        return request.META.get('HTTP_X_USER')
+
+    @jrpc('brief() -> <num>', idempotent=True, cache_timeout=0.05)
+    def brief(self, request):
+        self.calls += 1
+        return self.calls
+
+    @jrpc('fail() -> <nil>', idempotent=True, cache_timeout=60)
+    def fail(self, request):
+        self.calls += 1
+        raise ServerError(details=u'nope')
+
+    @jrpc('uncached() -> <num>')
+    def uncached(self, request):
+        self.calls += 1
+        return self.calls
+
+
+class OtherCachedAPI(CachedAPI):
+    pass
+
+
+class CachedCallTests(unittest.TestCase):
+    def setUp(self):
+        self.api = CachedAPI()
+        self.api.result_cache = LocalResultCache()
+
+    def test_cached(self):
+        for i in range(3):
+            self.assertEqual(call(self.api, 'add', [1, 2])['result'], 3)
+        self.assertEqual(self.api.calls, 1)
+        # Positional and named params share a result.
+        self.assertEqual(
+            call(self.api, 'add', {'b': 2, 'a': 1})['result'], 3)
+        self.assertEqual(self.api.calls, 1)
+        self.assertEqual(call(self.api, 'add', [2, 2])['result'], 4)
+        self.assertEqual(self.api.calls, 2)
+
+    def test_generator(self):
+        for i in range(2):
+            self.assertEqual(call(self.api, 'numbers', [3])['result'],
+                             [0, 1, 2])
+        self.assertEqual(self.api.calls, 1)
+
+    def test_vary(self):
+        for user in ('a', 'b', 'a'):
+            self.assertEqual(
+                call(self.api, 'whoami', HTTP_X_USER=user)['result'], user)
+        self.assertEqual(self.api.calls, 2)
+
+    def test_timeout(self):
+        self.assertEqual(call(self.api, 'brief')['result'], 1)
+        self.assertEqual(call(self.api, 'brief')['result'], 1)
+        time.sleep(0.1)
+        self.assertEqual(call(self.api, 'brief')['result'], 2)
+
+    def test_errors_not_cached(self):
+        for i in range(2):
+            self.assertIn('error', call(self.api, 'fail'))
+        self.assertEqual(self.api.calls, 2)
+        call(self.api, 'add', [1, 'x'])
+        self.assertEqual(self.api.calls, 2)
+
+    def test_uncached(self):
+        self.assertEqual(call(self.api, 'uncached')['result'], 1)
+        self.assertEqual(call(self.api, 'uncached')['result'], 2)
+
+    def test_invalidate(self):
+        call(self.api, 'add', [1, 2])
+        call(self.api, 'add', [2, 2])
+        self.api.invalidate_cache('add', {'a': 1, 'b': 2})
+        call(self.api, 'add', [1, 2])
+        call(self.api, 'add', [2, 2])
+        self.assertEqual(self.api.calls, 3)
+        self.api.invalidate_cache('add')
+        call(self.api, 'add', [1, 2])
+        call(self.api, 'add', [2, 2])
+        self.assertEqual(self.api.calls, 5)
+
+    def test_services_separate(self):
+        other = OtherCachedAPI()
+        other.result_cache = self.api.result_cache
+        call(self.api, 'add', [1, 2])
+        call(other, 'add', [1, 2])
+        self.assertEqual((self.api.calls, other.calls), (1, 1))
+        self.api.invalidate_cache('add')
+        call(other, 'add', [1, 2])
+        self.assertEqual(other.calls, 1)
+
+    def test_disabled(self):
+        self.api.result_cache = None
+        call(self.api, 'add', [1, 2])
+        call(self.api, 'add', [1, 2])
+        self.assertEqual(self.api.calls, 2)
+        self.api.invalidate_cache('add')
@@ -0,0 +1,194 @@
+"""
+Tests for ``jsonrpc.client``, which call a service in-process, through a
+``LocalTransport``.
+"""
+import json
+import threading
+import unittest
+
+from jsonrpc.client import (
+    Client, LocalTransport, PendingCall, ServiceProxy, TransportError)
+from jsonrpc.decorators import jrpc
+from jsonrpc.errors import (
+    InvalidParamsError, JSONRPCError, MethodNotFoundError, ServerError)
+from jsonrpc.executors import InlineExecutor
+from jsonrpc.service import JSONRPCService
+
+
+class ExampleAPI(JSONRPCService):
+    notification_executor = InlineExecutor()
+
+    def __init__(self, *args, **kwargs):
+        super(ExampleAPI, self).__init__(*args, **kwargs)
+        self.notified = []
+
+    @jrpc('add(a=<num>, b=<num>) -> <num>')
+    def add(self, request, a, b):
+        return a + b
+
+    @jrpc('tags.count(tags=<arr<str>>) -> <num>')
+    def count_tags(self, request, tags):
+        return len(tags)
+
+    @jrpc('note(text=<str>) -> <nil>')
+    def note(self, request, text):
+        self.notified.append(text)
+
+    @jrpc('fail(code=<num>) -> <nil>')
+    def fail(self, request, code):
+        error = JSONRPCError(details=u'custom')
+        error.code = code
+        raise error
+
+    @jrpc('server_error() -> <nil>')
+    def server_error(self, request):
+        raise ServerError(details=u'nope')
+
+
+class RecordingTransport(LocalTransport):
+    """
+    A ``LocalTransport`` which keeps the request objects it sends.
+    """
+    def __init__(self, service):
+        super(RecordingTransport, self).__init__(service)
+        self.sent = []
+
+    def send(self, data, content_type='application/json'):
+        self.sent.append(json.loads(data))
+        return super(RecordingTransport, self).send(data, content_type)
+
+
+class ClientTests(unittest.TestCase):
+    def setUp(self):
+        self.api = ExampleAPI()
+        self.transport = RecordingTransport(self.api)
+        self.client = Client(self.transport)
+
+    def test_call(self):
+        self.assertEqual(self.client.call('add', 1, 2), 3)
+        self.assertEqual(self.client.call('add', a=1, b=2), 3)
+        self.assertEqual(self.transport.sent[1]['params'], {'a': 1, 'b': 2})
+        with self.assertRaises(ValueError):
+            self.client.call('add', 1, b=2)
+
+    def test_notify(self):
+        self.assertIsNone(self.client.notify('note', 'hello'))
+        self.assertEqual(self.api.notified, ['hello'])
+        self.assertNotIn('id', self.transport.sent[0])
+
+    def test_ids(self):
+        self.client.call('add', 1, 2)
+        self.client.call('add', 1, 2)
+        self.assertEqual([r['id'] for r in self.transport.sent], [1, 2])
+
+    def test_error_mapping(self):
+        with self.assertRaises(MethodNotFoundError):
+            self.client.call('missing')
+        with self.assertRaises(InvalidParamsError):
+            self.client.call('add', 1, 'x')
+        try:
+            self.client.call('server_error')
+        except ServerError, ex:
+            self.assertEqual(ex.details, u'nope')
+        else:
+            self.fail('ServerError not raised')
+        # Unknown codes are raised as ``JSONRPCError``, with the code set.
+        try:
+            self.client.call('fail', -31000)
+        except JSONRPCError, ex:
+            self.assertIs(type(ex), JSONRPCError)
+            self.assertEqual(ex.code, -31000)
+            self.assertEqual(ex.details, u'custom')
+        else:
+            self.fail('JSONRPCError not raised')
+
+    def test_undecodable_response(self):
+        class Garbage(object):
+            def send(self, data, content_type='application/json'):
+                return '<html>'
+        with self.assertRaises(TransportError):
+            Client(Garbage()).call('add', 1, 2)
+
+    def test_proxy(self):
+        api = self.client.proxy()
+        self.assertIsInstance(api, ServiceProxy)
+        self.assertEqual(api.add(1, 2), 3)
+        self.assertEqual(api.add(a=2, b=2), 4)
+        self.assertEqual(api.tags.count(['a', 'b']), 2)
+        self.assertIn('add', dir(api))
+        self.assertIn('count', dir(api.tags))
+        self.assertIn('describe', dir(api.system))
+        with self.assertRaises(AttributeError):
+            api.missing
+
+    def test_client_side_validation(self):
+        self.client.load_description()
+        sent = len(self.transport.sent)
+        with self.assertRaises(InvalidParamsError):
+            self.client.call('add', 1, 'x')
+        with self.assertRaises(InvalidParamsError):
+            self.client.call('tags.count', [1])
+        with self.assertRaises(InvalidParamsError):
+            self.client.call('add', a=1)
+        # Invalid calls aren't sent.
+        self.assertEqual(len(self.transport.sent), sent)
+        self.assertEqual(self.client.call('add', 1, 2), 3)
+
+
+class BatchingTests(unittest.TestCase):
+    def setUp(self):
+        self.api = ExampleAPI()
+        self.transport = RecordingTransport(self.api)
+
+    def test_call_async(self):
+        client = Client(self.transport, batch_window=60)
+        calls = [client.call_async('add', i, 1) for i in range(3)]
+        calls.append(client.call_async('missing'))
+        self.assertIsInstance(calls[0], PendingCall)
+        self.assertFalse(any(call.done() for call in calls))
+        self.assertEqual(self.transport.sent, [])
+        client.flush()
+        # Sent as one batch request.
+        self.assertEqual(len(self.transport.sent), 1)
+        self.assertEqual(len(self.transport.sent[0]), 4)
+        self.assertEqual([call.result(1) for call in calls[:3]], [1, 2, 3])
+        with self.assertRaises(MethodNotFoundError):
+            calls[3].result(1)
+
+    def test_max_batch(self):
+        client = Client(self.transport, batch_window=60, max_batch=2)
+        calls = [client.call_async('add', i, 1) for i in range(5)]
+        self.assertEqual([len(batch) for batch in self.transport.sent],
+                         [2, 2])
+        client.close()
+        self.assertEqual([call.result(1) for call in calls],
+                         [1, 2, 3, 4, 5])
+        # The last call is sent on its own (not as a batch).
+        self.assertIsInstance(self.transport.sent[2], dict)
+
+    def test_concurrent_calls(self):
+        client = Client(self.transport, batch_window=0.05)
+        results = {}
+
+        def call(i):
+            results[i] = client.call('add', i, i)
+
+        threads = [threading.Thread(target=call, args=(i,))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, {0: 0, 1: 2, 2: 4, 3: 6})
+        self.assertLess(len(self.transport.sent), 4)
+
+    def test_transport_error(self):
+        class Broken(object):
+            def send(self, data, content_type='application/json'):
+                raise TransportError(u'down')
+        client = Client(Broken(), batch_window=60)
+        calls = [client.call_async('add', 1, 1) for i in range(2)]
+        client.flush()
+        for call in calls:
+            with self.assertRaises(TransportError):
+                call.result(1)
@@ -0,0 +1,274 @@
+"""
+Tests for ``jsonrpc.coalesce`` and ``jsonrpc.admission``, which are run from
+several threads at once.
+"""
+import time
+import threading
+import unittest
+
+from jsonrpc.admission import AdmissionController, Limit
+from jsonrpc.coalesce import SingleFlight
+from jsonrpc.decorators import jrpc
+from jsonrpc.errors import OverloadedError
+from jsonrpc.service import JSONRPCService
+
+from .utils import call
+
+
+WAITERS = 5
+
+
+class Leader(object):
+    """
+    A function for ``SingleFlight.call`` which blocks until ``finish`` is
+    called, and counts its calls.
+    """
+    def __init__(self, result=None, exception=None):
+        self.result = result
+        self.exception = exception
+        self.calls = 0
+        self.started = threading.Event()
+        self._finish = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self._finish.wait(5)
+        if self.exception is not None:
+            raise self.exception
+        return self.result
+
+    def finish(self):
+        self._finish.set()
+
+
+def _acquire(semaphore, timeout):
+    """
+    Acquires ``semaphore`` within ``timeout`` seconds (which
+    ``threading.Semaphore`` can't do itself in Python 2).
+    """
+    deadline = time.time() + timeout
+    while not semaphore.acquire(False):
+        if time.time() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+class SingleFlightTests(unittest.TestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.waiting = threading.Semaphore(0)
+        self.outcomes = []
+
+    def call(self, key, func):
+        try:
+            self.outcomes.append(
+                ('result', self.flight.call(key, func, self.waiting.release)))
+        except Exception, ex:
+            self.outcomes.append(('error', ex))
+
+    def run_flight(self, func, callers=WAITERS + 1):
+        """
+        Makes ``callers`` concurrent calls with the same key, finishing
+        ``func`` once the rest are waiting for it.
+        """
+        threads = [threading.Thread(target=self.call, args=('key', func))
+                   for _ in range(callers)]
+        threads[0].start()
+        func.started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        for _ in threads[1:]:
+            self.assertTrue(_acquire(self.waiting, 5))
+        func.finish()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(self.outcomes), callers)
+
+    def test_shared_result(self):
+        result = object()
+        func = Leader(result=result)
+        self.run_flight(func)
+        self.assertEqual(func.calls, 1)
+        self.assertEqual(self.outcomes, [('result', result)] * (WAITERS + 1))
+
+    def test_shared_exception(self):
+        error = ValueError('boom')
+        func = Leader(exception=error)
+        self.run_flight(func)
+        self.assertEqual(func.calls, 1)
+        self.assertEqual(self.outcomes, [('error', error)] * (WAITERS + 1))
+
+    def test_flight_removed(self):
+        func = Leader(exception=ValueError('boom'))
+        self.run_flight(func, callers=2)
+        self.assertEqual(self.flight._flights, {})
+        # The next call runs the function again.
+        func = Leader(result=1)
+        func.finish()
+        self.assertEqual(self.flight.call('key', func), 1)
+        self.assertEqual(func.calls, 1)
+        self.assertEqual(self.flight._flights, {})
+
+    def test_keys_are_separate(self):
+        func = Leader(result=1)
+        thread = threading.Thread(target=self.call, args=('a', func))
+        thread.start()
+        func.started.wait(5)
+        other = Leader(result=2)
+        other.finish()
+        self.assertEqual(self.flight.call('b', other), 2)
+        func.finish()
+        thread.join(5)
+        self.assertEqual(self.outcomes, [('result', 1)])
+
+
+class LimitTests(unittest.TestCase):
+    def test_acquire(self):
+        limit = Limit(2)
+        self.assertTrue(limit.acquire())
+        self.assertTrue(limit.acquire())
+        self.assertFalse(limit.acquire())
+        self.assertEqual(limit.active, 2)
+        limit.release()
+        self.assertTrue(limit.acquire())
+
+    def test_timeout(self):
+        limit = Limit(1)
+        limit.acquire()
+        start = time.time()
+        self.assertFalse(limit.acquire(0.05))
+        self.assertGreaterEqual(time.time() - start, 0.05)
+        self.assertEqual(limit.active, 1)
+
+    def test_wait_for_release(self):
+        limit = Limit(1)
+        limit.acquire()
+        acquired = []
+        thread = threading.Thread(
+            target=lambda: acquired.append(limit.acquire(5)))
+        thread.start()
+        time.sleep(0.05)
+        self.assertEqual(acquired, [])
+        limit.release()
+        thread.join(5)
+        self.assertEqual(acquired, [True])
+        self.assertEqual(limit.active, 1)
+
+    def test_concurrency(self):
+        limit = Limit(3)
+        state = {'active': 0, 'most': 0, 'rejected': 0}
+        lock = threading.Lock()
+
+        def work():
+            for _ in range(20):
+                if not limit.acquire(5):
+                    with lock:
+                        state['rejected'] += 1
+                    continue
+                with lock:
+                    state['active'] += 1
+                    state['most'] = max(state['most'], state['active'])
+                time.sleep(0.001)
+                with lock:
+                    state['active'] -= 1
+                limit.release()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(state['rejected'], 0)
+        self.assertLessEqual(state['most'], 3)
+        self.assertEqual(limit.active, 0)
+
+
+class AdmissionControllerTests(unittest.TestCase):
+    def setUp(self):
+        def method(self, request):
+            pass
+        self.limited = jrpc('limited() -> <nil>', max_concurrency=1)(method)
+        self.unlimited = jrpc('unlimited() -> <nil>')(method)
+
+    def test_method_limit(self):
+        admission = AdmissionController()
+        admission.acquire(self.limited)
+        with self.assertRaises(OverloadedError):
+            admission.acquire(self.limited)
+        admission.acquire(self.unlimited)
+        admission.release(self.limited)
+        admission.acquire(self.limited)
+
+    def test_limits(self):
+        self.assertTrue(AdmissionController().limits(self.limited))
+        self.assertFalse(AdmissionController().limits(self.unlimited))
+        self.assertTrue(
+            AdmissionController(max_concurrency=1).limits(self.unlimited))
+
+    def test_service_limit(self):
+        admission = AdmissionController(max_concurrency=1)
+        admission.acquire(self.unlimited)
+        with self.assertRaises(OverloadedError):
+            admission.acquire(self.limited)
+        # The method's slot is given back when the service has none.
+        self.assertEqual(admission._limit(self.limited).active, 0)
+        admission.release(self.unlimited)
+        admission.acquire(self.limited)
+
+
+class AdmittedAPI(JSONRPCService):
+    @jrpc('limited() -> <bit>', max_concurrency=1)
+    def limited(self, request):
+        return True
+
+    @jrpc('unlimited() -> <bit>')
+    def unlimited(self, request):
+        return True
+
+
+class RecordingController(AdmissionController):
+    """
+    An ``AdmissionController`` which keeps the names of the methods acquired.
+    """
+    def __init__(self, *args, **kwargs):
+        super(RecordingController, self).__init__(*args, **kwargs)
+        self.acquired = []
+
+    def acquire(self, method):
+        self.acquired.append(method.name)
+        super(RecordingController, self).acquire(method)
+
+
+class ServiceAdmissionTests(unittest.TestCase):
+    def test_per_instance(self):
+        first, second = AdmittedAPI(), AdmittedAPI()
+        self.assertIsNot(first.admission, second.admission)
+        first.admission.acquire(AdmittedAPI.limited)
+        self.assertEqual(call(first, 'limited')['error']['code'], -32098)
+        self.assertTrue(call(second, 'limited')['result'])
+        first.admission.release(AdmittedAPI.limited)
+        self.assertTrue(call(first, 'limited')['result'])
+
+    def test_service_limit(self):
+        class LimitedAPI(AdmittedAPI):
+            max_concurrency = 1
+
+        api = LimitedAPI()
+        api.admission.acquire(LimitedAPI.unlimited)
+        self.assertEqual(call(api, 'unlimited')['error']['code'], -32098)
+
+    def test_shared(self):
+        class SharedAPI(AdmittedAPI):
+            admission = AdmissionController()
+
+        self.assertIs(SharedAPI().admission, SharedAPI.admission)
+
+    def test_unlimited_calls_not_admitted(self):
+        api = AdmittedAPI()
+        api.admission = RecordingController()
+        call(api, 'unlimited')
+        self.assertEqual(api.admission.acquired, [])
+        call(api, 'limited')
+        self.assertEqual(api.admission.acquired, ['limited'])
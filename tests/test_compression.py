@@ -0,0 +1,164 @@
+"""
+Tests for ``jsonrpc.compression``, and for the request body limits of
+``JSONRPCService``.
+"""
+import json
+import zlib
+import unittest
+
+from django.test.client import RequestFactory
+
+from jsonrpc.backends import accepted_backend
+from jsonrpc.compression import (
+    accepted_encoding, compress_bytes, compress_chunks, decompress_bytes,
+    parse_qvalues)
+from jsonrpc.decorators import jrpc
+from jsonrpc.service import JSONRPCService
+
+
+REQUEST = json.dumps(
+    {'jsonrpc': '2.0', 'method': 'add', 'params': [1, 2], 'id': 1})
+
+
+class LimitedAPI(JSONRPCService):
+    max_body_size = 200
+    max_decompressed_size = 1000
+
+    @jrpc('add(a=<num>, b=<num>) -> <num>')
+    def add(self, request, a, b):
+        return a + b
+
+
+class CompressionTests(unittest.TestCase):
+    def test_round_trip(self):
+        data = 'x' * 1000
+        for encoding in ('gzip', 'deflate'):
+            compressed = compress_bytes(data, encoding)
+            self.assertLess(len(compressed), len(data))
+            self.assertEqual(decompress_bytes(compressed, encoding, 1000),
+                             data)
+
+    def test_chunks(self):
+        chunks = list(compress_chunks([u'[1,', '2]'], 'gzip'))
+        self.assertEqual(decompress_bytes(''.join(chunks), 'gzip', 100),
+                         '[1,2]')
+
+    def test_bomb(self):
+        bomb = compress_bytes(' ' * 10 ** 7, 'gzip')
+        with self.assertRaises(ValueError):
+            decompress_bytes(bomb, 'gzip', 1000)
+
+    def test_corrupt(self):
+        with self.assertRaises(zlib.error):
+            decompress_bytes('not compressed', 'gzip', 1000)
+
+    def test_unlimited(self):
+        data = ' ' * 10 ** 6
+        self.assertEqual(
+            decompress_bytes(compress_bytes(data, 'gzip'), 'gzip', None), data)
+        with self.assertRaises(zlib.error):
+            decompress_bytes('not compressed', 'deflate', None)
+
+    def test_accepted_encoding(self):
+        self.assertEqual(accepted_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(accepted_encoding('gzip;q=0.5, deflate'), 'deflate')
+        self.assertEqual(accepted_encoding('*'), 'gzip')
+        self.assertIsNone(accepted_encoding('gzip;q=0, br'))
+        self.assertIsNone(accepted_encoding(''))
+
+
+class Backend(object):
+    def __init__(self, content_type):
+        self.content_type = content_type
+
+
+class NegotiationTests(unittest.TestCase):
+    def test_parse_qvalues(self):
+        self.assertEqual(
+            parse_qvalues('gzip;q=0.5, Deflate ,br; q=0, x;q=bad'),
+            {'gzip': 0.5, 'deflate': 1.0, 'br': 0.0, 'x': 0.0})
+        self.assertEqual(list(parse_qvalues('b, a;q=0.1, c')),
+                         ['b', 'a', 'c'])
+
+    def test_accepted_backend(self):
+        msgpack, cbor = (Backend('application/msgpack'),
+                         Backend('application/cbor'))
+        backends = (msgpack, cbor)
+        self.assertIs(accepted_backend('application/cbor', backends), cbor)
+        self.assertIs(accepted_backend(
+            'application/msgpack;q=0.5, application/cbor;q=0.8', backends),
+            cbor)
+        # Ties go to the type listed first.
+        self.assertIs(accepted_backend(
+            'application/msgpack, application/cbor', backends), msgpack)
+        self.assertIsNone(accepted_backend(
+            'application/json, application/msgpack;q=0.9', backends))
+        self.assertIs(accepted_backend('*/*', backends, cbor), cbor)
+        self.assertIsNone(accepted_backend(
+            'application/msgpack;q=0', backends))
+        self.assertIs(accepted_backend(None, backends, msgpack), msgpack)
+
+
+class RequestBodyTests(unittest.TestCase):
+    def setUp(self):
+        self.api = LimitedAPI()
+        self.factory = RequestFactory()
+
+    def post(self, data, **extra):
+        request = self.factory.post(
+            '/', data=data, content_type='application/json', **extra)
+        return request, self.api(request)
+
+    def assertError(self, response, status, code):
+        self.assertEqual(response.status_code, status)
+        self.assertEqual(json.loads(response.content)['error']['code'], code)
+
+    def test_compressed(self):
+        for encoding in ('gzip', 'deflate', 'identity'):
+            data = REQUEST
+            if encoding != 'identity':
+                data = compress_bytes(data, encoding)
+            request, response = self.post(
+                data, HTTP_CONTENT_ENCODING=encoding.upper())
+            self.assertEqual(json.loads(response.content)['result'], 3)
+
+    def test_body_still_readable(self):
+        request, response = self.post(REQUEST)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(request.body, REQUEST)
+
+    def test_bomb(self):
+        bomb = compress_bytes('[' + ' ' * 10 ** 5 + ']', 'gzip', 9)
+        self.assertLess(len(bomb), LimitedAPI.max_body_size)
+        request, response = self.post(bomb, HTTP_CONTENT_ENCODING='gzip')
+        self.assertError(response, 413, -32600)
+
+    def test_unlimited(self):
+        self.api.max_body_size = None
+        self.api.max_decompressed_size = None
+        data = json.dumps({'jsonrpc': '2.0', 'method': 'add', 'params': [1, 2],
+                           'id': 1, 'padding': ' ' * 10 ** 5})
+        request, response = self.post(compress_bytes(data, 'gzip'),
+                                      HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual(json.loads(response.content)['result'], 3)
+
+    def test_corrupt(self):
+        request, response = self.post(
+            'not compressed', HTTP_CONTENT_ENCODING='gzip')
+        self.assertError(response, 400, -32600)
+
+    def test_unknown_encoding(self):
+        request, response = self.post(REQUEST, HTTP_CONTENT_ENCODING='br')
+        self.assertError(response, 400, -32600)
+
+    def test_content_length_too_large(self):
+        request = self.factory.post(
+            '/', data=REQUEST, content_type='application/json')
+        request.META['CONTENT_LENGTH'] = str(LimitedAPI.max_body_size + 1)
+        self.assertError(self.api(request), 413, -32600)
+
+    def test_body_too_large(self):
+        request, response = self.post(json.dumps({
+            'jsonrpc': '2.0', 'method': 'add', 'params': [1, 2], 'id': 1,
+            'padding': 'x' * LimitedAPI.max_body_size}))
+        self.assertError(response, 413, -32600)
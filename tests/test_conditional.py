@@ -0,0 +1,112 @@
+"""
+Tests for the conditional (ETag and If-None-Match) responses to idempotent
+methods called via GET.
+"""
+import json
+import unittest
+
+from jsonrpc.decorators import jrpc
+from jsonrpc.ratelimit import LocalRateLimitStore
+from jsonrpc.service import JSONRPCService
+
+from .utils import content, get, post, request_object
+
+
+class ConditionalAPI(JSONRPCService):
+    def __init__(self, *args, **kwargs):
+        super(ConditionalAPI, self).__init__(*args, **kwargs)
+        self.rate_limit_store = LocalRateLimitStore()
+        self.version = 1
+        self.calls = 0
+
+    @jrpc('add(a=<num>, b=<num>) -> <num>', idempotent=True,
+          cache_control='public, max-age=60')
+    def add(self, request, a, b):
+        self.calls += 1
+        return a + b
+
+    @jrpc('articles(page=<num>) -> <arr>', idempotent=True,
+          etag=lambda service, request, params: service.version,
+          rate_limit=(3, 60))
+    def articles(self, request, page):
+        self.calls += 1
+        return [u'article'] * page
+
+    @jrpc('touch() -> <num>')
+    def touch(self, request):
+        self.version += 1
+        return self.version
+
+
+class ConditionalTests(unittest.TestCase):
+    def setUp(self):
+        self.api = ConditionalAPI(get=True)
+
+    def get(self, method, params, etag=None, **extra):
+        if etag is not None:
+            extra['HTTP_IF_NONE_MATCH'] = etag
+        return get(self.api, request_object(method, params), **extra)
+
+    def test_etag(self):
+        response = self.get('add', [1, 2])
+        self.assertEqual(json.loads(content(response))['result'], 3)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        etag = response['ETag']
+        response = self.get('add', [1, 2], etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        # Other params get other responses, and so other ETags.
+        self.assertEqual(self.get('add', [1, 3], etag).status_code, 200)
+
+    def test_no_etag(self):
+        # Only GET calls of idempotent methods are conditional.
+        response = post(self.api, request_object('add', [1, 2]))
+        self.assertFalse(response.has_header('ETag'))
+        response = self.get('touch', [])
+        self.assertFalse(response.has_header('ETag'))
+        response = self.get('add', [1, 'x'])
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_etag_hook(self):
+        response = self.get('articles', [1])
+        etag = response['ETag']
+        self.assertEqual(self.api.calls, 1)
+        response = self.get('articles', [1], etag)
+        self.assertEqual(response.status_code, 304)
+        # The method isn't called for a 304.
+        self.assertEqual(self.api.calls, 1)
+        self.api.version += 1
+        self.assertEqual(self.get('articles', [1], etag).status_code, 200)
+
+    def test_wildcard(self):
+        self.assertEqual(self.get('add', [1, 2], '*').status_code, 304)
+
+    def test_not_modified_requires_valid_call(self):
+        # The version token matches, but the call is checked as usual.
+        response = self.get('articles', ['x'], '*')
+        self.assertEqual(json.loads(content(response))['error']['code'],
+                         -32602)
+        response = self.get('articles', [], '*')
+        self.assertEqual(json.loads(content(response))['error']['code'],
+                         -32602)
+        request = request_object('articles', [1])
+        request['jsonrpc'] = '3.0'
+        response = get(self.api, request, HTTP_IF_NONE_MATCH='*')
+        self.assertIn('error', json.loads(content(response)))
+        request = request_object('articles', [1], rid=[1])
+        response = get(self.api, request, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(json.loads(content(response))['error']['code'],
+                         -32600)
+        self.assertEqual(self.api.calls, 0)
+
+    def test_notification(self):
+        request = request_object('articles', [1], rid=None)
+        response = get(self.api, request, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 204)
+
+    def test_rate_limited(self):
+        for i in range(3):
+            self.assertEqual(self.get('articles', [1], '*').status_code, 304)
+        response = self.get('articles', [1], '*')
+        self.assertEqual(response.status_code, 429)
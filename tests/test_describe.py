@@ -0,0 +1,136 @@
+"""
+Tests for ``system.describe``, and its cached, pre-encoded description.
+"""
+import json
+import unittest
+
+from jsonrpc.decorators import jrpc
+from jsonrpc.service import JSONRPCService
+
+from .utils import call, content, get, post, request_object, streamed
+
+
+class DescribedAPI(JSONRPCService):
+    service_name = u'Described API'
+
+    @jrpc('add(a=<num>, b=<num>) -> <num>')
+    def add(self, request, a, b):
+        return a + b
+
+
+class StreamingAPI(DescribedAPI):
+    stream = True
+
+
+class CountingAPI(DescribedAPI):
+    """
+    Counts the descriptions built, and takes its version as an argument.
+    """
+    def __init__(self, version=None, *args, **kwargs):
+        super(CountingAPI, self).__init__(*args, **kwargs)
+        self.service_version = version
+        self.built = 0
+
+    def description(self, compact=False):
+        self.built += 1
+        return super(CountingAPI, self).description(compact)
+
+
+class OverriddenAPI(DescribedAPI):
+    @jrpc('system.describe(compact=<bit>?) -> <obj>')
+    def describe(self, request, compact=None):
+        description = super(OverriddenAPI, self).describe(request, compact)
+        description['extra'] = True
+        return description
+
+
+class DescribeTests(unittest.TestCase):
+    def test_describe(self):
+        result = call(DescribedAPI(), 'system.describe')['result']
+        self.assertEqual(result['name'], u'Described API')
+        self.assertEqual(result['sdversion'], u'1.0')
+        procs = dict((p['name'], p) for p in result['procs'])
+        self.assertEqual(procs['add']['params'], [
+            {'name': 'a', 'type': 'num', 'optional': False},
+            {'name': 'b', 'type': 'num', 'optional': False}])
+        self.assertEqual(procs['add']['return'], 'num')
+
+    def test_compact(self):
+        for params in ([True], {'compact': True}):
+            result = call(DescribedAPI(), 'system.describe', params)['result']
+            self.assertNotIn('summary', result)
+            self.assertNotIn('help', result['procs'][0])
+        result = call(DescribedAPI(), 'system.describe', [False])['result']
+        self.assertIn('summary', result)
+
+    def test_cached(self):
+        api = CountingAPI()
+        for i in range(3):
+            call(api, 'system.describe')
+        self.assertEqual(api.built, 1)
+        call(api, 'system.describe', [True])
+        self.assertEqual(api.built, 2)
+
+    def test_per_instance(self):
+        # Attributes set in ``__init__`` aren't served from another
+        # instance's description.
+        first, second = CountingAPI(u'1.0'), CountingAPI(u'2.0')
+        for api in (first, second, first):
+            self.assertEqual(
+                call(api, 'system.describe')['result']['version'],
+                api.service_version)
+        self.assertEqual((first.built, second.built), (1, 1))
+
+    def test_invalidated(self):
+        api = CountingAPI(u'1.0')
+        call(api, 'system.describe')
+        api.service_version = u'1.1'
+        result = call(api, 'system.describe')['result']
+        self.assertEqual(result['version'], u'1.1')
+        self.assertEqual(api.built, 2)
+        api.pretty = True
+        response = post(api, request_object('system.describe'))
+        self.assertIn('\n', content(response))
+        self.assertEqual(api.built, 3)
+
+    def test_etag(self):
+        api = CountingAPI(get=True)
+        response = get(api, request_object('system.describe'))
+        etag = response['ETag']
+        response = get(api, request_object('system.describe'),
+                       HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        api.service_version = u'2.0'
+        response = get(api, request_object('system.describe'),
+                       HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_overridden(self):
+        result = call(OverriddenAPI(), 'system.describe')['result']
+        self.assertTrue(result['extra'])
+        self.assertEqual(result['name'], u'Described API')
+
+
+class StreamingTests(unittest.TestCase):
+    def test_batch(self):
+        response = post(StreamingAPI(), [
+            request_object('system.describe', rid=1),
+            request_object('add', [1, 2], rid=2)])
+        self.assertFalse(streamed(response))
+        responses = json.loads(content(response))
+        self.assertEqual(responses[0]['result']['name'], u'Described API')
+        self.assertEqual(responses[1]['result'], 3)
+
+    def test_single(self):
+        response = post(StreamingAPI(), request_object('system.describe'))
+        result = json.loads(content(response))['result']
+        self.assertEqual(result['name'], u'Described API')
+
+    def test_batch_without_raw_json(self):
+        response = post(StreamingAPI(), [
+            request_object('add', [1, 2], rid=1),
+            request_object('add', [3, 4], rid=2)])
+        self.assertTrue(streamed(response))
+        self.assertEqual([r['result'] for r in json.loads(content(response))],
+                         [3, 7])
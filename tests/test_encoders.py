@@ -0,0 +1,135 @@
+"""
+Tests for ``jsonrpc.encoders``, whose model serialization must match that of
+``django.core.serializers``.
+"""
+import datetime
+import decimal
+import json
+import unittest
+
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core import serializers
+from django.core.management import call_command
+
+from jsonrpc.encoders import (
+    RawJSON, RobustEncoder, buffered, coerce, model_dict, model_dicts)
+
+
+def encoded(obj, **kwargs):
+    """
+    Returns ``obj`` encoded by ``RobustEncoder``, and decoded again.
+    """
+    return json.loads(json.dumps(obj, cls=RobustEncoder, **kwargs))
+
+
+def serialized(objects, **kwargs):
+    """
+    Returns ``objects`` serialized by Django's JSON serializer, and decoded.
+    """
+    return json.loads(serializers.serialize('json', objects, **kwargs))
+
+
+class ModelTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        call_command('syncdb', interactive=False, verbosity=0)
+        group = Group.objects.create(name=u'Editors')
+        group.permissions = Permission.objects.all()[:2]
+        user = User.objects.create(
+            username=u'ren\xe9e', email=u'renee@example.com',
+            date_joined=datetime.datetime(2013, 1, 24, 12, 30, 15, 123456))
+        user.groups = [group]
+        User.objects.create(username=u'sam', is_staff=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        User.objects.all().delete()
+        Group.objects.all().delete()
+
+    def test_model_dict(self):
+        for model in (User, Group, Permission, ContentType):
+            for obj in model.objects.all():
+                self.assertEqual(encoded(model_dict(obj)),
+                                 serialized([obj])[0])
+
+    def test_fields(self):
+        user = User.objects.get(username=u'sam')
+        fields = ('username', 'is_staff', 'groups')
+        self.assertEqual(encoded(model_dict(user, fields)),
+                         serialized([user], fields=fields)[0])
+
+    def test_model_dicts(self):
+        for queryset in (User.objects.all(), Group.objects.all(),
+                         Permission.objects.all(),
+                         ContentType.objects.order_by('-pk')):
+            self.assertEqual(encoded(list(model_dicts(queryset))),
+                             serialized(queryset))
+        # Evaluated ``QuerySet`` objects, and lists of instances.
+        queryset = ContentType.objects.all()
+        list(queryset)
+        self.assertEqual(encoded(list(model_dicts(queryset))),
+                         serialized(queryset))
+        users = list(User.objects.all())
+        self.assertEqual(encoded(list(model_dicts(users))), serialized(users))
+
+    def test_model_dicts_fields(self):
+        fields = ('app_label',)
+        self.assertEqual(
+            encoded(list(model_dicts(ContentType.objects.all(), fields))),
+            serialized(ContentType.objects.all(), fields=fields))
+
+    def test_values(self):
+        queryset = ContentType.objects.values('app_label', 'model')
+        self.assertEqual(encoded(list(model_dicts(queryset))),
+                         list(queryset))
+
+    def test_encoder(self):
+        queryset = Permission.objects.all()
+        self.assertEqual(encoded(queryset), serialized(queryset))
+        user = User.objects.get(username=u'sam')
+        self.assertEqual(encoded(user), serialized([user])[0])
+        chunks = RobustEncoder(stream=True).iterencode(queryset)
+        self.assertEqual(json.loads(''.join(chunks)), serialized(queryset))
+
+    def test_coerce(self):
+        queryset = Group.objects.all()
+        self.assertEqual(coerce(queryset), serialized(queryset))
+        user = User.objects.get(username=u'sam')
+        self.assertEqual(coerce({'user': user}),
+                         {'user': serialized([user])[0]})
+
+
+class EncoderTests(unittest.TestCase):
+    def test_types(self):
+        self.assertEqual(encoded({
+            'decimal': decimal.Decimal('1.50'),
+            'datetime': datetime.datetime(2013, 1, 24, 12, 30),
+            'date': datetime.date(2013, 1, 24),
+            'time': datetime.time(12, 30),
+            'iterator': (i for i in range(3)),
+        }), {
+            'decimal': u'1.50',
+            'datetime': u'2013-01-24T12:30:00',
+            'date': u'2013-01-24',
+            'time': u'12:30:00',
+            'iterator': [0, 1, 2],
+        })
+        with self.assertRaises(TypeError):
+            encoded(object())
+
+    def test_stream(self):
+        chunks = RobustEncoder(stream=True).iterencode(
+            {'numbers': (i for i in range(3))})
+        self.assertEqual(json.loads(''.join(chunks)), {'numbers': [0, 1, 2]})
+
+    def test_coerce(self):
+        obj = {'a': (1, decimal.Decimal('2')), 'b': iter([u'x'])}
+        self.assertEqual(coerce(obj), {'a': [1, u'2'], 'b': [u'x']})
+        raw = RawJSON(u'{}')
+        self.assertIs(coerce(raw), raw)
+
+    def test_buffered(self):
+        chunks = list(buffered([u'a' * 10] * 5, size=25))
+        self.assertEqual(u''.join(chunks), u'a' * 50)
+        self.assertEqual([len(chunk) for chunk in chunks], [30, 20])
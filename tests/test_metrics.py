@@ -0,0 +1,214 @@
+"""
+Tests for ``jsonrpc.metrics``, and for the calls services record in their
+metrics sinks (and profiles).
+"""
+import json
+import logging
+import socket
+import unittest
+
+from django.db import connection
+
+from jsonrpc.decorators import jrpc
+from jsonrpc.metrics import (
+    BATCH, UNKNOWN, MemorySink, PrometheusSink, StatsdSink)
+from jsonrpc.ratelimit import LocalRateLimitStore
+from jsonrpc.service import JSONRPCService
+
+from .utils import call, post, request_object
+
+
+class MeteredAPI(JSONRPCService):
+    @jrpc('add(a=<num>, b=<num>) -> <num>')
+    def add(self, request, a, b):
+        return a + b
+
+    @jrpc('limited() -> <nil>', rate_limit=(1, 60))
+    def limited(self, request):
+        pass
+
+    @jrpc('note(text=<str>) -> <nil>', notification_only=True)
+    def note(self, request, text):
+        pass
+
+
+class RecordedCallTests(unittest.TestCase):
+    def setUp(self):
+        self.api = MeteredAPI()
+        self.api.metrics = MemorySink()
+        self.api.rate_limit_store = LocalRateLimitStore()
+
+    def snapshot(self):
+        return self.api.metrics.snapshot()
+
+    def test_call(self):
+        call(self.api, 'add', [1, 2])
+        stats = self.snapshot()['add']
+        self.assertEqual(stats['calls'], 1)
+        self.assertEqual(stats['errors'], {})
+        self.assertEqual(set(stats['phases']),
+                         set(['parse', 'validate', 'dispatch', 'encode']))
+
+    def test_error(self):
+        call(self.api, 'add', [1, 'x'])
+        self.assertEqual(self.snapshot()['add']['errors'], {-32602: 1})
+
+    def test_unknown_method(self):
+        call(self.api, 'missing')
+        call(self.api, 'other')
+        self.assertEqual(self.snapshot().keys(), [UNKNOWN])
+        self.assertEqual(self.snapshot()[UNKNOWN]['errors'], {-32601: 2})
+
+    def test_parse_error(self):
+        post(self.api, '{')
+        self.assertEqual(self.snapshot()[UNKNOWN]['errors'], {-32700: 1})
+
+    def test_rejected(self):
+        call(self.api, 'limited')
+        self.assertIn('error', call(self.api, 'limited'))
+        stats = self.snapshot()['limited']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['errors'].values(), [1])
+        self.assertNotIn(UNKNOWN, self.snapshot())
+        call(self.api, 'note', ['hi'])
+        self.assertEqual(self.snapshot()['note']['errors'], {-32600: 1})
+
+    def test_batch(self):
+        post(self.api, [request_object('add', [1, 2], rid=1),
+                        request_object('missing', rid=2)])
+        snapshot = self.snapshot()
+        self.assertEqual(snapshot[BATCH]['calls'], 1)
+        self.assertEqual(snapshot['add']['calls'], 1)
+        self.assertEqual(snapshot[UNKNOWN]['errors'], {-32601: 1})
+
+
+class ProfiledAPI(MeteredAPI):
+    profile_rate = 1.0
+
+    @jrpc('query() -> <num>')
+    def query(self, request):
+        cursor = connection.cursor()
+        cursor.execute('SELECT 1')
+        return cursor.fetchone()[0]
+
+
+class Records(logging.Handler):
+    """
+    A logging handler which keeps the messages logged to it.
+    """
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class ProfiledCallTests(unittest.TestCase):
+    def setUp(self):
+        self.api = ProfiledAPI()
+
+    def check(self, profile):
+        self.assertEqual(profile['queries']['count'], 1)
+        self.assertEqual(profile['queries']['slowest'][0]['sql'], 'SELECT 1')
+        self.assertIn('dispatch', profile['phases'])
+
+    def test_body(self):
+        response = post(self.api, request_object('query'))
+        self.assertNotIn('X-JSONRPC-Profile', response)
+        data = json.loads(response.content)
+        self.assertEqual(data['result'], 1)
+        self.check(data['debug'])
+
+    def test_header(self):
+        self.api.profile_output = 'header'
+        response = post(self.api, request_object('query'))
+        data = json.loads(response.content)
+        self.assertNotIn('debug', data)
+        self.check(json.loads(response['X-JSONRPC-Profile']))
+        # Batches are profiled as a whole.
+        response = post(self.api, [request_object('query', rid=1),
+                                   request_object('add', [1, 2], rid=2)])
+        self.assertTrue(all('debug' not in r
+                            for r in json.loads(response.content)))
+        profile = json.loads(response['X-JSONRPC-Profile'])
+        self.assertEqual(profile['queries']['count'], 1)
+
+    def test_log(self):
+        self.api.profile_output = 'log'
+        records = Records()
+        logger = logging.getLogger('jsonrpc.service')
+        level = logger.level
+        logger.addHandler(records)
+        logger.setLevel(logging.INFO)
+        try:
+            response = post(self.api, request_object('query'))
+        finally:
+            logger.removeHandler(records)
+            logger.setLevel(level)
+        self.assertNotIn('X-JSONRPC-Profile', response)
+        self.assertNotIn('debug', json.loads(response.content))
+        self.assertEqual(len(records.messages), 1)
+        self.assertTrue(records.messages[0].startswith(
+            u'Profile of `query` from 127.0.0.1: '))
+        self.check(json.loads(records.messages[0].split(': ', 1)[1]))
+
+    def test_unprofiled(self):
+        self.api.profile_rate = 0.0
+        self.api.profile_output = 'header'
+        response = post(self.api, request_object('query'))
+        self.assertNotIn('X-JSONRPC-Profile', response)
+        self.assertNotIn('debug', json.loads(response.content))
+
+
+class MemorySinkTests(unittest.TestCase):
+    def test_snapshot(self):
+        sink = MemorySink(buckets=[1.0, 0.1])
+        sink.record('add', {'dispatch': 0.05}, queries=2, query_time=0.01)
+        sink.record('add', {'dispatch': 0.5}, error_code=-32602,
+                    coalesced=True)
+        stats = sink.snapshot()['add']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['errors'], {-32602: 1})
+        self.assertEqual(stats['phases'].keys(), ['dispatch'])
+        self.assertEqual(stats['phases']['dispatch']['count'], 2)
+        self.assertAlmostEqual(stats['phases']['dispatch']['sum'], 0.55)
+        self.assertEqual(stats['phases']['dispatch']['buckets'], [1, 1, 0])
+        self.assertEqual(stats['queries'], 2)
+        self.assertEqual(stats['coalesced'], 1)
+        sink.reset()
+        self.assertEqual(sink.snapshot(), {})
+
+    def test_prometheus(self):
+        sink = PrometheusSink(buckets=[0.1])
+        sink.record('add', {'dispatch': 0.05}, error_code=-32602)
+        lines = sink.render().splitlines()
+        self.assertIn('jsonrpc_calls_total{method="add"} 1', lines)
+        self.assertIn('jsonrpc_errors_total{method="add",code="-32602"} 1',
+                      lines)
+        self.assertIn('jsonrpc_phase_seconds_bucket'
+                      '{method="add",phase="dispatch",le="+Inf"} 1', lines)
+        self.assertIn('jsonrpc_phase_seconds_count'
+                      '{method="add",phase="dispatch"} 1', lines)
+        response = sink.view(None)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+
+class StatsdSinkTests(unittest.TestCase):
+    def setUp(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.settimeout(5)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_record(self):
+        sink = StatsdSink(*self.server.getsockname(), prefix='api')
+        sink.record('tags.count', {'dispatch': 0.002}, error_code=-32602,
+                    queries=1, query_time=0.001)
+        lines = self.server.recv(4096).splitlines()
+        self.assertEqual(lines[:2], ['api.tags_count.calls:1|c',
+                                     'api.tags_count.errors.-32602:1|c'])
+        self.assertIn('api.tags_count.dispatch:2.000|ms', lines)
+        self.assertIn('api.tags_count.db.queries:1|c', lines)
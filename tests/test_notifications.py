@@ -0,0 +1,137 @@
+"""
+Tests for notifications, and for the executors (``jsonrpc.executors``) which
+run them without making the client wait.
+"""
+import threading
+import unittest
+
+from jsonrpc.decorators import jrpc
+from jsonrpc.executors import (
+    InlineExecutor, QueueExecutor, ThreadPoolExecutor)
+from jsonrpc.service import JSONRPCService
+
+from .utils import content, post, request_object
+
+
+class NotifiedAPI(JSONRPCService):
+    def __init__(self, *args, **kwargs):
+        super(NotifiedAPI, self).__init__(*args, **kwargs)
+        self.notified = []
+        self.threads = []
+        self.done = threading.Event()
+
+    @jrpc('note(text=<str>) -> <nil>')
+    def note(self, request, text):
+        self.notified.append(text)
+        self.threads.append(threading.current_thread().ident)
+        self.done.set()
+
+    @jrpc('fail() -> <nil>')
+    def fail(self, request):
+        self.done.set()
+        raise ValueError('Oops')
+
+    @jrpc('event(name=<str>) -> <nil>', notification_only=True)
+    def event(self, request, name):
+        self.notified.append(name)
+
+    def _validate_extra(self, request, json_req):
+        if json_req.get('params') == ['rejected']:
+            raise ValueError('Rejected')
+
+
+class Recorder(object):
+    """
+    A queue which keeps the jobs put on it, instead of running them.
+    """
+    def __init__(self):
+        self.jobs = []
+
+    def put(self, job):
+        self.jobs.append(job)
+
+
+class NotificationTests(unittest.TestCase):
+    def setUp(self):
+        self.api = NotifiedAPI()
+
+    def notify(self, method, params=None):
+        response = post(self.api, request_object(method, params, rid=None))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(content(response), '')
+        return response
+
+    def test_inline(self):
+        self.notify('note', ['hi'])
+        self.assertEqual(self.api.notified, ['hi'])
+        self.assertEqual(self.api.threads, [threading.current_thread().ident])
+
+    def test_errors(self):
+        # Errors aren't reported, since there's no response to report them
+        # in.
+        self.notify('fail')
+        self.notify('missing')
+        self.notify('note', [1])
+        self.notify('note', ['rejected'])
+        self.assertEqual(self.api.notified, [])
+
+    def test_malformed(self):
+        # Unless the request can't be recognized as a notification.
+        response = post(self.api, {'jsonrpc': '2.0', 'params': []})
+        self.assertEqual(response.status_code, 400)
+
+    def test_notification_only(self):
+        self.notify('event', ['x'])
+        self.assertEqual(self.api.notified, ['x'])
+        response = post(self.api, request_object('event', ['y']))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.api.notified, ['x'])
+
+    def test_thread_pool(self):
+        self.api.notification_executor = ThreadPoolExecutor(workers=2)
+        self.notify('note', ['hi'])
+        self.assertTrue(self.api.done.wait(5))
+        self.assertEqual(self.api.notified, ['hi'])
+        self.assertNotEqual(self.api.threads,
+                            [threading.current_thread().ident])
+
+    def test_thread_pool_error(self):
+        self.api.notification_executor = ThreadPoolExecutor(workers=1)
+        self.notify('fail')
+        self.assertTrue(self.api.done.wait(5))
+        # The pool survives the error.
+        self.api.done.clear()
+        self.notify('note', ['hi'])
+        self.assertTrue(self.api.done.wait(5))
+        self.assertEqual(self.api.notified, ['hi'])
+
+    def test_queue(self):
+        queue = Recorder()
+        self.api.notification_executor = QueueExecutor(queue)
+        self.notify('note', ['hi'])
+        self.assertEqual(self.api.notified, [])
+        self.assertEqual(len(queue.jobs), 1)
+        func, args, kwargs = queue.jobs[0]
+        func(*args, **kwargs)
+        self.assertEqual(self.api.notified, ['hi'])
+
+    def test_queue_rejected(self):
+        # Notifications are checked before they're queued.
+        queue = Recorder()
+        self.api.notification_executor = QueueExecutor(queue)
+        self.notify('note', ['rejected'])
+        self.assertEqual(queue.jobs, [])
+
+    def test_local_queue(self):
+        executor = QueueExecutor()
+        self.api.notification_executor = executor
+        self.notify('note', ['hi'])
+        executor.queue.join()
+        self.assertEqual(self.api.notified, ['hi'])
+
+
+class InlineExecutorTests(unittest.TestCase):
+    def test_submit(self):
+        calls = []
+        InlineExecutor().submit(calls.append, 1)
+        self.assertEqual(calls, [1])
@@ -0,0 +1,110 @@
+"""
+Tests for ``jsonrpc.procedures``, and for the dispatch tables of services.
+"""
+import functools
+import unittest
+
+from jsonrpc.decorators import jrpc
+from jsonrpc.procedures import DispatchTable, Procedure
+from jsonrpc.service import JSONRPCService
+
+from .utils import call
+
+
+def logged(method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        wrapper.calls += 1
+        return method(*args, **kwargs)
+    wrapper.calls = 0
+    return wrapper
+
+
+class ExampleAPI(JSONRPCService):
+    @jrpc('add(a=<num>, b=<num>) -> <num>')
+    def add(self, request, a, b):
+        """
+        Adds two numbers.
+        """
+        return a + b
+
+    @jrpc('echo(text=<str>) -> <str>')
+    def echo(self, request, text):
+        return text
+
+    logged_add = logged(add)
+
+
+class ChildAPI(ExampleAPI):
+    @jrpc('echo(text=<str>) -> <str>')
+    def echo(self, request, text):
+        return text.upper()
+
+
+class ProcedureTests(unittest.TestCase):
+    def test_descriptor(self):
+        api = ExampleAPI()
+        self.assertIsInstance(ExampleAPI.add, Procedure)
+        self.assertEqual(api.add(None, 1, 2), 3)
+        self.assertEqual(ExampleAPI.add(api, None, 1, 2), 3)
+
+    def test_function_attributes(self):
+        add = ExampleAPI.add
+        self.assertEqual(add.__name__, 'add')
+        self.assertEqual(add.__module__, __name__)
+        self.assertEqual(add.__doc__.strip(), 'Adds two numbers.')
+        self.assertIsNone(ExampleAPI.echo.__doc__)
+        # Those of the class itself are unchanged.
+        self.assertEqual(Procedure.__name__, 'Procedure')
+        self.assertEqual(Procedure.__module__, 'jsonrpc.procedures')
+        self.assertIn('RPC method', Procedure.__doc__)
+
+    def test_wraps(self):
+        api = ExampleAPI()
+        self.assertEqual(ExampleAPI.logged_add.__name__, 'add')
+        self.assertEqual(api.logged_add(None, 1, 2), 3)
+        self.assertEqual(ExampleAPI.logged_add.calls, 1)
+
+    def test_aliases(self):
+        add = ExampleAPI.add
+        self.assertEqual(add.rpc_method_name, 'add')
+        self.assertIs(add.rpc_params, add.params)
+        self.assertEqual([p['name'] for p in add.rpc_params], ['a', 'b'])
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            ExampleAPI.add.name = 'sub'
+        with self.assertRaises(AttributeError):
+            del ExampleAPI.add.idempotent
+        with self.assertRaises(AttributeError):
+            ExampleAPI.add.rpc_method_name = 'sub'
+
+    def test_unexpected_attributes(self):
+        with self.assertRaises(TypeError):
+            Procedure(lambda: None, name='x', speed='fast')
+
+
+class DispatchTableTests(unittest.TestCase):
+    def test_methods(self):
+        self.assertIsInstance(ExampleAPI.rpc_methods, DispatchTable)
+        self.assertEqual(sorted(ExampleAPI.rpc_methods),
+                         ['add', 'echo', 'system.describe'])
+
+    def test_inherited(self):
+        self.assertIs(ChildAPI.rpc_methods['add'], ExampleAPI.add)
+        self.assertIs(ChildAPI.rpc_methods['echo'], ChildAPI.echo)
+        self.assertEqual(call(ChildAPI(), 'echo', ['hi'])['result'], 'HI')
+
+    def test_immutable(self):
+        table = ExampleAPI.rpc_methods
+        with self.assertRaises(TypeError):
+            table['sub'] = table['add']
+        with self.assertRaises(TypeError):
+            del table['add']
+        with self.assertRaises(TypeError):
+            table.update({})
+        self.assertIn('add', table)
+
+    def test_call(self):
+        self.assertEqual(
+            call(ExampleAPI(), 'add', {'a': 1, 'b': 2})['result'], 3)
@@ -0,0 +1,132 @@
+"""
+Tests for ``jsonrpc.ratelimit``, and for the rate limits of services.
+"""
+import json
+import unittest
+
+from jsonrpc.decorators import jrpc
+from jsonrpc.ratelimit import DjangoRateLimitStore, LocalRateLimitStore
+from jsonrpc.service import JSONRPCService
+
+from .utils import call, content, post, request_object
+
+
+class StoreTests(unittest.TestCase):
+    def stores(self):
+        yield LocalRateLimitStore()
+        store = DjangoRateLimitStore(key_prefix='tests:rl')
+        store.cache.clear()
+        yield store
+
+    def test_consume(self):
+        for store in self.stores():
+            self.assertEqual(store.consume(u'a', 2, 60), 0)
+            self.assertEqual(store.consume(u'a', 2, 60), 0)
+            wait = store.consume(u'a', 2, 60)
+            self.assertGreater(wait, 29)
+            self.assertLessEqual(wait, 30)
+            # Buckets are separate.
+            self.assertEqual(store.consume(u'b', 2, 60), 0)
+
+    def test_refund(self):
+        for store in self.stores():
+            store.consume(u'a', 1, 60)
+            store.refund(u'a', 1, 60)
+            self.assertEqual(store.consume(u'a', 1, 60), 0)
+            self.assertGreater(store.consume(u'a', 1, 60), 0)
+            # Refunds never overfill a bucket.
+            store.refund(u'b', 1, 60)
+            store.refund(u'b', 1, 60)
+            self.assertEqual(store.consume(u'b', 1, 60), 0)
+            self.assertGreater(store.consume(u'b', 1, 60), 0)
+
+    def test_eviction(self):
+        store = LocalRateLimitStore(max_entries=2)
+        store.consume(u'a', 1, 60)
+        store.consume(u'b', 1, 60)
+        store.consume(u'c', 1, 60)
+        # The least recently used bucket is evicted, and so full again.
+        self.assertEqual(store.consume(u'a', 1, 60), 0)
+        self.assertGreater(store.consume(u'c', 1, 60), 0)
+
+
+class LimitedAPI(JSONRPCService):
+    rate_limit = (3, 60)
+
+    def __init__(self, *args, **kwargs):
+        super(LimitedAPI, self).__init__(*args, **kwargs)
+        self.rate_limit_store = LocalRateLimitStore()
+        self.notified = []
+
+    @jrpc('add(a=<num>, b=<num>) -> <num>')
+    def add(self, request, a, b):
+        return a + b
+
+    @jrpc('search(query=<str>) -> <arr>', rate_limit=(1, 60))
+    def search(self, request, query):
+        return []
+
+    @jrpc('note(text=<str>) -> <nil>')
+    def note(self, request, text):
+        self.notified.append(text)
+
+    def rate_limit_identity(self, request):
+        return request.META.get('HTTP_X_CLIENT')
+
+
+class ServiceRateLimitTests(unittest.TestCase):
+    def setUp(self):
+        self.api = LimitedAPI()
+
+    def call(self, method, params, client='a'):
+        return call(self.api, method, params, HTTP_X_CLIENT=client)
+
+    def test_service_limit(self):
+        for i in range(3):
+            self.assertEqual(self.call('add', [i, 1])['result'], i + 1)
+        error = self.call('add', [1, 1])['error']
+        self.assertEqual(error['code'], -32097)
+        self.assertIn('retry in', error['data']['details'])
+        # Each client has its own buckets.
+        self.assertEqual(self.call('add', [1, 1], client='b')['result'], 2)
+
+    def test_http_status(self):
+        for i in range(3):
+            self.call('add', [1, 1])
+        response = post(self.api, request_object('add', [1, 1]),
+                        HTTP_X_CLIENT='a')
+        self.assertEqual(response.status_code, 429)
+
+    def test_method_limit(self):
+        self.assertEqual(self.call('search', ['x'])['result'], [])
+        self.assertEqual(self.call('search', ['x'])['error']['code'], -32097)
+        self.assertEqual(self.call('add', [1, 1])['result'], 2)
+
+    def test_method_limit_keeps_service_quota(self):
+        self.call('search', ['x'])
+        for i in range(5):
+            self.call('search', ['x'])
+        # Only the first call took a token from the service's bucket.
+        for i in range(2):
+            self.assertEqual(self.call('add', [1, 1])['result'], 2)
+        self.assertIn('error', self.call('add', [1, 1]))
+
+    def test_exempt(self):
+        for i in range(5):
+            self.assertEqual(self.call('add', [1, 1], client=None)['result'],
+                             2)
+
+    def test_notifications(self):
+        for i in range(5):
+            post(self.api, request_object('note', ['hi'], rid=None),
+                 HTTP_X_CLIENT='a')
+        self.assertEqual(self.api.notified, ['hi'] * 3)
+
+    def test_batch(self):
+        responses = json.loads(content(post(self.api, [
+            request_object('add', [1, 1], rid=i) for i in range(4)],
+            HTTP_X_CLIENT='a')))
+        self.assertEqual([r.get('result') for r in responses],
+                         [2, 2, 2, None])
+        self.assertEqual(responses[3]['error']['code'], -32097)
+
@@ -0,0 +1,86 @@
+"""
+Tests for the checking (``check_results``) and coercion (``coerce_results``) of
+the results of calls.
+"""
+import datetime
+import decimal
+import unittest
+
+from jsonrpc.decorators import jrpc
+from jsonrpc.service import JSONRPCService
+
+from .utils import call
+
+
+class CheckedAPI(JSONRPCService):
+    check_results = True
+
+    @jrpc('count(value=<any>) -> <num>')
+    def count(self, request, value):
+        return value
+
+    @jrpc('users() -> <arr<obj{id:num, name:str}>>')
+    def users(self, request):
+        return self.users_result
+
+    @jrpc('price() -> <str>')
+    def price(self, request):
+        return decimal.Decimal('9.99')
+
+    @jrpc('today() -> <str>')
+    def today(self, request):
+        return datetime.date(2013, 1, 24)
+
+
+class CheckResultsTests(unittest.TestCase):
+    def setUp(self):
+        self.api = CheckedAPI()
+
+    def assertInternalError(self, response, details):
+        self.assertEqual(response['error']['code'], -32603)
+        self.assertEqual(response['error']['data']['details'], details)
+
+    def test_valid(self):
+        for value in (1, 2.5):
+            self.assertEqual(
+                call(self.api, 'count', [value])['result'], value)
+
+    def test_invalid(self):
+        self.assertInternalError(
+            call(self.api, 'count', ['1']),
+            u'Method `count` should return type num, not unicode')
+        for value in (True, False):
+            self.assertInternalError(
+                call(self.api, 'count', [value]),
+                u'Method `count` should return type num, not bool')
+
+    def test_nested(self):
+        self.api.users_result = [{'id': 1, 'name': u'a'}]
+        self.assertEqual(call(self.api, 'users')['result'],
+                         self.api.users_result)
+        self.api.users_result = [{'id': 1, 'name': u'a'}, {'id': True}]
+        self.assertEqual(call(self.api, 'users')['error']['code'], -32603)
+
+    def test_encoded_types(self):
+        self.assertEqual(call(self.api, 'price')['result'], u'9.99')
+        self.assertEqual(call(self.api, 'today')['result'], u'2013-01-24')
+
+    def test_unchecked(self):
+        self.api.check_results = False
+        self.assertEqual(call(self.api, 'count', ['1'])['result'], u'1')
+        # Every call is checked in debug mode.
+        self.api.debug = True
+        self.assertEqual(call(self.api, 'count', ['1'])['error']['code'],
+                         -32603)
+
+    def test_rate(self):
+        self.api.check_results = 0.0
+        self.assertEqual(call(self.api, 'count', ['1'])['result'], u'1')
+
+
+class CoerceResultsTests(unittest.TestCase):
+    def test_coerce(self):
+        api = CheckedAPI()
+        api.coerce_results = True
+        self.assertEqual(call(api, 'price')['result'], u'9.99')
+        self.assertEqual(call(api, 'today')['result'], u'2013-01-24')
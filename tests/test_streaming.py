@@ -0,0 +1,111 @@
+"""
+Tests for streamed responses, which are encoded (and compressed) as they're
+sent.
+"""
+import json
+import unittest
+
+from jsonrpc.compression import decompress_bytes
+from jsonrpc.decorators import jrpc
+from jsonrpc.service import JSONRPCService
+
+from .utils import content, factory, post, request_object, streamed
+
+
+class StreamedAPI(JSONRPCService):
+    @jrpc('numbers(count=<num>) -> <arr<num>>', stream=True)
+    def numbers(self, request, count):
+        return (i for i in xrange(count))
+
+    @jrpc('broken() -> <arr<num>>', stream=True)
+    def broken(self, request):
+        yield 1
+        raise ValueError('Oops')
+
+    @jrpc('small() -> <arr<num>>')
+    def small(self, request):
+        return [1, 2]
+
+
+class StreamingAPI(StreamedAPI):
+    stream = True
+
+    @jrpc('unstreamed() -> <arr<num>>', stream=False)
+    def unstreamed(self, request):
+        return [1, 2]
+
+
+class StreamingTests(unittest.TestCase):
+    def call(self, api, method, params=None, **extra):
+        return post(api, request_object(method, params), **extra)
+
+    def test_method(self):
+        response = self.call(StreamedAPI(), 'numbers', [1000])
+        self.assertTrue(streamed(response))
+        self.assertEqual(json.loads(content(response)),
+                         {'jsonrpc': '2.0', 'id': 1, 'result': range(1000)})
+        self.assertFalse(streamed(self.call(StreamedAPI(), 'small')))
+
+    def test_service(self):
+        api = StreamingAPI()
+        response = self.call(api, 'small')
+        self.assertTrue(streamed(response))
+        self.assertEqual(json.loads(content(response))['result'], [1, 2])
+        response = self.call(api, 'unstreamed')
+        self.assertFalse(streamed(response))
+        self.assertEqual(json.loads(content(response))['result'], [1, 2])
+
+    def test_errors_not_streamed(self):
+        response = self.call(StreamedAPI(), 'numbers', ['x'])
+        self.assertFalse(streamed(response))
+        self.assertEqual(json.loads(content(response))['error']['code'],
+                         -32602)
+
+    def test_error_while_streaming(self):
+        # The error is raised while the response is sent, which cuts it
+        # short.
+        response = self.call(StreamedAPI(), 'broken')
+        self.assertTrue(streamed(response))
+        with self.assertRaises(ValueError):
+            content(response)
+
+    def test_compressed(self):
+        api = StreamedAPI()
+        api.compress = True
+        response = self.call(api, 'numbers', [1000],
+                             HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(streamed(response))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        data = decompress_bytes(content(response), 'gzip', 10 ** 6)
+        self.assertEqual(json.loads(data)['result'], range(1000))
+
+    def test_padding(self):
+        api = StreamedAPI(get=True)
+        response = api(factory.get('/', {
+            'json': json.dumps(request_object('numbers', [3])),
+            'callback': 'cb'}))
+        self.assertTrue(streamed(response))
+        data = content(response)
+        self.assertTrue(data.startswith('cb(') and data.endswith(')'))
+        self.assertEqual(json.loads(data[3:-1])['result'], [0, 1, 2])
+
+    def test_batch(self):
+        response = post(StreamingAPI(), [
+            request_object('small', rid=1),
+            request_object('numbers', [3], rid=2),
+            request_object('missing', rid=3)])
+        self.assertTrue(streamed(response))
+        responses = json.loads(content(response))
+        self.assertEqual([r.get('result') for r in responses],
+                         [[1, 2], [0, 1, 2], None])
+        self.assertEqual(responses[2]['error']['code'], -32601)
+
+    def test_batch_with_description(self):
+        # Pre-encoded results (the service description) aren't encoded again.
+        response = post(StreamingAPI(), [
+            request_object('system.describe', rid=1),
+            request_object('small', rid=2)])
+        responses = json.loads(content(response))
+        self.assertIsInstance(responses[0]['result'], dict)
+        self.assertEqual(responses[1]['result'], [1, 2])
+
@@ -0,0 +1,184 @@
+"""
+Tests for ``jsonrpc.validators``.
+"""
+import decimal
+import unittest
+
+from jsonrpc.errors import InternalError, InvalidParamsError
+from jsonrpc.signatures import parse_signature, parse_type
+from jsonrpc.validators import (
+    ParamsValidator, ResultValidator, compile_type, format_path,
+    params_validator)
+
+
+ITEMS = 'arr<obj{id:num, tags:arr<str>, note:str?}>'
+
+
+def params_of(signature):
+    return parse_signature(signature)[1]
+
+
+class CompileTypeTests(unittest.TestCase):
+    def test_flat_types(self):
+        check = compile_type(parse_type('num'))
+        self.assertIsNone(check(1))
+        self.assertIsNone(check(1.5))
+        self.assertEqual(check('1'), ([], u'should be of type num'))
+
+    def test_nested_array(self):
+        check = compile_type(parse_type('arr<arr<num>>'))
+        self.assertIsNone(check([[1, 2], [], [3.5]]))
+        self.assertEqual(check([[1], [2, 'x']]),
+                         ([1, 1], u'should be of type num'))
+        self.assertEqual(check([1]), ([0], u'should be of type arr<num>'))
+        self.assertEqual(check({}), ([], u'should be of type arr<arr<num>>'))
+
+    def test_nested_object(self):
+        check = compile_type(parse_type(ITEMS))
+        items = [{'id': 1, 'tags': []}, {'id': 2, 'tags': ['a', u'b']}]
+        self.assertIsNone(check(items))
+        items.append({'id': 3, 'tags': [1]})
+        path, message = check(items)
+        self.assertEqual(format_path(u'items', path), u'items[2].tags[0]')
+        self.assertEqual(message, u'should be of type str')
+
+    def test_missing_field(self):
+        check = compile_type(parse_type(ITEMS))
+        path, message = check([{'id': 1}])
+        self.assertEqual(format_path(u'items', path), u'items[0].tags')
+        self.assertEqual(message, u'is required, but was not provided')
+
+    def test_optional_field(self):
+        check = compile_type(parse_type(ITEMS))
+        self.assertIsNone(check([{'id': 1, 'tags': [], 'note': None}]))
+        self.assertIsNone(check([{'id': 1, 'tags': [], 'note': u'x'}]))
+        path, message = check([{'id': 1, 'tags': [], 'note': 1}])
+        self.assertEqual(format_path(u'items', path), u'items[0].note')
+
+    def test_required_field_may_not_be_none(self):
+        check = compile_type(parse_type(ITEMS))
+        path, message = check([{'id': None, 'tags': []}])
+        self.assertEqual(format_path(u'items', path), u'items[0].id')
+        self.assertEqual(message, u'should be of type num')
+
+    def test_nil_and_any(self):
+        self.assertIsNone(compile_type(parse_type('nil'))(None))
+        self.assertIsNotNone(compile_type(parse_type('nil'))(0))
+        check = compile_type(parse_type('arr<any>'))
+        self.assertIsNone(check([None, 1, 'a', {}, []]))
+
+    def test_compiled_once(self):
+        self.assertIs(compile_type(parse_type(ITEMS)),
+                      compile_type(parse_type(ITEMS)))
+
+
+class ParamsValidatorTests(unittest.TestCase):
+    def setUp(self):
+        self.validator = params_validator(params_of(
+            'f(a=<num>, items=<{0}>, b=<str>?) -> <nil>'.format(ITEMS)))
+
+    def test_positional(self):
+        items = [{'id': 1, 'tags': ['x']}]
+        self.assertEqual(self.validator([1, items, 'b']), [1, items, 'b'])
+        # Missing optional params are "nil", and extras are left out.
+        self.assertEqual(self.validator([1, items]), [1, items, None])
+        self.assertEqual(self.validator([1, items, None, 'x']),
+                         [1, items, None])
+
+    def test_named(self):
+        items = [{'id': 1, 'tags': ['x']}]
+        self.assertEqual(self.validator({'a': 1, 'items': items, 'x': 0}),
+                         {'a': 1, 'items': items, 'b': None})
+
+    def test_wrong_type(self):
+        for params in ([1, [], 2], {'a': '1', 'items': []}):
+            with self.assertRaises(InvalidParamsError):
+                self.validator(params)
+        try:
+            self.validator({'a': '1', 'items': []})
+        except InvalidParamsError, ex:
+            self.assertEqual(ex.details,
+                             u'`a` param should be of type num')
+
+    def test_missing(self):
+        try:
+            self.validator([1])
+        except InvalidParamsError, ex:
+            self.assertEqual(ex.details, u'Parameter `items` is required, '
+                             u'but was not provided')
+        else:
+            self.fail('InvalidParamsError not raised')
+        with self.assertRaises(InvalidParamsError):
+            self.validator({'items': []})
+
+    def test_nested_error_path(self):
+        items = [{'id': 1, 'tags': []}, {'id': 2, 'tags': []},
+                 {'id': 3, 'tags': [7]}]
+        for params in ([1, items], {'a': 1, 'items': items}):
+            try:
+                self.validator(params)
+            except InvalidParamsError, ex:
+                self.assertEqual(ex.details, u'`items[2].tags[0]` param '
+                                 u'should be of type str')
+            else:
+                self.fail('InvalidParamsError not raised')
+
+    def test_params_must_be_array_or_object(self):
+        with self.assertRaises(InvalidParamsError):
+            self.validator('1')
+
+    def test_shared(self):
+        params = params_of('g(x=<num>) -> <nil>')
+        self.assertIs(params_validator(params), params_validator(params))
+        self.assertIsInstance(params_validator(params), ParamsValidator)
+
+
+class ResultValidatorTests(unittest.TestCase):
+    def test_flat(self):
+        validator = ResultValidator('add', 'num')
+        self.assertEqual(validator(3), 3)
+        try:
+            validator('3')
+        except InternalError, ex:
+            self.assertEqual(ex.details,
+                             u'Method `add` should return type num, not str')
+        else:
+            self.fail('InternalError not raised')
+
+    def test_encoded_types(self):
+        # Types which the encoder converts to the return type are allowed.
+        self.assertEqual(ResultValidator('f', 'num')(10 ** 20), 10 ** 20)
+        value = decimal.Decimal('1.5')
+        self.assertEqual(ResultValidator('f', 'str')(value), value)
+        self.assertEqual(ResultValidator('f', 'arr')((1, 2)), (1, 2))
+
+    def test_bool(self):
+        # Booleans are a sub-class of ``int``, but aren't numbers.
+        for result in (True, False):
+            with self.assertRaises(InternalError):
+                ResultValidator('f', 'num')(result)
+            self.assertIs(ResultValidator('f', 'bit')(result), result)
+        with self.assertRaises(InternalError):
+            ResultValidator('f', 'bit')(1)
+
+    def test_any(self):
+        validator = ResultValidator('f', 'any')
+        for result in (None, 1, 'a', [], object()):
+            self.assertIs(validator(result), result)
+
+    def test_nested(self):
+        validator = ResultValidator('f', 'arr<obj{id:num, name:str?}>')
+        self.assertEqual(validator([{'id': 1}]), [{'id': 1}])
+        try:
+            validator([{'id': 1}, {'id': 'x'}])
+        except InternalError, ex:
+            self.assertEqual(ex.details, u'`result[1].id` returned by method '
+                             u'`f` should be of type num')
+        else:
+            self.fail('InternalError not raised')
+
+    def test_nil(self):
+        validator = ResultValidator('f', 'nil')
+        self.assertIsNone(validator(None))
+        with self.assertRaises(InternalError):
+            validator(0)
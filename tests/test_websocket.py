@@ -0,0 +1,175 @@
+"""
+Tests for ``jsonrpc.websocket``, which run sessions over in-memory
+connections (see ``socket_pair``).
+"""
+import json
+import threading
+import unittest
+
+from django.test.client import RequestFactory
+
+from jsonrpc.decorators import jrpc
+from jsonrpc.service import JSONRPCService
+from jsonrpc.websocket import WebSocketSession, socket_pair, websocket_view
+
+
+class SessionAPI(JSONRPCService):
+    def __init__(self, *args, **kwargs):
+        super(SessionAPI, self).__init__(*args, **kwargs)
+        self.gates = {}  # Name -> ``threading.Event`` which ``wait`` waits on.
+        self.notified = []
+
+    def gate(self, name):
+        return self.gates.setdefault(name, threading.Event())
+
+    @jrpc('wait(name=<str>) -> <str>')
+    def wait(self, request, name):
+        self.gate(name).wait(5)
+        return name
+
+    @jrpc('add(a=<num>, b=<num>) -> <num>')
+    def add(self, request, a, b):
+        return a + b
+
+    @jrpc('note(text=<str>) -> <nil>')
+    def note(self, request, text):
+        self.notified.append(text)
+
+    @jrpc('subscribe(topic=<str>) -> <bit>')
+    def subscribe(self, request, topic):
+        return request.jsonrpc_session.push('news', {'topic': topic})
+
+
+def call(rid, method, *params):
+    return {'jsonrpc': '2.0', 'id': rid, 'method': method,
+            'params': list(params)}
+
+
+class SessionTests(unittest.TestCase):
+    def setUp(self):
+        self.api = SessionAPI()
+        self.server, self.client = socket_pair()
+        self.session = WebSocketSession(
+            self.api, RequestFactory().get('/ws'), self.server)
+        self.thread = threading.Thread(target=self.session.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        for gate in self.api.gates.values():
+            gate.set()
+        self.client.close()
+        self.thread.join(5)
+
+    def send(self, message):
+        self.client.send(json.dumps(message))
+
+    def receive(self):
+        return json.loads(self.client.receive(timeout=5))
+
+    def test_call(self):
+        self.send(call(1, 'add', 1, 2))
+        self.assertEqual(self.receive(),
+                         {'jsonrpc': '2.0', 'id': 1, 'result': 3})
+
+    def test_out_of_order(self):
+        self.send(call(1, 'wait', 'first'))
+        self.send(call(2, 'add', 1, 1))
+        self.assertEqual(self.receive()['id'], 2)
+        self.api.gate('first').set()
+        self.assertEqual(self.receive(),
+                         {'jsonrpc': '2.0', 'id': 1, 'result': 'first'})
+
+    def test_notification(self):
+        self.send({'jsonrpc': '2.0', 'method': 'note', 'params': ['hi']})
+        self.send(call(1, 'add', 1, 1))
+        # Only the call gets a response.
+        self.assertEqual(self.receive()['id'], 1)
+        self.assertEqual(self.api.notified, ['hi'])
+        with self.assertRaises(IOError):
+            self.client.receive(timeout=0.05)
+
+    def test_batch(self):
+        self.send([call(1, 'add', 1, 1), call(2, 'missing')])
+        responses = self.receive()
+        self.assertEqual([r['id'] for r in responses], [1, 2])
+        self.assertEqual(responses[1]['error']['code'], -32601)
+
+    def test_parse_error(self):
+        self.client.send('not json')
+        self.assertEqual(self.receive()['error']['code'], -32700)
+
+    def test_push(self):
+        self.send(call(1, 'subscribe', 'x'))
+        messages = [self.receive(), self.receive()]
+        self.assertEqual(messages[0], {'jsonrpc': '2.0', 'method': 'news',
+                                       'params': {'topic': 'x'}})
+        self.assertEqual(messages[1]['result'], True)
+        self.assertTrue(self.session.push('ping'))
+        self.assertEqual(self.receive(),
+                         {'jsonrpc': '2.0', 'method': 'ping', 'params': []})
+
+    def test_close_with_calls_in_flight(self):
+        self.send(call(1, 'wait', 'slow'))
+        self.send(call(2, 'add', 1, 1))
+        self.assertEqual(self.receive()['id'], 2)
+        self.client.close()
+        # The session waits for the call in flight to finish.
+        self.thread.join(0.05)
+        self.assertTrue(self.thread.is_alive())
+        self.api.gate('slow').set()
+        self.thread.join(5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertTrue(self.session.closed)
+        # Its response can't be sent, nor can pushed notifications.
+        self.assertFalse(self.session.push('ping'))
+
+
+class FakeSocket(object):
+    """
+    A socket whose connection is closed by the client straight away.
+    """
+    closed = False
+
+    def receive(self):
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class ViewTests(unittest.TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def get(self, view, origin=None):
+        socket = FakeSocket()
+        extra = {'wsgi.websocket': socket, 'HTTP_HOST': 'example.com'}
+        if origin is not None:
+            extra['HTTP_ORIGIN'] = origin
+        return view(self.factory.get('/ws', **extra)), socket
+
+    def test_not_websocket(self):
+        view = websocket_view(SessionAPI())
+        self.assertEqual(view(self.factory.get('/ws')).status_code, 400)
+
+    def test_same_origin(self):
+        view = websocket_view(SessionAPI())
+        for origin in ('https://example.com', 'http://EXAMPLE.com', None):
+            self.assertEqual(self.get(view, origin)[0].status_code, 200)
+        response, socket = self.get(view, 'https://evil.example.org')
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(socket.closed)
+
+    def test_allowed_origins(self):
+        view = websocket_view(SessionAPI(),
+                              allowed_origins=['https://app.example.org'])
+        response, socket = self.get(view, 'https://app.example.org')
+        self.assertEqual(response.status_code, 200)
+        response, socket = self.get(view, 'https://example.com')
+        self.assertEqual(response.status_code, 403)
+
+    def test_any_origin(self):
+        view = websocket_view(SessionAPI(), allowed_origins='*')
+        response, socket = self.get(view, 'https://evil.example.org')
+        self.assertEqual(response.status_code, 200)
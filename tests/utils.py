@@ -0,0 +1,64 @@
+"""
+Helpers for calling services in the tests.
+"""
+import json
+
+from django.test.client import RequestFactory
+
+
+factory = RequestFactory()
+
+
+def request_object(method, params=None, rid=1):
+    """
+    Returns a request object, or a notification if ``rid`` is ``None``.
+    """
+    request = {'jsonrpc': '2.0', 'method': method,
+               'params': [] if params is None else params}
+    if rid is not None:
+        request['id'] = rid
+    return request
+
+
+def post(service, body, **extra):
+    """
+    POSTs ``body`` (a request object, or a list of them, which is encoded as
+    JSON, or a ``str``) to ``service``, and returns the HTTP response.
+    """
+    if not isinstance(body, basestring):
+        body = json.dumps(body)
+    return service(factory.post(
+        '/', data=body, content_type='application/json', **extra))
+
+
+def get(service, body, **extra):
+    """
+    Sends ``body`` (a request object) to ``service`` via GET, and returns the
+    HTTP response.
+    """
+    return service(factory.get('/', {'json': json.dumps(body)}, **extra))
+
+
+def content(response):
+    """
+    Returns the content of a response, which may be streamed.
+    """
+    if getattr(response, 'streaming', False):
+        return ''.join(response.streaming_content)
+    return response.content
+
+
+def streamed(response):
+    """
+    Returns whether or not a response is streamed.
+    """
+    return getattr(response, 'streaming',
+                   getattr(response, '_base_content_is_iter', False))
+
+
+def call(service, method, params=None, rid=1, **extra):
+    """
+    POSTs a call to ``service``, and returns the decoded response object.
+    """
+    return json.loads(content(post(
+        service, request_object(method, params, rid), **extra)))